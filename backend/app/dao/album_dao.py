@@ -1,32 +1,42 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from .base_dao import BaseDAO
 from bson import ObjectId
 
 class AlbumDAO(BaseDAO):
+    indexes = [
+        IndexModel([("event_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ]
+    
     def __init__(self, db: AsyncIOMotorDatabase):
         super().__init__(db, "albums")
     
-    async def find_by_event_id(self, event_id: str, skip: int = 0, limit: int = 100) -> List[dict]:
-        """Find all albums for an event"""
-        return await self.find_many(
-            {"event_id": event_id},
-            skip=skip,
-            limit=limit,
-            sort=[("created_at", -1)]
-        )
+    async def find_by_event_id(
+        self,
+        event_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Find a page of albums for an event and the cursor for the next page"""
+        return await self.find_page({"event_id": event_id}, "created_at", limit, cursor, skip)
     
-    async def increment_image_count(self, album_id: str) -> bool:
+    async def increment_image_count(self, album_id: str, amount: int = 1) -> bool:
         """Increment image count for an album"""
         if not ObjectId.is_valid(album_id):
             return False
         
         result = await self.collection.update_one(
             {"_id": ObjectId(album_id)},
-            {"$inc": {"image_count": 1}}
+            {"$inc": {"image_count": amount}}
         )
         return result.modified_count > 0
     
+    async def apply_image_count_deltas(self, deltas: Dict[str, int]) -> int:
+        """Change image counts of several albums with one bulk write"""
+        return await self.bulk_increment("image_count", deltas)
+    
     async def decrement_image_count(self, album_id: str) -> bool:
         """Decrement image count for an album"""
         if not ObjectId.is_valid(album_id):
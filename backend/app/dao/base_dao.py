@@ -1,13 +1,39 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DESCENDING, IndexModel, ReturnDocument, UpdateOne
 from bson import ObjectId
-from datetime import datetime
+from datetime import datetime, timezone
+from app.utils.pagination import encode_cursor, decode_cursor, page_query
+
+def as_stored(value: Any) -> Any:
+    """Return a value as BSON stores it: datetimes become naive UTC with millisecond precision
+    
+    Dicts and lists are copied with their datetimes converted, so a document built
+    locally can be returned exactly as a later read of it would be.
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    if isinstance(value, dict):
+        return {key: as_stored(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [as_stored(item) for item in value]
+    return value
 
 class BaseDAO:
+    # Indexes the DAO's queries rely on, created at startup by ensure_indexes
+    indexes: List[IndexModel] = []
+    
     def __init__(self, db: AsyncIOMotorDatabase, collection_name: str):
         self.db = db
         self.collection = db[collection_name]
     
+    async def ensure_indexes(self) -> None:
+        """Create the declared indexes; existing identical indexes are left as they are"""
+        if self.indexes:
+            await self.collection.create_indexes(self.indexes)
+    
     async def create(self, data: dict) -> str:
         """Create a new document"""
         data['created_at'] = datetime.utcnow()
@@ -15,12 +41,34 @@ class BaseDAO:
         result = await self.collection.insert_one(data)
         return str(result.inserted_id)
     
+    async def create_returning(self, data: dict) -> dict:
+        """Create a new document and return it as stored, without reading it back"""
+        await self.create(data)
+        # insert_one sets _id on the document it was given
+        return as_stored(data)
+    
+    async def create_many(self, documents: List[dict], ordered: bool = True) -> List[str]:
+        """Create multiple documents with a single insert"""
+        now = datetime.utcnow()
+        for data in documents:
+            data['created_at'] = now
+            data['updated_at'] = now
+        result = await self.collection.insert_many(documents, ordered=ordered)
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+    
     async def find_by_id(self, id: str) -> Optional[dict]:
         """Find document by ID"""
         if not ObjectId.is_valid(id):
             return None
         return await self.collection.find_one({"_id": ObjectId(id)})
     
+    async def find_by_ids(self, ids: List[str]) -> List[dict]:
+        """Find documents by ID; invalid IDs are skipped"""
+        object_ids = [ObjectId(id) for id in ids if ObjectId.is_valid(id)]
+        if not object_ids:
+            return []
+        return await self.collection.find({"_id": {"$in": object_ids}}).to_list(length=len(object_ids))
+    
     async def find_one(self, filter: dict) -> Optional[dict]:
         """Find one document by filter"""
         return await self.collection.find_one(filter)
@@ -37,6 +85,39 @@ class BaseDAO:
         
         return await cursor.to_list(length=limit)
     
+    async def find_page(
+        self,
+        filter: dict,
+        sort_field: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Find a page of documents, newest first by sort_field with _id breaking ties
+        
+        With a cursor the page continues after the document it names, so Mongo seeks
+        in the (filter, sort_field, _id) index instead of walking skipped documents;
+        without one, skip is applied. The filter must be equalities on fields other
+        than sort_field. Returns the page and the cursor for the next page, or None
+        on the last page.
+        """
+        query = filter
+        if cursor:
+            value, last_id = decode_cursor(cursor)
+            query = page_query(filter, sort_field, value, last_id)
+            skip = 0
+        
+        documents = await self.collection.find(query).sort(
+            [(sort_field, DESCENDING), ("_id", DESCENDING)]
+        ).skip(skip).limit(limit + 1).to_list(length=limit + 1)
+        
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = encode_cursor(last.get(sort_field), last['_id'])
+        return documents, next_cursor
+    
     async def update(self, id: str, data: dict) -> bool:
         """Update document by ID"""
         if not ObjectId.is_valid(id):
@@ -49,6 +130,27 @@ class BaseDAO:
         )
         return result.modified_count > 0
     
+    async def update_returning(self, id: str, data: dict, filter: Optional[dict] = None) -> Optional[dict]:
+        """Update document by ID and return it after the update
+        
+        Returns None if no document has the ID, or none matching filter as well.
+        """
+        if not ObjectId.is_valid(id):
+            return None
+        
+        data['updated_at'] = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {**(filter or {}), "_id": ObjectId(id)},
+            {"$set": data},
+            return_document=ReturnDocument.AFTER
+        )
+    
+    async def update_many(self, filter: dict, data: dict) -> int:
+        """Update every document matching filter and return the number modified"""
+        data['updated_at'] = datetime.utcnow()
+        result = await self.collection.update_many(filter, {"$set": data})
+        return result.modified_count
+    
     async def delete(self, id: str) -> bool:
         """Delete document by ID"""
         if not ObjectId.is_valid(id):
@@ -57,6 +159,42 @@ class BaseDAO:
         result = await self.collection.delete_one({"_id": ObjectId(id)})
         return result.deleted_count > 0
     
+    async def delete_returning(self, id: str) -> Optional[dict]:
+        """Delete document by ID and return it, or None if it did not exist"""
+        if not ObjectId.is_valid(id):
+            return None
+        
+        return await self.collection.find_one_and_delete({"_id": ObjectId(id)})
+    
+    async def delete_many(self, filter: dict) -> int:
+        """Delete every document matching filter and return the number deleted"""
+        result = await self.collection.delete_many(filter)
+        return result.deleted_count
+    
+    async def bulk_increment(self, field: str, deltas: Dict[str, int]) -> int:
+        """Add a per-document amount to a numeric field with one bulk write
+        
+        deltas maps document IDs to amounts; zero amounts and invalid IDs are skipped.
+        Returns the number of documents modified.
+        """
+        operations = [
+            UpdateOne({"_id": ObjectId(id)}, {"$inc": {field: amount}})
+            for id, amount in deltas.items()
+            if amount and ObjectId.is_valid(id)
+        ]
+        if not operations:
+            return 0
+        
+        result = await self.collection.bulk_write(operations, ordered=False)
+        return result.modified_count
+    
+    async def read_counter(self, field: str) -> Dict[str, int]:
+        """Read a numeric field from every document, keyed by document ID"""
+        return {
+            str(document['_id']): document.get(field) or 0
+            async for document in self.collection.find({}, {field: 1})
+        }
+    
     async def count(self, filter: dict = None) -> int:
         """Count documents"""
         if filter is None:
@@ -1,44 +1,63 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
 from .base_dao import BaseDAO
-import random
+import secrets
 import string
 
+EVENT_CODE_ALPHABET = string.ascii_uppercase + string.digits
+EVENT_CODE_LENGTH = 8
+
 class EventDAO(BaseDAO):
+    indexes = [
+        # Unique so event code allocation is race free
+        IndexModel([("event_code", ASCENDING)], unique=True),
+        IndexModel([("host_phone", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("is_active", ASCENDING), ("event_date", DESCENDING), ("_id", DESCENDING)]),
+    ]
+    
     def __init__(self, db: AsyncIOMotorDatabase):
         super().__init__(db, "events")
     
-    async def generate_unique_event_code(self) -> str:
-        """Generate a unique 8-character event code"""
-        while True:
-            code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-            exists = await self.exists({"event_code": code})
-            if not exists:
-                return code
+    @staticmethod
+    def generate_event_code() -> str:
+        """Generate a random 8-character event code
+        
+        Uniqueness is enforced by the event_code index, so callers insert and
+        retry on is_event_code_conflict instead of checking first.
+        """
+        return ''.join(secrets.choice(EVENT_CODE_ALPHABET) for _ in range(EVENT_CODE_LENGTH))
+    
+    @staticmethod
+    def is_event_code_conflict(error: DuplicateKeyError) -> bool:
+        """Check whether a duplicate key error came from the event code index"""
+        return 'event_code' in (error.details or {}).get('keyPattern', {})
     
     async def find_by_event_code(self, event_code: str) -> Optional[dict]:
         """Find event by event code"""
         return await self.find_one({"event_code": event_code})
     
-    async def find_by_host_phone(self, phone: str, skip: int = 0, limit: int = 100) -> List[dict]:
-        """Find events by host phone number"""
-        return await self.find_many(
-            {"host_phone": phone},
-            skip=skip,
-            limit=limit,
-            sort=[("created_at", -1)]
-        )
+    async def find_by_host_phone(
+        self,
+        phone: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Find a page of events by host phone number and the cursor for the next page"""
+        return await self.find_page({"host_phone": phone}, "created_at", limit, cursor, skip)
     
-    async def find_active_events(self, skip: int = 0, limit: int = 100) -> List[dict]:
-        """Find all active events"""
-        return await self.find_many(
-            {"is_active": True},
-            skip=skip,
-            limit=limit,
-            sort=[("event_date", -1)]
-        )
+    async def find_active_events(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Find a page of active events and the cursor for the next page"""
+        return await self.find_page({"is_active": True}, "event_date", limit, cursor, skip)
     
-    async def increment_image_count(self, event_id: str) -> bool:
+    async def increment_image_count(self, event_id: str, amount: int = 1) -> bool:
         """Increment total images count for an event"""
         from bson import ObjectId
         if not ObjectId.is_valid(event_id):
@@ -46,10 +65,14 @@ class EventDAO(BaseDAO):
         
         result = await self.collection.update_one(
             {"_id": ObjectId(event_id)},
-            {"$inc": {"total_images": 1}}
+            {"$inc": {"total_images": amount}}
         )
         return result.modified_count > 0
     
+    async def apply_image_count_deltas(self, deltas: Dict[str, int]) -> int:
+        """Change total images counts of several events with one bulk write"""
+        return await self.bulk_increment("total_images", deltas)
+    
     async def decrement_image_count(self, event_id: str) -> bool:
         """Decrement total images count for an event"""
         from bson import ObjectId
@@ -1,29 +1,64 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from .base_dao import BaseDAO
 
 class ImageDAO(BaseDAO):
+    indexes = [
+        # Unique content hash per event, used for deduplication
+        IndexModel(
+            [("event_id", ASCENDING), ("content_hash", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"content_hash": {"$exists": True}}
+        ),
+        # _id is part of the sort so cursor pages can seek straight to their start
+        IndexModel([("event_id", ASCENDING), ("uploaded_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("album_id", ASCENDING), ("uploaded_at", DESCENDING), ("_id", DESCENDING)]),
+        # One image per stored object, so a key cannot be finalized twice
+        IndexModel([("s3_key", ASCENDING)], unique=True),
+    ]
+    
     def __init__(self, db: AsyncIOMotorDatabase):
         super().__init__(db, "images")
     
-    async def find_by_event_id(self, event_id: str, skip: int = 0, limit: int = 100) -> List[dict]:
-        """Find all images for an event"""
-        return await self.find_many(
-            {"event_id": event_id},
-            skip=skip,
-            limit=limit,
-            sort=[("uploaded_at", -1)]
-        )
+    async def ensure_indexes(self) -> None:
+        """Create the declared indexes, replacing the s3_key index from before it was unique"""
+        existing = await self.collection.index_information()
+        if "s3_key_1" in existing and not existing["s3_key_1"].get("unique"):
+            await self.collection.drop_index("s3_key_1")
+        await super().ensure_indexes()
+    
+    async def find_by_event_and_hash(self, event_id: str, content_hash: str) -> Optional[dict]:
+        """Find an image in an event by content hash"""
+        return await self.find_one({"event_id": event_id, "content_hash": content_hash})
     
-    async def find_by_album_id(self, album_id: str, skip: int = 0, limit: int = 100) -> List[dict]:
-        """Find all images in an album"""
+    async def find_by_event_and_hashes(self, event_id: str, content_hashes: List[str]) -> List[dict]:
+        """Find images in an event matching any of the content hashes"""
         return await self.find_many(
-            {"album_id": album_id},
-            skip=skip,
-            limit=limit,
-            sort=[("uploaded_at", -1)]
+            {"event_id": event_id, "content_hash": {"$in": content_hashes}},
+            limit=len(content_hashes)
         )
     
+    async def find_by_event_id(
+        self,
+        event_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Find a page of images for an event, newest first, and the cursor for the next page"""
+        return await self.find_page({"event_id": event_id}, "uploaded_at", limit, cursor, skip)
+    
+    async def find_by_album_id(
+        self,
+        album_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Find a page of images in an album, newest first, and the cursor for the next page"""
+        return await self.find_page({"album_id": album_id}, "uploaded_at", limit, cursor, skip)
+    
     async def find_by_event_without_album(self, event_id: str, skip: int = 0, limit: int = 100) -> List[dict]:
         """Find images in event that are not in any album"""
         return await self.find_many(
@@ -33,10 +68,34 @@ class ImageDAO(BaseDAO):
             sort=[("uploaded_at", -1)]
         )
     
+    async def find_by_s3_key(self, s3_key: str) -> Optional[dict]:
+        """Find the image stored under an S3 key"""
+        return await self.find_one({"s3_key": s3_key})
+    
+    async def find_by_s3_keys(self, s3_keys: List[str]) -> List[dict]:
+        """Find images stored under any of the given S3 keys"""
+        return await self.find_many(
+            {"s3_key": {"$in": s3_keys}},
+            limit=len(s3_keys)
+        )
+    
     async def count_by_event(self, event_id: str) -> int:
         """Count images for an event"""
         return await self.count({"event_id": event_id})
     
     async def count_by_album(self, album_id: str) -> int:
         """Count images in an album"""
-        return await self.count({"album_id": album_id})
\ No newline at end of file
+        return await self.count({"album_id": album_id})
+    
+    async def count_per_event(self) -> Dict[str, int]:
+        """Count images in every event that has any"""
+        pipeline = [{"$group": {"_id": "$event_id", "count": {"$sum": 1}}}]
+        return {row['_id']: row['count'] async for row in self.collection.aggregate(pipeline)}
+    
+    async def count_per_album(self) -> Dict[str, int]:
+        """Count images in every album that has any"""
+        pipeline = [
+            {"$match": {"album_id": {"$ne": None}}},
+            {"$group": {"_id": "$album_id", "count": {"$sum": 1}}}
+        ]
+        return {row['_id']: row['count'] async for row in self.collection.aggregate(pipeline)}
\ No newline at end of file
@@ -0,0 +1,23 @@
+from typing import List, Type
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from .base_dao import BaseDAO
+from .event_dao import EventDAO
+from .album_dao import AlbumDAO
+from .image_dao import ImageDAO
+from .template_dao import TemplateDAO
+from .job_dao import JobDAO
+from .upload_session_dao import UploadSessionDAO
+
+DAO_CLASSES: List[Type[BaseDAO]] = [
+    EventDAO,
+    AlbumDAO,
+    ImageDAO,
+    TemplateDAO,
+    JobDAO,
+    UploadSessionDAO,
+]
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Create the declared indexes of every DAO"""
+    for dao_class in DAO_CLASSES:
+        await dao_class(db).ensure_indexes()
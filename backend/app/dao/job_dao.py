@@ -0,0 +1,145 @@
+from typing import Optional, List
+import os
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from .base_dao import BaseDAO
+from bson import ObjectId
+from datetime import datetime, timedelta
+
+JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', 7 * 24 * 3600))  # 7 days
+
+class JobDAO(BaseDAO):
+    indexes = [
+        # Claiming due jobs and jobs with expired leases
+        IndexModel([("status", ASCENDING), ("available_at", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("locked_until", ASCENDING)]),
+        # At most one queued run of each recurring job
+        IndexModel(
+            [("type", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"status": "queued", "recurring": True}
+        ),
+        # Expire finished jobs
+        IndexModel([("finished_at", ASCENDING)], expireAfterSeconds=JOB_RETENTION_SECONDS),
+    ]
+    
+    def __init__(self, db: AsyncIOMotorDatabase):
+        super().__init__(db, "jobs")
+    
+    def _build_job(self, job_type: str, payload: dict, max_attempts: int) -> dict:
+        """Build a queued job document"""
+        return {
+            "type": job_type,
+            "payload": payload,
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "available_at": datetime.utcnow(),
+            "locked_until": None,
+            "last_error": None
+        }
+    
+    async def enqueue(self, job_type: str, payload: dict, max_attempts: int) -> str:
+        """Add a job to the queue"""
+        return await self.create(self._build_job(job_type, payload, max_attempts))
+    
+    async def enqueue_many(self, job_type: str, payloads: List[dict], max_attempts: int) -> List[str]:
+        """Add several jobs of one type with a single insert"""
+        if not payloads:
+            return []
+        return await self.create_many([self._build_job(job_type, payload, max_attempts) for payload in payloads])
+    
+    async def schedule(self, job_type: str, payload: dict, max_attempts: int, delay: float) -> bool:
+        """Queue a recurring job to run after a delay unless a run of it is already queued"""
+        job = self._build_job(job_type, payload, max_attempts)
+        del job['type'], job['status']
+        now = datetime.utcnow()
+        job.update(available_at=now + timedelta(seconds=delay), created_at=now, updated_at=now)
+        try:
+            result = await self.collection.update_one(
+                {"type": job_type, "status": "queued", "recurring": True},
+                {"$setOnInsert": job},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another worker queued the run between our lookup and insert
+            return False
+        return result.upserted_id is not None
+    
+    async def claim(self, worker_id: str, visibility_timeout: int) -> Optional[dict]:
+        """Atomically claim the next due job, including jobs whose worker stopped renewing its lease"""
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "queued", "available_at": {"$lte": now}},
+                    {"status": "running", "locked_until": {"$lt": now}}
+                ]
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "worker_id": worker_id,
+                    "started_at": now,
+                    "locked_until": now + timedelta(seconds=visibility_timeout),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("available_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+    
+    async def extend_lease(self, job_id: ObjectId, worker_id: str, visibility_timeout: int) -> bool:
+        """Push back the visibility timeout of a running job"""
+        result = await self.collection.update_one(
+            {"_id": job_id, "status": "running", "worker_id": worker_id},
+            {"$set": {"locked_until": datetime.utcnow() + timedelta(seconds=visibility_timeout)}}
+        )
+        return result.modified_count > 0
+    
+    async def complete(self, job_id: ObjectId, worker_id: str) -> bool:
+        """Mark a job as done"""
+        now = datetime.utcnow()
+        result = await self.collection.update_one(
+            {"_id": job_id, "worker_id": worker_id},
+            {"$set": {"status": "done", "finished_at": now, "updated_at": now, "locked_until": None}}
+        )
+        return result.modified_count > 0
+    
+    async def fail(self, job: dict, worker_id: str, error: str, retry_delay: float) -> bool:
+        """Requeue a failed job with a delay, or mark it failed once out of attempts"""
+        now = datetime.utcnow()
+        update = {"last_error": error, "updated_at": now, "locked_until": None}
+        if job['attempts'] < job['max_attempts']:
+            update.update({"status": "queued", "available_at": now + timedelta(seconds=retry_delay)})
+        else:
+            update.update({"status": "failed", "finished_at": now})
+        
+        try:
+            result = await self.collection.update_one(
+                {"_id": job['_id'], "worker_id": worker_id},
+                {"$set": update}
+            )
+        except DuplicateKeyError:
+            # A recurring job whose next run is already queued does not need a retry
+            update.pop('available_at')
+            update.update({"status": "failed", "finished_at": now})
+            result = await self.collection.update_one(
+                {"_id": job['_id'], "worker_id": worker_id},
+                {"$set": update}
+            )
+        return result.modified_count > 0
+    
+    async def count_by_status(self) -> dict:
+        """Count jobs in each status"""
+        pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        return {row['_id']: row['count'] async for row in self.collection.aggregate(pipeline)}
+    
+    async def oldest_queued(self) -> Optional[dict]:
+        """Find the queued job that has been due the longest"""
+        return await self.collection.find_one(
+            {"status": "queued", "available_at": {"$lte": datetime.utcnow()}},
+            sort=[("available_at", ASCENDING)]
+        )
@@ -1,9 +1,15 @@
 from typing import Optional, List
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from .base_dao import BaseDAO
 from bson import ObjectId
 
 class TemplateDAO(BaseDAO):
+    indexes = [
+        # Serves both the active listing and the per event type listing, sorted by usage
+        IndexModel([("is_active", ASCENDING), ("event_type", ASCENDING), ("usage_count", DESCENDING)]),
+    ]
+    
     def __init__(self, db: AsyncIOMotorDatabase):
         super().__init__(db, "templates")
     
@@ -0,0 +1,44 @@
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+from .base_dao import BaseDAO
+from bson import ObjectId
+from datetime import datetime, timedelta
+
+class UploadSessionDAO(BaseDAO):
+    indexes = [
+        # Expire abandoned upload sessions
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ]
+    
+    def __init__(self, db: AsyncIOMotorDatabase):
+        super().__init__(db, "upload_sessions")
+    
+    async def lock_at_offset(self, upload_id: str, offset: int, lock_seconds: int) -> Optional[dict]:
+        """Lock an in-progress session for writing, only if it is at the given offset and not locked"""
+        if not ObjectId.is_valid(upload_id):
+            return None
+        
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {
+                "_id": ObjectId(upload_id),
+                "status": "uploading",
+                "offset": offset,
+                "$or": [{"locked_until": None}, {"locked_until": {"$lt": now}}]
+            },
+            {"$set": {"locked_until": now + timedelta(seconds=lock_seconds)}},
+            return_document=ReturnDocument.AFTER
+        )
+    
+    async def release_at_offset(self, upload_id: str, offset: int) -> bool:
+        """Record the new offset and unlock the session"""
+        result = await self.collection.update_one(
+            {"_id": ObjectId(upload_id)},
+            {"$set": {"offset": offset, "locked_until": None, "updated_at": datetime.utcnow()}}
+        )
+        return result.modified_count > 0
+    
+    async def mark_completed(self, upload_id: str, image_id: str) -> bool:
+        """Mark a session as finalized into an image"""
+        return await self.update(upload_id, {"status": "completed", "image_id": image_id})
@@ -15,8 +15,8 @@ class PyObjectId(ObjectId):
         return ObjectId(v)
 
     @classmethod
-    def __modify_schema__(cls, field_schema):
-        field_schema.update(type="string")
+    def __get_pydantic_json_schema__(cls, core_schema, handler):
+        return {"type": "string"}
 
 class EventBase(BaseModel):
     event_name: str = Field(..., min_length=1, max_length=200)
@@ -24,7 +24,7 @@ class EventBase(BaseModel):
     event_date: datetime
     host_name: str = Field(..., min_length=1, max_length=100)
     host_phone: str = Field(..., pattern=r'^\+?[1-9]\d{1,14}$')
-    host_email: Optional[str] = Field(None, regex=r'^[\w\.-]+@[\w\.-]+\.\w+$')
+    host_email: Optional[str] = Field(None, pattern=r'^[\w\.-]+@[\w\.-]+\.\w+$')
     location: Optional[str] = None
     description: Optional[str] = None
     template_id: str
@@ -41,7 +41,7 @@ class EventUpdate(BaseModel):
     event_date: Optional[datetime] = None
     host_name: Optional[str] = Field(None, min_length=1, max_length=100)
     host_phone: Optional[str] = Field(None, pattern=r'^\+?[1-9]\d{1,14}$')
-    host_email: Optional[str] = Field(None, regex=r'^[\w\.-]+@[\w\.-]+\.\w+$')
+    host_email: Optional[str] = Field(None, pattern=r'^[\w\.-]+@[\w\.-]+\.\w+$')
     location: Optional[str] = None
     description: Optional[str] = None
     template_id: Optional[str] = None
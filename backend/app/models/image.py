@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List, Dict
 from pydantic import BaseModel, Field, HttpUrl
 from bson import ObjectId
 
@@ -15,8 +15,8 @@ class PyObjectId(ObjectId):
         return ObjectId(v)
 
     @classmethod
-    def __modify_schema__(cls, field_schema):
-        field_schema.update(type="string")
+    def __get_pydantic_json_schema__(cls, core_schema, handler):
+        return {"type": "string"}
 
 class ImageBase(BaseModel):
     filename: str
@@ -31,6 +31,39 @@ class ImageCreate(ImageBase):
     s3_url: str
     thumbnail_url: Optional[str] = None
 
+class PresignedUploadFile(BaseModel):
+    filename: str = Field(..., min_length=1)
+    content_type: str
+    file_size: int = Field(..., gt=0)
+
+class PresignedUploadRequest(BaseModel):
+    event_id: str
+    album_id: Optional[str] = None
+    files: List[PresignedUploadFile] = Field(..., min_length=1)
+
+class FinalizeUploadFile(BaseModel):
+    s3_key: str
+    filename: str = Field(..., min_length=1)
+
+class FinalizeUploadRequest(BaseModel):
+    event_id: str
+    album_id: Optional[str] = None
+    files: List[FinalizeUploadFile] = Field(..., min_length=1)
+
+class ResumableUploadCreate(BaseModel):
+    event_id: str
+    album_id: Optional[str] = None
+    filename: str = Field(..., min_length=1)
+    content_type: str
+    upload_length: int = Field(..., gt=0)
+
+class BulkImageMove(BaseModel):
+    image_ids: List[str] = Field(..., min_length=1)
+    album_id: Optional[str] = None
+
+class BulkImageDelete(BaseModel):
+    image_ids: List[str] = Field(..., min_length=1)
+
 class ImageUpdate(BaseModel):
     album_id: Optional[str] = None
 
@@ -41,6 +74,13 @@ class Image(ImageBase):
     s3_key: str
     s3_url: str
     thumbnail_url: Optional[str] = None
+    derivatives: Optional[Dict[str, str]] = None
+    placeholder: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    orientation: Optional[int] = None
+    taken_at: Optional[datetime] = None
+    content_hash: Optional[str] = None
     uploaded_at: datetime = Field(default_factory=datetime.utcnow)
     uploaded_by: Optional[str] = None
     
@@ -59,5 +99,12 @@ class ImageResponse(BaseModel):
     album_id: Optional[str]
     s3_url: str
     thumbnail_url: Optional[str]
+    derivatives: Optional[Dict[str, str]] = None
+    placeholder: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    orientation: Optional[int] = None
+    taken_at: Optional[datetime] = None
     uploaded_at: datetime
-    uploaded_by: Optional[str]
\ No newline at end of file
+    uploaded_by: Optional[str]
+    duplicate: bool = False
\ No newline at end of file
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, Query
+from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.models.album import AlbumCreate, AlbumUpdate
 from app.services.album_service import AlbumService
@@ -80,14 +81,16 @@ async def list_albums_by_event(
     event_id: str,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """List all albums for an event"""
     try:
         service = AlbumService(db)
-        albums, total = await service.list_albums_by_event(event_id, page, limit)
+        albums, total, next_cursor = await service.list_albums_by_event(event_id, page, limit, cursor, include_total)
         albums_dict = [album.dict() for album in albums]
-        return APIResponse.paginated(albums_dict, page, limit, total)
+        return APIResponse.paginated(albums_dict, None if cursor else page, limit, total, next_cursor=next_cursor)
     except AppException as e:
         return APIResponse.error(e.message, e.status_code, e.details)
     except Exception as e:
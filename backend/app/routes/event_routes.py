@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.models.event import EventCreate, EventUpdate
 from app.services.event_service import EventService
+from app.utils.qr_generator import RENDER_MEDIA_TYPES
 from app.utils.responses import APIResponse
 from app.utils.exceptions import AppException
 from app.database import get_database
@@ -57,6 +58,35 @@ async def get_event_by_code(
     except Exception as e:
         return APIResponse.error(str(e), 500)
 
+@router.get("/code/{event_code}/render/{asset}")
+async def render_event_asset(
+    event_code: str,
+    asset: str,
+    request: Request,
+    image_format: str = Query("png", alias="format"),
+    size: Optional[int] = Query(None, ge=64, le=4096),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Render the event QR code or template as PNG, SVG or PDF"""
+    try:
+        service = EventService(db)
+        etag, content = await service.render_asset(
+            event_code,
+            asset,
+            image_format,
+            size,
+            request.headers.get('if-none-match')
+        )
+        # Short max-age because the same URL changes when the event is edited; revalidation is a cheap 304
+        headers = {"etag": etag, "cache-control": "public, max-age=60"}
+        if content is None:
+            return Response(status_code=304, headers=headers)
+        return Response(content, media_type=RENDER_MEDIA_TYPES[image_format], headers=headers)
+    except AppException as e:
+        return APIResponse.error(e.message, e.status_code, e.details)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
 @router.put("/{event_id}")
 async def update_event(
     event_id: str,
@@ -95,6 +125,8 @@ async def delete_event(
 async def list_events(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     host_phone: Optional[str] = None,
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
@@ -103,12 +135,12 @@ async def list_events(
         service = EventService(db)
         
         if host_phone:
-            events, total = await service.list_events_by_host(host_phone, page, limit)
+            events, total, next_cursor = await service.list_events_by_host(host_phone, page, limit, cursor, include_total)
         else:
-            events, total = await service.list_events(page, limit)
+            events, total, next_cursor = await service.list_events(page, limit, cursor, include_total)
         
         events_dict = [event.dict() for event in events]
-        return APIResponse.paginated(events_dict, page, limit, total)
+        return APIResponse.paginated(events_dict, None if cursor else page, limit, total, next_cursor=next_cursor)
     except AppException as e:
         return APIResponse.error(e.message, e.status_code, e.details)
     except Exception as e:
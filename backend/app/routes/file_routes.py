@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Request
+import mimetypes
+import os
+from app.utils.file_response import RangeFileResponse
+from app.utils.local_storage import LocalStorage
+from app.utils.storage import get_storage
+from app.utils.responses import APIResponse
+from app.utils.exceptions import AppException, NotFoundException
+
+router = APIRouter(prefix="/files", tags=["Files"])
+
+@router.api_route("/{key:path}", methods=["GET", "HEAD"])
+async def get_file(key: str, request: Request):
+    """Serve a file from local storage, supporting range requests"""
+    try:
+        storage = get_storage()
+        if not isinstance(storage, LocalStorage):
+            raise NotFoundException("File not found")
+        
+        # Writes in progress are dot-prefixed temporary files and must never be served or cached
+        if any(segment.startswith('.') for segment in key.split('/')):
+            raise NotFoundException("File not found")
+        
+        path = storage.get_path(key)
+        if not os.path.isfile(path):
+            raise NotFoundException("File not found")
+        
+        return RangeFileResponse(
+            path,
+            media_type=mimetypes.guess_type(path)[0] or 'application/octet-stream',
+            range_header=request.headers.get('range'),
+            method=request.method,
+            # Keys are unique per upload, so a stored file never changes
+            headers={"cache-control": "public, max-age=31536000, immutable"}
+        )
+    except AppException as e:
+        return APIResponse.error(e.message, e.status_code, e.details)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
@@ -1,18 +1,39 @@
-from fastapi import APIRouter, Depends, Query, UploadFile, File, Form
-from typing import Optional
+from fastapi import APIRouter, Depends, Query, UploadFile, File, Form, Header, Request, Response
+from typing import Optional, List
+import os
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.models.image import (
+    PresignedUploadRequest, FinalizeUploadRequest, ResumableUploadCreate, BulkImageMove, BulkImageDelete
+)
 from app.services.image_service import ImageService
+from app.services.upload_session_service import UploadSessionService
 from app.utils.responses import APIResponse
 from app.utils.exceptions import AppException, ValidationException
+from app.utils.admission import upload_admission
 from app.database import get_database
 
 router = APIRouter(prefix="/images", tags=["Images"])
 
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', 50 * 1024 * 1024))  # 50MB
+MAX_BATCH_FILES = int(os.getenv('MAX_BATCH_FILES', 50))
+MAX_BULK_IMAGES = int(os.getenv('MAX_BULK_IMAGES', 2000))
 ALLOWED_TYPES = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp']
 
+def get_upload_size(file: UploadFile) -> int:
+    """Get size of a spooled upload by seeking, leaving the file at the start"""
+    file.file.seek(0, os.SEEK_END)
+    file_size = file.file.tell()
+    file.file.seek(0)
+    return file_size
+
+def check_admitted_event(request: Request, event_id: str):
+    """Reject uploads whose event differs from the event_id query parameter admission counted them under"""
+    if request.query_params.get('event_id') != event_id:
+        raise ValidationException("event_id query parameter does not match the request body")
+
 @router.post("/upload", status_code=201)
 async def upload_image(
+    request: Request,
     event_id: str = Form(...),
     album_id: Optional[str] = Form(None),
     file: UploadFile = File(...),
@@ -20,36 +41,300 @@ async def upload_image(
 ):
     """Upload an image to an event"""
     try:
+        check_admitted_event(request, event_id)
+        
         # Validate file type
         if file.content_type not in ALLOWED_TYPES:
             raise ValidationException(f"File type {file.content_type} not allowed")
         
-        # Read file
-        contents = await file.read()
-        file_size = len(contents)
-        
-        # Validate file size
+        # Validate file size without reading the spooled file into memory
+        file_size = get_upload_size(file)
         if file_size > MAX_FILE_SIZE:
-            raise ValidationException("File size exceeds 10MB limit")
-        
-        # Create file-like object
-        from io import BytesIO
-        file_obj = BytesIO(contents)
+            raise ValidationException(f"File size exceeds {MAX_FILE_SIZE // (1024 * 1024)}MB limit")
         
         service = ImageService(db)
         image = await service.upload_image(
             event_id=event_id,
-            file_obj=file_obj,
+            file_obj=file.file,
             filename=file.filename,
             file_size=file_size,
-            mime_type=file.content_type,
-            album_id=album_id
+            album_id=album_id,
+            max_size=MAX_FILE_SIZE
         )
         
+        if image.duplicate:
+            return APIResponse.success(
+                data=image.dict(),
+                message="Image was already uploaded"
+            )
+        
         return APIResponse.created(
             data=image.dict(),
             message="Image uploaded successfully"
         )
+    except AppException as e:
+        return APIResponse.error(e.message, e.status_code, e.details, e.headers)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+@router.post("/upload/batch", status_code=201)
+async def upload_images_batch(
+    request: Request,
+    event_id: str = Form(...),
+    album_id: Optional[str] = Form(None),
+    files: List[UploadFile] = File(...),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Upload multiple images to an event in one request"""
+    try:
+        check_admitted_event(request, event_id)
+        
+        if len(files) > MAX_BATCH_FILES:
+            raise ValidationException(f"A batch may contain at most {MAX_BATCH_FILES} files")
+        
+        # Validate each file up front; invalid files are reported without failing the batch
+        results = [None] * len(files)
+        valid_items = []
+        valid_positions = []
+        for position, file in enumerate(files):
+            file_size = get_upload_size(file)
+            if file.content_type not in ALLOWED_TYPES:
+                error = f"File type {file.content_type} not allowed"
+            elif file_size > MAX_FILE_SIZE:
+                error = f"File size exceeds {MAX_FILE_SIZE // (1024 * 1024)}MB limit"
+            else:
+                valid_items.append({
+                    "file_obj": file.file,
+                    "filename": file.filename,
+                    "file_size": file_size
+                })
+                valid_positions.append(position)
+                continue
+            results[position] = {"filename": file.filename, "success": False, "error": error}
+        
+        if valid_items:
+            service = ImageService(db)
+            uploaded = await service.upload_images_batch(
+                event_id=event_id,
+                files=valid_items,
+                album_id=album_id,
+                max_size=MAX_FILE_SIZE
+            )
+            for position, result in zip(valid_positions, uploaded):
+                results[position] = result
+        
+        uploaded_count = sum(1 for result in results if result['success'])
+        if uploaded_count == 0:
+            return APIResponse.error("No images were uploaded", 400, results)
+        
+        return APIResponse.created(
+            data=results,
+            message=f"Uploaded {uploaded_count} of {len(files)} images"
+        )
+    except AppException as e:
+        return APIResponse.error(e.message, e.status_code, e.details, e.headers)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+@router.post("/upload/presign")
+async def create_presigned_uploads(
+    upload_request: PresignedUploadRequest,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Get presigned URLs for uploading images directly to storage"""
+    try:
+        if len(upload_request.files) > MAX_BATCH_FILES:
+            raise ValidationException(f"A batch may contain at most {MAX_BATCH_FILES} files")
+        
+        for file in upload_request.files:
+            if file.content_type not in ALLOWED_TYPES:
+                raise ValidationException(f"File type {file.content_type} not allowed")
+            if file.file_size > MAX_FILE_SIZE:
+                raise ValidationException(f"File size exceeds {MAX_FILE_SIZE // (1024 * 1024)}MB limit")
+        
+        service = ImageService(db)
+        uploads = await service.create_presigned_uploads(
+            event_id=upload_request.event_id,
+            files=upload_request.files,
+            album_id=upload_request.album_id,
+            max_size=MAX_FILE_SIZE
+        )
+        return APIResponse.success(data=uploads)
+    except AppException as e:
+        return APIResponse.error(e.message, e.status_code, e.details)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+@router.post("/upload/finalize", status_code=201)
+async def finalize_uploads(
+    finalize_request: FinalizeUploadRequest,
+    request: Request,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Record images uploaded directly to storage"""
+    try:
+        if len(finalize_request.files) > MAX_BATCH_FILES:
+            raise ValidationException(f"A batch may contain at most {MAX_BATCH_FILES} files")
+        
+        check_admitted_event(request, finalize_request.event_id)
+        
+        service = ImageService(db)
+        results = await service.finalize_uploads(
+            event_id=finalize_request.event_id,
+            files=finalize_request.files,
+            album_id=finalize_request.album_id,
+            max_size=MAX_FILE_SIZE,
+            allowed_types=ALLOWED_TYPES
+        )
+        
+        finalized_count = sum(1 for result in results if result['success'])
+        if finalized_count == 0:
+            return APIResponse.error("No images were finalized", 400, results)
+        
+        return APIResponse.created(
+            data=results,
+            message=f"Finalized {finalized_count} of {len(results)} images"
+        )
+    except AppException as e:
+        return APIResponse.error(e.message, e.status_code, e.details, e.headers)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+@router.post("/uploads", status_code=201)
+async def create_resumable_upload(
+    upload_data: ResumableUploadCreate,
+    request: Request,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Start a resumable upload; send chunks with PATCH and query progress with HEAD"""
+    try:
+        if upload_data.content_type not in ALLOWED_TYPES:
+            raise ValidationException(f"File type {upload_data.content_type} not allowed")
+        if upload_data.upload_length > MAX_FILE_SIZE:
+            raise ValidationException(f"File size exceeds {MAX_FILE_SIZE // (1024 * 1024)}MB limit")
+        
+        service = UploadSessionService(db)
+        upload = await service.create_session(upload_data)
+        response = APIResponse.created(data=upload, message="Upload created")
+        response.headers['Location'] = f"{request.url.path.rstrip('/')}/{upload['upload_id']}"
+        response.headers['Upload-Offset'] = "0"
+        return response
+    except AppException as e:
+        return APIResponse.error(e.message, e.status_code, e.details)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+@router.head("/uploads/{upload_id}")
+async def get_resumable_upload_offset(
+    upload_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Get how many bytes of a resumable upload have been received"""
+    try:
+        service = UploadSessionService(db)
+        upload = await service.get_session(upload_id)
+        return Response(
+            status_code=200,
+            headers={
+                "Upload-Offset": str(upload['offset']),
+                "Upload-Length": str(upload['upload_length']),
+                "Cache-Control": "no-store"
+            }
+        )
+    except AppException as e:
+        return Response(status_code=e.status_code)
+    except Exception:
+        return Response(status_code=500)
+
+@router.patch("/uploads/{upload_id}")
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., ge=0),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Append a chunk to a resumable upload at the offset given by the Upload-Offset header"""
+    try:
+        service = UploadSessionService(db)
+        async with upload_admission.admit():
+            offset = await service.append_chunk(upload_id, upload_offset, request.stream())
+        return Response(status_code=204, headers={"Upload-Offset": str(offset)})
+    except AppException as e:
+        return APIResponse.error(e.message, e.status_code, e.details, e.headers)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+@router.post("/uploads/{upload_id}/finalize", status_code=201)
+async def finalize_resumable_upload(
+    upload_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Record a fully received resumable upload as an image"""
+    try:
+        service = UploadSessionService(db)
+        async with upload_admission.admit():
+            image = await service.finalize(upload_id, max_size=MAX_FILE_SIZE)
+        return APIResponse.created(
+            data=image.dict(),
+            message="Image uploaded successfully"
+        )
+    except AppException as e:
+        return APIResponse.error(e.message, e.status_code, e.details, e.headers)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+@router.delete("/uploads/{upload_id}")
+async def abort_resumable_upload(
+    upload_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Cancel a resumable upload"""
+    try:
+        service = UploadSessionService(db)
+        await service.abort(upload_id)
+        return APIResponse.success(message="Upload cancelled")
+    except AppException as e:
+        return APIResponse.error(e.message, e.status_code, e.details)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+@router.post("/bulk/move")
+async def move_images_to_album(
+    move_request: BulkImageMove,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Move several images to a different album or remove them from their albums"""
+    try:
+        if len(move_request.image_ids) > MAX_BULK_IMAGES:
+            raise ValidationException(f"A bulk request may contain at most {MAX_BULK_IMAGES} images")
+        
+        service = ImageService(db)
+        result = await service.move_images_to_album(move_request.image_ids, move_request.album_id)
+        return APIResponse.success(
+            data=result,
+            message=f"Moved {result['moved']} images"
+        )
+    except AppException as e:
+        return APIResponse.error(e.message, e.status_code, e.details)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+@router.post("/bulk/delete")
+async def delete_images(
+    delete_request: BulkImageDelete,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Delete several images"""
+    try:
+        if len(delete_request.image_ids) > MAX_BULK_IMAGES:
+            raise ValidationException(f"A bulk request may contain at most {MAX_BULK_IMAGES} images")
+        
+        service = ImageService(db)
+        result = await service.delete_images(delete_request.image_ids)
+        return APIResponse.success(
+            data=result,
+            message=f"Deleted {result['deleted']} images"
+        )
     except AppException as e:
         return APIResponse.error(e.message, e.status_code, e.details)
     except Exception as e:
@@ -78,8 +363,8 @@ async def delete_image(
     """Delete an image"""
     try:
         service = ImageService(db)
-        await service.delete_image(image_id)
-        return APIResponse.success(message="Image deleted successfully")
+        result = await service.delete_image(image_id)
+        return APIResponse.success(data=result, message="Image deleted successfully")
     except AppException as e:
         return APIResponse.error(e.message, e.status_code, e.details)
     except Exception as e:
@@ -90,14 +375,16 @@ async def list_images_by_event(
     event_id: str,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """List all images for an event"""
     try:
         service = ImageService(db)
-        images, total = await service.list_images_by_event(event_id, page, limit)
+        images, total, next_cursor = await service.list_images_by_event(event_id, page, limit, cursor, include_total)
         images_dict = [image.dict() for image in images]
-        return APIResponse.paginated(images_dict, page, limit, total)
+        return APIResponse.paginated(images_dict, None if cursor else page, limit, total, next_cursor=next_cursor)
     except AppException as e:
         return APIResponse.error(e.message, e.status_code, e.details)
     except Exception as e:
@@ -108,14 +395,16 @@ async def list_images_by_album(
     album_id: str,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """List all images in an album"""
     try:
         service = ImageService(db)
-        images, total = await service.list_images_by_album(album_id, page, limit)
+        images, total, next_cursor = await service.list_images_by_album(album_id, page, limit, cursor, include_total)
         images_dict = [image.dict() for image in images]
-        return APIResponse.paginated(images_dict, page, limit, total)
+        return APIResponse.paginated(images_dict, None if cursor else page, limit, total, next_cursor=next_cursor)
     except AppException as e:
         return APIResponse.error(e.message, e.status_code, e.details)
     except Exception as e:
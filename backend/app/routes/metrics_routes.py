@@ -0,0 +1,41 @@
+from fastapi import APIRouter
+from app.utils.responses import APIResponse
+from app.utils.job_queue import job_queue
+from app.utils.admission import upload_admission
+from app.utils.counter_aggregator import counter_aggregator
+from app.utils.insert_batcher import insert_batcher
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@router.get("/jobs")
+async def get_job_metrics():
+    """Get background job queue depth and latency"""
+    try:
+        metrics = await job_queue.get_metrics()
+        return APIResponse.success(data=metrics)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+@router.get("/admission")
+async def get_admission_metrics():
+    """Get upload admission load and queue wait times for this worker"""
+    try:
+        return APIResponse.success(data=upload_admission.get_metrics())
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+@router.get("/counters")
+async def get_counter_metrics():
+    """Get buffered counter increments and flush times for this worker"""
+    try:
+        return APIResponse.success(data=counter_aggregator.get_metrics())
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+@router.get("/inserts")
+async def get_insert_metrics():
+    """Get image insert batch sizes and write times for this worker"""
+    try:
+        return APIResponse.success(data=insert_batcher.get_metrics())
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
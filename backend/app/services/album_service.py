@@ -1,4 +1,5 @@
 from typing import List, Optional
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.dao.album_dao import AlbumDAO
 from app.dao.event_dao import EventDAO
@@ -21,10 +22,7 @@ class AlbumService:
         album_dict = album_data.dict()
         album_dict['image_count'] = 0
         
-        album_id = await self.album_dao.create(album_dict)
-        
-        # Fetch and return created album
-        created_album = await self.album_dao.find_by_id(album_id)
+        created_album = await self.album_dao.create_returning(album_dict)
         return self._convert_to_response(created_album)
     
     async def get_album(self, album_id: str) -> AlbumResponse:
@@ -36,19 +34,16 @@ class AlbumService:
     
     async def update_album(self, album_id: str, album_data: AlbumUpdate) -> AlbumResponse:
         """Update album"""
-        # Check if album exists
-        existing_album = await self.album_dao.find_by_id(album_id)
-        if not existing_album:
-            raise NotFoundException("Album not found")
-        
         # Update only provided fields
         update_dict = album_data.dict(exclude_unset=True)
         
         if update_dict:
-            await self.album_dao.update(album_id, update_dict)
+            updated_album = await self.album_dao.update_returning(album_id, update_dict)
+        else:
+            updated_album = await self.album_dao.find_by_id(album_id)
         
-        # Fetch and return updated album
-        updated_album = await self.album_dao.find_by_id(album_id)
+        if not updated_album:
+            raise NotFoundException("Album not found")
         return self._convert_to_response(updated_album)
     
     async def delete_album(self, album_id: str) -> bool:
@@ -59,18 +54,30 @@ class AlbumService:
         
         return await self.album_dao.delete(album_id)
     
-    async def list_albums_by_event(self, event_id: str, page: int = 1, limit: int = 20) -> tuple[List[AlbumResponse], int]:
-        """List albums for an event"""
-        # Verify event exists
-        event = await self.event_dao.find_by_id(event_id)
+    async def list_albums_by_event(
+        self,
+        event_id: str,
+        page: int = 1,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[List[AlbumResponse], Optional[int], Optional[str]]:
+        """List albums for an event, by page or after a cursor"""
+        # Verify event exists, fetch the page and count concurrently
+        skip = (page - 1) * limit
+        queries = [
+            self.event_dao.find_by_id(event_id),
+            self.album_dao.find_by_event_id(event_id, skip=skip, limit=limit, cursor=cursor)
+        ]
+        if include_total:
+            queries.append(self.album_dao.count({"event_id": event_id}))
+        event, (albums, next_cursor), *counts = await asyncio.gather(*queries)
         if not event:
             raise NotFoundException("Event not found")
         
-        skip = (page - 1) * limit
-        albums = await self.album_dao.find_by_event_id(event_id, skip=skip, limit=limit)
-        total = await self.album_dao.count({"event_id": event_id})
+        total = counts[0] if counts else None
         
-        return [self._convert_to_response(album) for album in albums], total
+        return [self._convert_to_response(album) for album in albums], total, next_cursor
     
     def _convert_to_response(self, album: dict) -> AlbumResponse:
         """Convert database document to response model"""
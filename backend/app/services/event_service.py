@@ -1,19 +1,29 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from io import BytesIO
+import asyncio
+import hashlib
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
 from app.dao.event_dao import EventDAO
 from app.dao.template_dao import TemplateDAO
 from app.models.event import EventCreate, EventUpdate, EventResponse
-from app.utils.exceptions import NotFoundException, ValidationException
-from app.utils.qr_generator import QRGenerator
-from app.utils.s3_helper import S3Helper
+from app.utils.exceptions import NotFoundException, ValidationException, InternalServerException
+from app.utils.qr_generator import (
+    render_event_assets, render_event_asset, RENDER_ASSETS, RENDER_MEDIA_TYPES, QR_SIZE, TEMPLATE_SIZE
+)
+from app.utils.render_cache import render_cache
+from app.utils.process_pool import run_in_process
+from app.utils.storage import get_storage
 from datetime import datetime
 import os
 
+EVENT_CODE_MAX_ATTEMPTS = 5
+
 class EventService:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.event_dao = EventDAO(db)
         self.template_dao = TemplateDAO(db)
-        self.s3_helper = S3Helper()
+        self.storage = get_storage()
     
     async def create_event(self, event_data: EventCreate) -> EventResponse:
         """Create a new event"""
@@ -22,48 +32,58 @@ class EventService:
         if not template:
             raise NotFoundException("Template not found")
         
-        # Generate unique event code
-        event_code = await self.event_dao.generate_unique_event_code()
+        # Insert with a fresh random code and retry on the rare unique index conflict
+        for _ in range(EVENT_CODE_MAX_ATTEMPTS):
+            event_code = self.event_dao.generate_event_code()
+            event_dict, asset_keys = await self._build_event_document(event_data, event_code)
+            try:
+                created_event = await self.event_dao.create_returning(event_dict)
+                break
+            except DuplicateKeyError as e:
+                await asyncio.gather(*(self.storage.delete_file(key) for key in asset_keys))
+                if not self.event_dao.is_event_code_conflict(e):
+                    raise
+        else:
+            raise InternalServerException("Could not allocate a unique event code")
         
-        # Generate QR code with event URL
-        frontend_url = os.getenv('FRONTEND_URL', 'http://localhost:3000')
-        event_url = f"{frontend_url}/event/{event_code}"
-        qr_buffer = QRGenerator.generate_qr_code(event_url)
-        
-        # Upload QR code to S3
-        qr_s3_key = self.s3_helper.generate_s3_key(event_code, "qr_code.png", folder="qr_codes")
-        qr_url = await self.s3_helper.upload_file(qr_buffer, qr_s3_key, "image/png")
-        
-        # Generate event template image
-        template_buffer = QRGenerator.generate_event_template(
-            event_name=event_data.event_name,
-            event_date=event_data.event_date.strftime("%B %d, %Y"),
-            event_code=event_code,
-            qr_data=event_url,
-            template_type=event_data.event_type
+        # Increment template usage count
+        await self.template_dao.increment_usage_count(event_data.template_id)
+        
+        return self._convert_to_response(created_event)
+    
+    async def _build_event_document(self, event_data: EventCreate, event_code: str) -> Tuple[dict, List[str]]:
+        """Render and upload an event's QR code and template, and build its document
+        
+        Returns the document and the storage keys of the uploaded assets.
+        """
+        # Build the event URL encoded in the QR code
+        event_url = self._event_url(event_code)
+        
+        # Render QR code and event template image off the event loop
+        qr_png, template_png = await run_in_process(
+            render_event_assets,
+            event_data.event_name,
+            event_data.event_date.strftime("%B %d, %Y"),
+            event_code,
+            event_url,
+            event_data.event_type
         )
         
-        # Upload template to S3
-        template_s3_key = self.s3_helper.generate_s3_key(event_code, "template.png", folder="templates")
-        template_url = await self.s3_helper.upload_file(template_buffer, template_s3_key, "image/png")
+        # Upload both to S3
+        qr_s3_key = self.storage.generate_key(event_code, "qr_code.png", folder="qr_codes")
+        template_s3_key = self.storage.generate_key(event_code, "template.png", folder="templates")
+        qr_url, template_url = await asyncio.gather(
+            self.storage.upload_file(BytesIO(qr_png), qr_s3_key, "image/png"),
+            self.storage.upload_file(BytesIO(template_png), template_s3_key, "image/png")
+        )
         
-        # Create event document
         event_dict = event_data.dict()
         event_dict['event_code'] = event_code
         event_dict['qr_code_url'] = qr_url
         event_dict['template_image_url'] = template_url
         event_dict['total_images'] = 0
         event_dict['is_active'] = True
-        
-        # Save to database
-        event_id = await self.event_dao.create(event_dict)
-        
-        # Increment template usage count
-        await self.template_dao.increment_usage_count(event_data.template_id)
-        
-        # Fetch and return created event
-        created_event = await self.event_dao.find_by_id(event_id)
-        return self._convert_to_response(created_event)
+        return event_dict, [qr_s3_key, template_s3_key]
     
     async def get_event(self, event_id: str) -> EventResponse:
         """Get event by ID"""
@@ -79,21 +99,73 @@ class EventService:
             raise NotFoundException("Event not found")
         return self._convert_to_response(event)
     
-    async def update_event(self, event_id: str, event_data: EventUpdate) -> EventResponse:
-        """Update event"""
-        # Check if event exists
-        existing_event = await self.event_dao.find_by_id(event_id)
-        if not existing_event:
+    async def render_asset(
+        self,
+        event_code: str,
+        asset: str,
+        image_format: str = "png",
+        size: Optional[int] = None,
+        if_none_match: Optional[str] = None
+    ) -> Tuple[str, Optional[bytes]]:
+        """Render an event's QR code or template on demand
+        
+        Returns a strong ETag and the rendered bytes, or None instead of the bytes
+        when if_none_match already names the current version. Renders are cached
+        by the event's updated_at, so editing the event invalidates them.
+        """
+        if asset not in RENDER_ASSETS:
+            raise ValidationException(f"Asset must be one of: {', '.join(RENDER_ASSETS)}")
+        if image_format not in RENDER_MEDIA_TYPES:
+            raise ValidationException(f"Format must be one of: {', '.join(RENDER_MEDIA_TYPES)}")
+        
+        event = await self.event_dao.find_by_event_code(event_code)
+        if not event:
             raise NotFoundException("Event not found")
         
+        if asset == "qr":
+            size = size or QR_SIZE
+        elif image_format == "svg":
+            # The SVG template is drawn at its own size, so any requested size renders the same bytes
+            size = None
+        else:
+            # The template is drawn at TEMPLATE_SIZE, so larger sizes would only upscale it
+            size = min(size or TEMPLATE_SIZE[0], TEMPLATE_SIZE[0])
+        version = event.get('updated_at') or event['created_at']
+        cache_key = (event_code, version.isoformat(), asset, image_format, size)
+        etag = '"' + hashlib.sha256(repr(cache_key).encode()).hexdigest()[:32] + '"'
+        
+        if if_none_match and self._etag_matches(if_none_match, etag):
+            return etag, None
+        
+        content = render_cache.get(cache_key)
+        if content is None:
+            content = await run_in_process(
+                render_event_asset,
+                asset,
+                image_format,
+                size,
+                event['event_name'],
+                event['event_date'].strftime("%B %d, %Y"),
+                event_code,
+                self._event_url(event_code),
+                event['event_type'],
+                version
+            )
+            render_cache.put(cache_key, content)
+        return etag, content
+    
+    async def update_event(self, event_id: str, event_data: EventUpdate) -> EventResponse:
+        """Update event"""
         # Update only provided fields
         update_dict = event_data.dict(exclude_unset=True)
         
         if update_dict:
-            await self.event_dao.update(event_id, update_dict)
+            updated_event = await self.event_dao.update_returning(event_id, update_dict)
+        else:
+            updated_event = await self.event_dao.find_by_id(event_id)
         
-        # Fetch and return updated event
-        updated_event = await self.event_dao.find_by_id(event_id)
+        if not updated_event:
+            raise NotFoundException("Event not found")
         return self._convert_to_response(updated_event)
     
     async def delete_event(self, event_id: str) -> bool:
@@ -105,21 +177,52 @@ class EventService:
         await self.event_dao.update(event_id, {"is_active": False})
         return True
     
-    async def list_events(self, page: int = 1, limit: int = 20) -> tuple[List[EventResponse], int]:
-        """List all active events"""
+    async def list_events(
+        self,
+        page: int = 1,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[List[EventResponse], Optional[int], Optional[str]]:
+        """List all active events, by page or after a cursor"""
         skip = (page - 1) * limit
-        events = await self.event_dao.find_active_events(skip=skip, limit=limit)
-        total = await self.event_dao.count({"is_active": True})
+        page_query = self.event_dao.find_active_events(skip=skip, limit=limit, cursor=cursor)
+        (events, next_cursor), total = await self._with_total(page_query, {"is_active": True}, include_total)
         
-        return [self._convert_to_response(event) for event in events], total
+        return [self._convert_to_response(event) for event in events], total, next_cursor
     
-    async def list_events_by_host(self, phone: str, page: int = 1, limit: int = 20) -> tuple[List[EventResponse], int]:
-        """List events by host phone number"""
+    async def list_events_by_host(
+        self,
+        phone: str,
+        page: int = 1,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[List[EventResponse], Optional[int], Optional[str]]:
+        """List events by host phone number, by page or after a cursor"""
         skip = (page - 1) * limit
-        events = await self.event_dao.find_by_host_phone(phone, skip=skip, limit=limit)
-        total = await self.event_dao.count({"host_phone": phone})
+        page_query = self.event_dao.find_by_host_phone(phone, skip=skip, limit=limit, cursor=cursor)
+        (events, next_cursor), total = await self._with_total(page_query, {"host_phone": phone}, include_total)
         
-        return [self._convert_to_response(event) for event in events], total
+        return [self._convert_to_response(event) for event in events], total, next_cursor
+    
+    async def _with_total(self, page_query, count_filter: dict, include_total: bool) -> tuple:
+        """Await a page query, counting matching events concurrently when the total is wanted"""
+        if not include_total:
+            return await page_query, None
+        return await asyncio.gather(page_query, self.event_dao.count(count_filter))
+    
+    def _event_url(self, event_code: str) -> str:
+        """Build the public event URL encoded in QR codes"""
+        frontend_url = os.getenv('FRONTEND_URL', 'http://localhost:3000')
+        return f"{frontend_url}/event/{event_code}"
+    
+    def _etag_matches(self, if_none_match: str, etag: str) -> bool:
+        """Check an If-None-Match header against an ETag using weak comparison"""
+        if if_none_match.strip() == '*':
+            return True
+        candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+        return etag in [candidate[2:] if candidate.startswith('W/') else candidate for candidate in candidates]
     
     def _convert_to_response(self, event: dict) -> EventResponse:
         """Convert database document to response model"""
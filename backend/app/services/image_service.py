@@ -1,18 +1,51 @@
-from typing import List, Optional, BinaryIO
+from typing import List, Optional, BinaryIO, Dict, Tuple
+from datetime import datetime
+from io import BytesIO
+import asyncio
+import os
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.dao.base_dao import as_stored
 from app.dao.image_dao import ImageDAO
 from app.dao.event_dao import EventDAO
 from app.dao.album_dao import AlbumDAO
-from app.models.image import ImageCreate, ImageUpdate, ImageResponse
-from app.utils.exceptions import NotFoundException, ValidationException
-from app.utils.s3_helper import S3Helper
+from app.models.image import (
+    ImageCreate, ImageUpdate, ImageResponse, PresignedUploadFile, FinalizeUploadFile
+)
+from app.utils.exceptions import (
+    AppException, NotFoundException, ValidationException, InternalServerException,
+    BadRequestException, ConflictException
+)
+from app.utils.image_inspector import inspect_image
+from app.utils.storage import get_storage, hash_stream
+from app.utils.process_pool import run_in_process
+from app.utils.image_processing import generate_derivatives, DERIVATIVE_CONTENT_TYPES
+from app.utils.job_queue import job_queue
+from app.utils.counter_aggregator import counter_aggregator
+from app.utils.insert_batcher import insert_batcher
+
+BATCH_UPLOAD_CONCURRENCY = int(os.getenv('BATCH_UPLOAD_CONCURRENCY', 4))
+PRESIGNED_UPLOAD_EXPIRATION = int(os.getenv('PRESIGNED_UPLOAD_EXPIRATION', 900))  # 15 minutes
+DERIVATIVE_FORMAT = os.getenv('DERIVATIVE_FORMAT', 'WEBP').upper()
+DERIVATIVE_QUALITY = int(os.getenv('DERIVATIVE_QUALITY', 80))
+
+class DuplicateImage:
+    """Batch outcome for a file whose bytes are already stored as an image in the event"""
+    def __init__(self, image: dict):
+        self.image = image
+
+def inspect_upload(file_obj: BinaryIO) -> tuple:
+    """Validate an upload from its header and hash its bytes, in one pass off the event loop"""
+    metadata = inspect_image(file_obj)
+    return metadata, hash_stream(file_obj)
 
 class ImageService:
     def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
         self.image_dao = ImageDAO(db)
         self.event_dao = EventDAO(db)
         self.album_dao = AlbumDAO(db)
-        self.s3_helper = S3Helper()
+        self.storage = get_storage()
     
     async def upload_image(
         self,
@@ -20,30 +53,408 @@ class ImageService:
         file_obj: BinaryIO,
         filename: str,
         file_size: int,
-        mime_type: str,
-        album_id: Optional[str] = None
+        album_id: Optional[str] = None,
+        max_size: Optional[int] = None
     ) -> ImageResponse:
-        """Upload an image"""
-        # Verify event exists
-        event = await self.event_dao.find_by_id(event_id)
+        """Upload an image, streaming the file object to storage
+        
+        The file is validated from its header before anything is stored, and the
+        sniffed type replaces the client supplied one. Uploading bytes that are
+        already stored for the event returns the existing image without another
+        storage write, placed in the requested album by _place_duplicate.
+        """
+        metadata, content_hash = await asyncio.to_thread(inspect_upload, file_obj)
+        
+        # Verify the event and album and look for the same bytes in one round trip
+        _, existing_image = await asyncio.gather(
+            self.verify_event_and_album(event_id, album_id),
+            self.image_dao.find_by_event_and_hash(event_id, content_hash)
+        )
+        if existing_image:
+            return self._convert_to_response(await self._place_duplicate(existing_image, album_id), duplicate=True)
+        
+        image_dict = await self._store_image(
+            event_id, file_obj, filename, file_size, album_id, max_size, content_hash, metadata
+        )
+        try:
+            # Shielded so a cancelled request cannot leave the image inserted but uncounted
+            created_image = await asyncio.shield(self._record_image(image_dict))
+        except DuplicateKeyError:
+            # A concurrent upload of the same bytes was recorded first
+            existing_image = await self.image_dao.find_by_event_and_hash(event_id, content_hash)
+            return self._convert_to_response(await self._place_duplicate(existing_image, album_id), duplicate=True)
+        
+        return self._convert_to_response(created_image)
+    
+    async def _record_image(self, image_dict: dict) -> dict:
+        """Insert a stored image, then queue its derivatives and increment counters concurrently
+        
+        The enqueue waits for the insert: a job queued alongside it could be claimed
+        before the image exists, or outlive an insert that lost a duplicate race.
+        With write-behind counters this is the upload's third and last round trip,
+        after the overlapped event, album and duplicate lookups and the insert.
+        """
+        if insert_batcher.running:
+            # Share one insert_many with other requests' uploads
+            await insert_batcher.insert(self.image_dao, image_dict)
+            created_image = as_stored(image_dict)
+        else:
+            created_image = await self.image_dao.create_returning(image_dict)
+        
+        album_id = created_image.get('album_id')
+        await asyncio.gather(
+            job_queue.enqueue(self.db, "image.derivatives", {"image_id": str(created_image['_id'])}),
+            self._apply_counter_deltas({created_image['event_id']: 1}, {album_id: 1} if album_id else {})
+        )
+        return created_image
+    
+    async def upload_images_batch(
+        self,
+        event_id: str,
+        files: List[dict],
+        album_id: Optional[str] = None,
+        max_size: Optional[int] = None
+    ) -> List[dict]:
+        """Upload several images with one metadata insert and one counter update per collection
+        
+        Each item in files holds file_obj, filename and file_size. Returns one result
+        per file, in order, so a failed upload does not fail the whole batch.
+        """
+        await self.verify_event_and_album(event_id, album_id)
+        
+        inspected = await asyncio.gather(*(
+            asyncio.to_thread(inspect_upload, item['file_obj']) for item in files
+        ), return_exceptions=True)
+        content_hashes = [
+            None if isinstance(outcome, BaseException) else outcome[1] for outcome in inspected
+        ]
+        new_hashes = list({content_hash for content_hash in content_hashes if content_hash})
+        existing_images = {
+            image['content_hash']: image
+            for image in await self.image_dao.find_by_event_and_hashes(event_id, new_hashes)
+        }
+        
+        # Store each new content hash once; repeats in the batch share the first file's outcome
+        first_positions = {}
+        for position, content_hash in enumerate(content_hashes):
+            if content_hash and content_hash not in existing_images:
+                first_positions.setdefault(content_hash, position)
+        
+        semaphore = asyncio.Semaphore(BATCH_UPLOAD_CONCURRENCY)
+        
+        async def store(position: int) -> dict:
+            item = files[position]
+            async with semaphore:
+                return await self._store_image(
+                    event_id,
+                    item['file_obj'],
+                    item['filename'],
+                    item['file_size'],
+                    album_id,
+                    max_size,
+                    content_hashes[position],
+                    inspected[position][0]
+                )
+        
+        positions = list(first_positions.values())
+        stored = await asyncio.gather(*(store(position) for position in positions), return_exceptions=True)
+        stored_by_hash = {content_hashes[position]: outcome for position, outcome in zip(positions, stored)}
+        
+        outcomes = []
+        for position, content_hash in enumerate(content_hashes):
+            if content_hash is None:
+                outcomes.append(inspected[position])
+            elif content_hash in existing_images:
+                outcomes.append(DuplicateImage(existing_images[content_hash]))
+            elif first_positions[content_hash] == position:
+                outcomes.append(stored_by_hash[content_hash])
+            elif isinstance(stored_by_hash[content_hash], BaseException):
+                outcomes.append(stored_by_hash[content_hash])
+            else:
+                outcomes.append(DuplicateImage(stored_by_hash[content_hash]))
+        
+        return await self._record_batch(event_id, album_id, [item['filename'] for item in files], outcomes)
+    
+    async def create_presigned_uploads(
+        self,
+        event_id: str,
+        files: List[PresignedUploadFile],
+        album_id: Optional[str] = None,
+        max_size: Optional[int] = None,
+        expiration: int = PRESIGNED_UPLOAD_EXPIRATION
+    ) -> List[dict]:
+        """Issue presigned POSTs so clients can upload straight to storage"""
+        if not self.storage.supports_direct_upload:
+            raise BadRequestException("Direct uploads are not supported by the configured storage backend")
+        await self.verify_event_and_album(event_id, album_id)
+        
+        async def presign(file: PresignedUploadFile) -> dict:
+            s3_key = self.storage.generate_key(event_id, file.filename)
+            presigned = await self.storage.generate_presigned_post(
+                s3_key,
+                file.content_type,
+                max_size if max_size is not None else file.file_size,
+                expiration
+            )
+            return {
+                "filename": file.filename,
+                "s3_key": s3_key,
+                "url": presigned['url'],
+                "fields": presigned['fields'],
+                "expires_in": expiration
+            }
+        
+        return list(await asyncio.gather(*(presign(file) for file in files)))
+    
+    async def finalize_uploads(
+        self,
+        event_id: str,
+        files: List[FinalizeUploadFile],
+        album_id: Optional[str] = None,
+        max_size: Optional[int] = None,
+        allowed_types: Optional[List[str]] = None
+    ) -> List[dict]:
+        """Record images that clients uploaded directly to storage after checking each object exists
+        
+        Keys that were already finalized, by an earlier or a concurrent request, return
+        the recorded image as a duplicate so retries do not double count.
+        """
+        await self.verify_event_and_album(event_id, album_id)
+        
+        # Verify each key once; repeats in the request share the first file's outcome
+        first_positions = {}
+        for position, file in enumerate(files):
+            first_positions.setdefault(file.s3_key, position)
+        recorded_images = {
+            image['s3_key']: image
+            for image in await self.image_dao.find_by_s3_keys(list(first_positions))
+        }
+        key_prefix = f"images/{event_id}/"
+        semaphore = asyncio.Semaphore(BATCH_UPLOAD_CONCURRENCY)
+        
+        async def verify(file: FinalizeUploadFile):
+            if not file.s3_key.startswith(key_prefix):
+                raise ValidationException("File does not belong to this event")
+            if file.s3_key in recorded_images:
+                return DuplicateImage(recorded_images[file.s3_key])
+            
+            async with semaphore:
+                metadata = await self.storage.head_file(file.s3_key)
+            if metadata is None:
+                raise NotFoundException("Uploaded file not found")
+            
+            file_size = metadata['size']
+            mime_type = metadata['content_type']
+            if max_size is not None and file_size > max_size:
+                raise ValidationException(f"File size exceeds {max_size // (1024 * 1024)}MB limit")
+            if allowed_types is not None and mime_type not in allowed_types:
+                raise ValidationException(f"File type {mime_type} not allowed")
+            
+            return self._build_image_document(
+                event_id,
+                file.filename,
+                file_size,
+                mime_type,
+                file.s3_key,
+                self.storage.get_public_url(file.s3_key),
+                album_id
+            )
+        
+        verified = await asyncio.gather(
+            *(verify(files[position]) for position in first_positions.values()),
+            return_exceptions=True
+        )
+        verified_by_key = dict(zip(first_positions, verified))
+        
+        outcomes = []
+        for position, file in enumerate(files):
+            outcome = verified_by_key[file.s3_key]
+            if first_positions[file.s3_key] == position or isinstance(outcome, BaseException):
+                outcomes.append(outcome)
+            elif isinstance(outcome, DuplicateImage):
+                outcomes.append(DuplicateImage(outcome.image))
+            else:
+                outcomes.append(DuplicateImage(outcome))
+        return await self._record_batch(event_id, album_id, [file.filename for file in files], outcomes)
+    
+    async def _record_batch(
+        self,
+        event_id: str,
+        album_id: Optional[str],
+        filenames: List[str],
+        outcomes: List
+    ) -> List[dict]:
+        """Insert stored image documents at once, bump counters by N and build per-file results
+        
+        Each outcome is a new image document, a DuplicateImage or the exception that
+        stopped that file.
+        """
+        image_dicts = [outcome for outcome in outcomes if isinstance(outcome, dict)]
+        if image_dicts:
+            try:
+                await self.image_dao.create_many(image_dicts, ordered=False)
+            except BulkWriteError as e:
+                outcomes = await self._resolve_insert_errors(event_id, outcomes, image_dicts, e)
+                image_dicts = [outcome for outcome in outcomes if isinstance(outcome, dict)]
+        
+        if image_dicts:
+            await asyncio.gather(
+                job_queue.enqueue_many(
+                    self.db,
+                    "image.derivatives",
+                    [{"image_id": str(image['_id'])} for image in image_dicts]
+                ),
+                self._apply_counter_deltas(
+                    {event_id: len(image_dicts)},
+                    {album_id: len(image_dicts)} if album_id else {}
+                )
+            )
+        
+        # Place each distinct duplicate once, even when several files in the batch repeat it
+        duplicates = {
+            str(outcome.image['_id']): outcome.image
+            for outcome in outcomes if isinstance(outcome, DuplicateImage)
+        }
+        placed = await asyncio.gather(*(
+            self._place_duplicate(image, album_id) for image in duplicates.values()
+        ), return_exceptions=True)
+        placed = dict(zip(duplicates, placed))
+        for position, outcome in enumerate(outcomes):
+            if isinstance(outcome, DuplicateImage):
+                image = placed[str(outcome.image['_id'])]
+                outcomes[position] = image if isinstance(image, BaseException) else DuplicateImage(image)
+        
+        results = []
+        for filename, outcome in zip(filenames, outcomes):
+            if isinstance(outcome, BaseException):
+                message = outcome.message if isinstance(outcome, AppException) else str(outcome)
+                results.append({"filename": filename, "success": False, "error": message})
+            elif isinstance(outcome, DuplicateImage):
+                results.append({
+                    "filename": filename,
+                    "success": True,
+                    "data": self._convert_to_response(outcome.image, duplicate=True).dict()
+                })
+            else:
+                results.append({
+                    "filename": filename,
+                    "success": True,
+                    "data": self._convert_to_response(as_stored(outcome)).dict()
+                })
+        return results
+    
+    async def _resolve_insert_errors(
+        self,
+        event_id: str,
+        outcomes: List,
+        image_dicts: List[dict],
+        error: BulkWriteError
+    ) -> List:
+        """Replace outcomes of documents that failed to insert in an unordered insert_many"""
+        failed = {}
+        for write_error in error.details.get('writeErrors', []):
+            image = image_dicts[write_error['index']]
+            if write_error.get('code') == 11000:
+                # A concurrent upload of the same bytes, or finalize of the same key, was recorded first
+                if image.get('content_hash'):
+                    existing_image = await self.image_dao.find_by_event_and_hash(event_id, image['content_hash'])
+                else:
+                    existing_image = await self.image_dao.find_by_s3_key(image['s3_key'])
+                if existing_image:
+                    failed[id(image)] = DuplicateImage(existing_image)
+                    continue
+            failed[id(image)] = InternalServerException(write_error.get('errmsg', "Failed to save image"))
+        
+        resolved = []
+        for outcome in outcomes:
+            if isinstance(outcome, dict) and id(outcome) in failed:
+                resolved.append(failed[id(outcome)])
+            elif isinstance(outcome, DuplicateImage) and id(outcome.image) in failed:
+                replacement = failed[id(outcome.image)]
+                resolved.append(replacement if isinstance(replacement, BaseException) else DuplicateImage(replacement.image))
+            else:
+                resolved.append(outcome)
+        return resolved
+    
+    async def _apply_counter_deltas(self, event_deltas: Dict[str, int], album_deltas: Dict[str, int]) -> None:
+        """Apply image count changes with at most one bulk write per collection, run concurrently
+        
+        While the counter aggregator is running the changes are buffered and written
+        with other requests' changes instead.
+        """
+        if counter_aggregator.running:
+            counter_aggregator.add(self.event_dao, "total_images", event_deltas)
+            counter_aggregator.add(self.album_dao, "image_count", album_deltas)
+            return
+        
+        await asyncio.gather(
+            self.event_dao.apply_image_count_deltas(event_deltas),
+            self.album_dao.apply_image_count_deltas(album_deltas)
+        )
+    
+    async def verify_event_and_album(self, event_id: str, album_id: Optional[str]) -> None:
+        """Verify event exists and album, if provided, belongs to it"""
+        lookups = [self.event_dao.find_by_id(event_id)]
+        if album_id:
+            lookups.append(self.album_dao.find_by_id(album_id))
+        event, *albums = await asyncio.gather(*lookups)
         if not event:
             raise NotFoundException("Event not found")
         
-        # Verify album if provided
         if album_id:
-            album = await self.album_dao.find_by_id(album_id)
+            album = albums[0]
             if not album:
                 raise NotFoundException("Album not found")
             
             # Verify album belongs to event
             if album['event_id'] != event_id:
                 raise ValidationException("Album does not belong to this event")
+    
+    async def _store_image(
+        self,
+        event_id: str,
+        file_obj: BinaryIO,
+        filename: str,
+        file_size: int,
+        album_id: Optional[str] = None,
+        max_size: Optional[int] = None,
+        content_hash: Optional[str] = None,
+        metadata: Optional[dict] = None
+    ) -> dict:
+        """Stream an inspected image to storage and build its document"""
+        s3_key = self.storage.generate_key(event_id, filename, content_hash=content_hash)
+        s3_url = await self.storage.upload_stream(
+            file_obj,
+            s3_key,
+            content_length=file_size,
+            content_type=metadata['mime_type'],
+            max_size=max_size
+        )
         
-        # Generate S3 key and upload
-        s3_key = self.s3_helper.generate_s3_key(event_id, filename)
-        s3_url = await self.s3_helper.upload_file(file_obj, s3_key, mime_type)
-        
-        # Create image document
+        image_dict = self._build_image_document(
+            event_id, filename, file_size, metadata['mime_type'], s3_key, s3_url, album_id
+        )
+        image_dict.update(
+            width=metadata['width'],
+            height=metadata['height'],
+            orientation=metadata['orientation'],
+            taken_at=metadata['taken_at']
+        )
+        if content_hash:
+            image_dict['content_hash'] = content_hash
+        return image_dict
+    
+    def _build_image_document(
+        self,
+        event_id: str,
+        filename: str,
+        file_size: int,
+        mime_type: str,
+        s3_key: str,
+        s3_url: str,
+        album_id: Optional[str] = None
+    ) -> dict:
+        """Build the document for a stored image"""
         image_data = ImageCreate(
             event_id=event_id,
             album_id=album_id,
@@ -54,17 +465,43 @@ class ImageService:
             s3_key=s3_key,
             s3_url=s3_url
         )
+        image_dict = image_data.dict()
+        image_dict['uploaded_at'] = datetime.utcnow()
+        return image_dict
+    
+    async def generate_image_derivatives(self, image_id: str) -> None:
+        """Create resized derivatives and a placeholder for an uploaded image and record them"""
+        image = await self.image_dao.find_by_id(image_id)
+        if not image:
+            raise NotFoundException("Image not found")
+        
+        original = await self.storage.download_file(image['s3_key'])
+        derivatives, placeholder = await run_in_process(
+            generate_derivatives,
+            original,
+            DERIVATIVE_FORMAT,
+            DERIVATIVE_QUALITY
+        )
+        del original
         
-        image_id = await self.image_dao.create(image_data.dict())
+        content_type = DERIVATIVE_CONTENT_TYPES[DERIVATIVE_FORMAT]
+        extension = '.jpg' if DERIVATIVE_FORMAT == 'JPEG' else f".{DERIVATIVE_FORMAT.lower()}"
+        key_stem = os.path.splitext(image['s3_key'].split('/', 1)[1])[0]
         
-        # Increment counters
-        await self.event_dao.increment_image_count(event_id)
-        if album_id:
-            await self.album_dao.increment_image_count(album_id)
+        async def store(name: str, data: bytes) -> tuple:
+            s3_key = f"derivatives/{key_stem}_{name}{extension}"
+            s3_url = await self.storage.upload_file(BytesIO(data), s3_key, content_type)
+            return name, s3_key, s3_url
         
-        # Fetch and return created image
-        created_image = await self.image_dao.find_by_id(image_id)
-        return self._convert_to_response(created_image)
+        stored = await asyncio.gather(*(store(name, data) for name, data in derivatives.items()))
+        
+        derivative_urls = {name: s3_url for name, _, s3_url in stored}
+        await self.image_dao.update(image_id, {
+            "derivatives": derivative_urls,
+            "derivative_keys": [s3_key for _, s3_key, _ in stored],
+            "thumbnail_url": derivative_urls.get("thumb"),
+            "placeholder": placeholder
+        })
     
     async def get_image(self, image_id: str) -> ImageResponse:
         """Get image by ID"""
@@ -73,62 +510,128 @@ class ImageService:
             raise NotFoundException("Image not found")
         return self._convert_to_response(image)
     
-    async def delete_image(self, image_id: str) -> bool:
-        """Delete image"""
-        image = await self.image_dao.find_by_id(image_id)
+    async def delete_image(self, image_id: str) -> dict:
+        """Delete image
+        
+        Returns the number of its files left for the storage.cleanup job to delete.
+        """
+        # Delete from database first so concurrent deletes decrement the counters once
+        image = await self.image_dao.delete_returning(image_id)
         if not image:
             raise NotFoundException("Image not found")
         
-        # Delete from S3
-        await self.s3_helper.delete_file(image['s3_key'])
+        # Delete original and derivatives from storage while decrementing counters
+        album_id = image.get('album_id')
+        failed_keys, _ = await asyncio.gather(
+            self._delete_stored_files([image]),
+            self._apply_counter_deltas({image['event_id']: -1}, {album_id: -1} if album_id else {})
+        )
+        return {"files_pending_cleanup": len(failed_keys)}
+    
+    async def _delete_stored_files(self, images: List[dict]) -> List[str]:
+        """Delete the files of deleted images and queue a storage.cleanup job for those that failed
+        
+        The images are already gone, so a storage failure must not fail the request.
+        Returns the keys left for the job.
+        """
+        files = {image['s3_key']: [image['s3_key'], *image.get('derivative_keys', [])] for image in images}
+        failed = await self._delete_unreferenced_files(files)
+        failed_keys = [key for keys in failed.values() for key in keys]
+        if failed_keys:
+            try:
+                await job_queue.enqueue(self.db, "storage.cleanup", {
+                    "files": [{"s3_key": s3_key, "keys": keys} for s3_key, keys in failed.items()]
+                })
+            except Exception as e:
+                print(f"Failed to queue cleanup of {len(failed_keys)} files {failed_keys}: {str(e)}")
+        return failed_keys
+    
+    async def _delete_unreferenced_files(self, files: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Delete files grouped by the original s3_key they belong to, skipping originals still in use
         
-        # Decrement counters
-        await self.event_dao.decrement_image_count(image['event_id'])
-        if image.get('album_id'):
-            await self.album_dao.decrement_image_count(image['album_id'])
+        Keys are content-addressed and derivative keys are derived from the original,
+        so an upload of the same bytes to the event after the delete reuses all of
+        them. Returns the keys that could not be deleted, by original.
+        """
+        if not files:
+            return {}
+        live = {image['s3_key'] for image in await self.image_dao.find_by_s3_keys(list(files))}
+        failed_keys = set(await self.storage.delete_files([
+            key for s3_key, keys in files.items() if s3_key not in live for key in keys
+        ]))
+        failed = {}
+        for s3_key, keys in files.items():
+            keys = [key for key in keys if key in failed_keys]
+            if keys:
+                failed[s3_key] = keys
+        return failed
+    
+    async def cleanup_stored_files(self, files: List[dict]) -> None:
+        """Retry deleting files of deleted images, raising so the job is retried while any remain
         
-        # Delete from database
-        return await self.image_dao.delete(image_id)
+        Each entry holds the original s3_key and the keys left to delete for it.
+        """
+        failed = await self._delete_unreferenced_files({entry['s3_key']: entry['keys'] for entry in files})
+        if failed:
+            failed_keys = sum(len(keys) for keys in failed.values())
+            raise InternalServerException(f"Failed to delete {failed_keys} files")
     
     async def list_images_by_event(
         self,
         event_id: str,
         page: int = 1,
-        limit: int = 50
-    ) -> tuple[List[ImageResponse], int]:
-        """List all images for an event"""
-        # Verify event exists
-        event = await self.event_dao.find_by_id(event_id)
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[List[ImageResponse], Optional[int], Optional[str]]:
+        """List images for an event, by page or after a cursor
+        
+        The total comes from the event's maintained image counter, so no count query is run.
+        """
+        # Verify event exists while the page is fetched
+        skip = (page - 1) * limit
+        event, (images, next_cursor) = await asyncio.gather(
+            self.event_dao.find_by_id(event_id),
+            self.image_dao.find_by_event_id(event_id, skip=skip, limit=limit, cursor=cursor)
+        )
         if not event:
             raise NotFoundException("Event not found")
         
-        skip = (page - 1) * limit
-        images = await self.image_dao.find_by_event_id(event_id, skip=skip, limit=limit)
-        total = await self.image_dao.count_by_event(event_id)
+        total = event.get('total_images', 0) if include_total else None
         
-        return [self._convert_to_response(image) for image in images], total
+        return [self._convert_to_response(image) for image in images], total, next_cursor
     
     async def list_images_by_album(
         self,
         album_id: str,
         page: int = 1,
-        limit: int = 50
-    ) -> tuple[List[ImageResponse], int]:
-        """List all images in an album"""
-        # Verify album exists
-        album = await self.album_dao.find_by_id(album_id)
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[List[ImageResponse], Optional[int], Optional[str]]:
+        """List images in an album, by page or after a cursor
+        
+        The total comes from the album's maintained image counter, so no count query is run.
+        """
+        # Verify album exists while the page is fetched
+        skip = (page - 1) * limit
+        album, (images, next_cursor) = await asyncio.gather(
+            self.album_dao.find_by_id(album_id),
+            self.image_dao.find_by_album_id(album_id, skip=skip, limit=limit, cursor=cursor)
+        )
         if not album:
             raise NotFoundException("Album not found")
         
-        skip = (page - 1) * limit
-        images = await self.image_dao.find_by_album_id(album_id, skip=skip, limit=limit)
-        total = await self.image_dao.count_by_album(album_id)
+        total = album.get('image_count', 0) if include_total else None
         
-        return [self._convert_to_response(image) for image in images], total
+        return [self._convert_to_response(image) for image in images], total, next_cursor
     
     async def move_image_to_album(self, image_id: str, album_id: Optional[str]) -> ImageResponse:
         """Move image to a different album or remove from album"""
-        image = await self.image_dao.find_by_id(image_id)
+        lookups = [self.image_dao.find_by_id(image_id)]
+        if album_id:
+            lookups.append(self.album_dao.find_by_id(album_id))
+        image, *albums = await asyncio.gather(*lookups)
         if not image:
             raise NotFoundException("Image not found")
         
@@ -136,7 +639,7 @@ class ImageService:
         
         # Verify new album if provided
         if album_id:
-            album = await self.album_dao.find_by_id(album_id)
+            album = albums[0]
             if not album:
                 raise NotFoundException("Album not found")
             
@@ -144,20 +647,187 @@ class ImageService:
             if album['event_id'] != image['event_id']:
                 raise ValidationException("Album does not belong to the same event")
         
-        # Update image
-        await self.image_dao.update(image_id, {"album_id": album_id})
+        return self._convert_to_response(await self._move_image(image, album_id))
+    
+    async def _move_image(self, image: dict, album_id: Optional[str]) -> dict:
+        """Move an image that was read to album_id, or out of its album, and return it after the move"""
+        old_album_id = image.get('album_id')
+        if album_id == old_album_id:
+            return image
         
-        # Update album counters
+        # Only move the image from the album it was read in, so a concurrent move changes the counters once
+        image_id = str(image['_id'])
+        updated_image = await self.image_dao.update_returning(
+            image_id, {"album_id": album_id}, {"album_id": old_album_id}
+        )
+        if not updated_image:
+            if await self.image_dao.find_by_id(image_id):
+                raise ConflictException("Image was moved by another request, please retry")
+            raise NotFoundException("Image not found")
+        
+        # Update both album counters in one bulk write
+        album_deltas = {}
         if old_album_id:
-            await self.album_dao.decrement_image_count(old_album_id)
+            album_deltas[old_album_id] = -1
+        if album_id:
+            album_deltas[album_id] = 1
+        await self._apply_counter_deltas({}, album_deltas)
+        return updated_image
+    
+    async def _place_duplicate(self, image: dict, album_id: Optional[str]) -> dict:
+        """Put an image whose bytes were uploaded again into the album the upload asked for
+        
+        An image outside any album is moved into it. One in another album stays
+        there and the upload is a conflict, rather than the image silently keeping
+        its album or being taken out of it. Returns the image after any move.
+        """
+        if not album_id or image.get('album_id') == album_id:
+            return image
+        if image.get('album_id'):
+            raise ConflictException(
+                "Image already exists in another album",
+                details={"image_id": str(image['_id']), "album_id": image['album_id']}
+            )
+        return await self._move_image(image, album_id)
+    
+    async def move_images_to_album(self, image_ids: List[str], album_id: Optional[str]) -> dict:
+        """Move several images to an album, or out of their albums, with one update per source album
+        
+        Returns the number of images moved and the IDs that were not found.
+        """
+        image_ids = list(dict.fromkeys(image_ids))
+        lookups = [self.image_dao.find_by_ids(image_ids)]
+        if album_id:
+            lookups.append(self.album_dao.find_by_id(album_id))
+        images, *albums = await asyncio.gather(*lookups)
+        
+        # Verify new album if provided
+        if album_id:
+            album = albums[0]
+            if not album:
+                raise NotFoundException("Album not found")
+            
+            # Verify album belongs to the same event as every image
+            if any(image['event_id'] != album['event_id'] for image in images):
+                raise ValidationException("Album does not belong to the same event")
+        
+        # Filter each update on the source album so its modified count is exactly what that album loses
+        by_album = {}
+        for image in images:
+            if image.get('album_id') != album_id:
+                by_album.setdefault(image.get('album_id'), []).append(image['_id'])
+        old_album_ids = list(by_album)
+        moved = await asyncio.gather(*(
+            self.image_dao.update_many(
+                {"_id": {"$in": by_album[old_album_id]}, "album_id": old_album_id},
+                {"album_id": album_id}
+            )
+            for old_album_id in old_album_ids
+        ))
+        
+        album_deltas = {}
+        for old_album_id, count in zip(old_album_ids, moved):
+            if old_album_id:
+                album_deltas[old_album_id] = album_deltas.get(old_album_id, 0) - count
         if album_id:
-            await self.album_dao.increment_image_count(album_id)
+            album_deltas[album_id] = album_deltas.get(album_id, 0) + sum(moved)
+        await self._apply_counter_deltas({}, album_deltas)
         
-        # Fetch and return updated image
-        updated_image = await self.image_dao.find_by_id(image_id)
-        return self._convert_to_response(updated_image)
+        found_ids = {str(image['_id']) for image in images}
+        return {
+            "moved": sum(moved),
+            "not_found": [image_id for image_id in image_ids if image_id not in found_ids]
+        }
+    
+    async def delete_images(self, image_ids: List[str]) -> dict:
+        """Delete several images with one delete per event and album, then their files in bulk
+        
+        Returns the number of images deleted, the IDs that were not found and the
+        number of files left for the storage.cleanup job to delete.
+        """
+        image_ids = list(dict.fromkeys(image_ids))
+        images = await self.image_dao.find_by_ids(image_ids)
+        
+        # Filter each delete on event and album so its deleted count is exactly what those counters lose
+        groups = {}
+        for image in images:
+            groups.setdefault((image['event_id'], image.get('album_id')), []).append(image['_id'])
+        group_keys = list(groups)
+        deleted = await asyncio.gather(*(
+            self.image_dao.delete_many({"_id": {"$in": groups[key]}, "event_id": key[0], "album_id": key[1]})
+            for key in group_keys
+        ))
+        
+        # An image moved since it was read was not deleted, so keep its files
+        partial_groups = [groups[key] for key, count in zip(group_keys, deleted) if count < len(groups[key])]
+        if partial_groups:
+            remaining = await self.image_dao.find_by_ids([str(image_id) for ids in partial_groups for image_id in ids])
+            remaining_ids = {image['_id'] for image in remaining}
+            images = [image for image in images if image['_id'] not in remaining_ids]
+        
+        event_deltas, album_deltas = {}, {}
+        for (event_id, album_id), count in zip(group_keys, deleted):
+            event_deltas[event_id] = event_deltas.get(event_id, 0) - count
+            if album_id:
+                album_deltas[album_id] = album_deltas.get(album_id, 0) - count
+        
+        # Delete originals and derivatives in bulk while decrementing counters
+        failed_keys, _ = await asyncio.gather(
+            self._delete_stored_files(images),
+            self._apply_counter_deltas(event_deltas, album_deltas)
+        )
+        
+        found_ids = {str(image_id) for ids in groups.values() for image_id in ids}
+        return {
+            "deleted": sum(deleted),
+            "not_found": [image_id for image_id in image_ids if image_id not in found_ids],
+            "files_pending_cleanup": len(failed_keys)
+        }
+    
+    async def measure_image_count_drift(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Compare stored event and album image counts with counts of the images collection
+        
+        Counters are read before images are counted, so an image written in between
+        shows up as drift in this measurement rather than being hidden by it.
+        """
+        stored_events, stored_albums = await asyncio.gather(
+            self.event_dao.read_counter("total_images"),
+            self.album_dao.read_counter("image_count")
+        )
+        event_counts, album_counts = await asyncio.gather(
+            self.image_dao.count_per_event(),
+            self.image_dao.count_per_album()
+        )
+        return (
+            {event_id: event_counts.get(event_id, 0) - stored for event_id, stored in stored_events.items()},
+            {album_id: album_counts.get(album_id, 0) - stored for album_id, stored in stored_albums.items()}
+        )
+    
+    async def reconcile_image_counts(self, settle_time: float) -> dict:
+        """Repair event and album image counts whose drift persists across two measurements
+        
+        Writes in flight and increments still buffered in a worker's counter aggregator
+        look like drift in a single measurement. Only counts that drifted by the same
+        amount in two measurements settle_time apart are corrected, and by $inc, so
+        increments landing meanwhile are kept.
+        """
+        first_events, first_albums = await self.measure_image_count_drift()
+        await asyncio.sleep(settle_time)
+        events, albums = await self.measure_image_count_drift()
+        
+        event_repairs = {
+            event_id: drift for event_id, drift in events.items() if drift and first_events.get(event_id) == drift
+        }
+        album_repairs = {
+            album_id: drift for album_id, drift in albums.items() if drift and first_albums.get(album_id) == drift
+        }
+        events_repaired, albums_repaired = await asyncio.gather(
+            self.event_dao.apply_image_count_deltas(event_repairs),
+            self.album_dao.apply_image_count_deltas(album_repairs)
+        )
+        return {"events": events_repaired, "albums": albums_repaired}
     
-    def _convert_to_response(self, image: dict) -> ImageResponse:
+    def _convert_to_response(self, image: dict, duplicate: bool = False) -> ImageResponse:
         """Convert database document to response model"""
         return ImageResponse(
             id=str(image['_id']),
@@ -169,6 +839,13 @@ class ImageService:
             album_id=image.get('album_id'),
             s3_url=image['s3_url'],
             thumbnail_url=image.get('thumbnail_url'),
+            derivatives=image.get('derivatives'),
+            placeholder=image.get('placeholder'),
+            width=image.get('width'),
+            height=image.get('height'),
+            orientation=image.get('orientation'),
+            taken_at=image.get('taken_at'),
             uploaded_at=image['uploaded_at'],
-            uploaded_by=image.get('uploaded_by')
+            uploaded_by=image.get('uploaded_by'),
+            duplicate=duplicate
         )
\ No newline at end of file
@@ -0,0 +1,32 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.services.image_service import ImageService
+from app.services.upload_session_service import UploadSessionService, UPLOAD_STAGING_SWEEP_INTERVAL
+from app.utils.job_queue import job_queue
+from app.utils.counter_aggregator import counter_aggregator, COUNTER_RECONCILE_INTERVAL, COUNTER_RECONCILE_SETTLE_TIME
+
+@job_queue.handler("image.derivatives")
+async def generate_image_derivatives(db: AsyncIOMotorDatabase, payload: dict):
+    """Create resized derivatives for an uploaded image"""
+    await ImageService(db).generate_image_derivatives(payload['image_id'])
+
+@job_queue.handler("storage.cleanup")
+async def cleanup_stored_files(db: AsyncIOMotorDatabase, payload: dict):
+    """Delete files whose images were deleted while storage was failing"""
+    await ImageService(db).cleanup_stored_files(payload['files'])
+
+@job_queue.handler("counters.reconcile")
+async def reconcile_image_counts(db: AsyncIOMotorDatabase, payload: dict):
+    """Repair persistent drift in event and album image counts, leaving the next run queued"""
+    await job_queue.schedule(db, "counters.reconcile", {}, COUNTER_RECONCILE_INTERVAL)
+    await counter_aggregator.flush()
+    repaired = await ImageService(db).reconcile_image_counts(COUNTER_RECONCILE_SETTLE_TIME)
+    if repaired['events'] or repaired['albums']:
+        print(f"Repaired image counts on {repaired['events']} events and {repaired['albums']} albums")
+
+@job_queue.handler("uploads.sweep_staging")
+async def sweep_staging_files(db: AsyncIOMotorDatabase, payload: dict):
+    """Remove staged files of expired or finished resumable uploads, leaving the next run queued"""
+    await job_queue.schedule(db, "uploads.sweep_staging", {}, UPLOAD_STAGING_SWEEP_INTERVAL)
+    removed = await UploadSessionService(db).sweep_orphaned_staging_files()
+    if removed:
+        print(f"Removed {removed} orphaned upload staging files")
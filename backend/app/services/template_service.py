@@ -14,10 +14,7 @@ class TemplateService:
         template_dict['usage_count'] = 0
         template_dict['is_active'] = True
         
-        template_id = await self.template_dao.create(template_dict)
-        
-        # Fetch and return created template
-        created_template = await self.template_dao.find_by_id(template_id)
+        created_template = await self.template_dao.create_returning(template_dict)
         return self._convert_to_response(created_template)
     
     async def get_template(self, template_id: str) -> TemplateResponse:
@@ -0,0 +1,203 @@
+from typing import AsyncIterator, Optional
+from datetime import datetime, timedelta
+import asyncio
+import os
+import tempfile
+import time
+import anyio
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from starlette.requests import ClientDisconnect
+from app.dao.upload_session_dao import UploadSessionDAO
+from app.models.image import ResumableUploadCreate, ImageResponse
+from app.services.image_service import ImageService
+from app.utils.exceptions import NotFoundException, ValidationException, ConflictException
+
+RESUMABLE_UPLOAD_EXPIRATION = int(os.getenv('RESUMABLE_UPLOAD_EXPIRATION', 24 * 3600))  # 24 hours
+RESUMABLE_UPLOAD_LOCK_SECONDS = int(os.getenv('RESUMABLE_UPLOAD_LOCK_SECONDS', 300))
+UPLOAD_STAGING_DIR = os.getenv('UPLOAD_STAGING_DIR', os.path.join(tempfile.gettempdir(), 'best_moments_uploads'))
+UPLOAD_STAGING_SWEEP_INTERVAL = int(os.getenv('UPLOAD_STAGING_SWEEP_INTERVAL', 3600))  # seconds
+
+class UploadSessionService:
+    """Resumable uploads: create a session, PATCH chunks at an offset, query the offset, finalize
+    
+    Chunks are staged in a file under UPLOAD_STAGING_DIR, so every worker that may
+    receive a PATCH for a session must share that directory.
+    """
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.upload_session_dao = UploadSessionDAO(db)
+        self.image_service = ImageService(db)
+    
+    async def create_session(self, upload_data: ResumableUploadCreate) -> dict:
+        """Start a resumable upload"""
+        await self.image_service.verify_event_and_album(upload_data.event_id, upload_data.album_id)
+        
+        session = upload_data.dict()
+        session['offset'] = 0
+        session['status'] = "uploading"
+        session['locked_until'] = None
+        session['expires_at'] = datetime.utcnow() + timedelta(seconds=RESUMABLE_UPLOAD_EXPIRATION)
+        
+        session = await self.upload_session_dao.create_returning(session)
+        upload_id = str(session['_id'])
+        
+        # Create the empty staging file so chunks can be written at any offset
+        await anyio.Path(UPLOAD_STAGING_DIR).mkdir(parents=True, exist_ok=True)
+        await anyio.Path(self._staging_path(upload_id)).touch()
+        return self._convert_to_response(session)
+    
+    async def get_session(self, upload_id: str) -> dict:
+        """Get the current state of an upload"""
+        session = await self.upload_session_dao.find_by_id(upload_id)
+        if not session:
+            raise NotFoundException("Upload not found")
+        return self._convert_to_response(session)
+    
+    async def append_chunk(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        """Write a chunk at the given offset and return the new offset
+        
+        Bytes received before a dropped connection are kept, so the client can
+        resume from the offset reported by HEAD.
+        """
+        session = await self.upload_session_dao.lock_at_offset(upload_id, offset, RESUMABLE_UPLOAD_LOCK_SECONDS)
+        if session is None:
+            existing = await self.upload_session_dao.find_by_id(upload_id)
+            if not existing or existing['status'] != "uploading":
+                raise NotFoundException("Upload not found")
+            raise ConflictException("Upload offset does not match", details={"offset": existing['offset']})
+        
+        new_offset = offset
+        remaining = session['upload_length'] - offset
+        exceeded = False
+        try:
+            async with await anyio.open_file(self._staging_path(upload_id), mode='r+b') as staging_file:
+                await staging_file.seek(offset)
+                try:
+                    async for chunk in chunks:
+                        if len(chunk) > remaining:
+                            chunk = chunk[:remaining]
+                            exceeded = True
+                        await staging_file.write(chunk)
+                        new_offset += len(chunk)
+                        remaining -= len(chunk)
+                        if exceeded:
+                            break
+                finally:
+                    # Drop bytes left over from an earlier interrupted chunk
+                    await staging_file.truncate(new_offset)
+        except ClientDisconnect:
+            pass
+        finally:
+            await self.upload_session_dao.release_at_offset(upload_id, new_offset)
+        
+        if exceeded:
+            raise ValidationException("Chunk exceeds upload length", details={"offset": new_offset})
+        return new_offset
+    
+    async def finalize(self, upload_id: str, max_size: Optional[int] = None) -> ImageResponse:
+        """Record a fully received upload as an image"""
+        session = await self.upload_session_dao.find_by_id(upload_id)
+        if not session:
+            raise NotFoundException("Upload not found")
+        if session['status'] == "completed":
+            return await self.image_service.get_image(session['image_id'])
+        if session['offset'] != session['upload_length']:
+            raise ValidationException("Upload is incomplete", details={"offset": session['offset']})
+        
+        # Lock the session so a late PATCH cannot change the file while it is stored
+        upload_length = session['upload_length']
+        if not await self.upload_session_dao.lock_at_offset(upload_id, upload_length, RESUMABLE_UPLOAD_LOCK_SECONDS):
+            raise ConflictException("Upload is being modified")
+        
+        staging_path = self._staging_path(upload_id)
+        try:
+            with open(staging_path, 'rb') as staging_file:
+                image = await self.image_service.upload_image(
+                    event_id=session['event_id'],
+                    file_obj=staging_file,
+                    filename=session['filename'],
+                    file_size=upload_length,
+                    album_id=session.get('album_id'),
+                    max_size=max_size
+                )
+        except BaseException:
+            await self.upload_session_dao.release_at_offset(upload_id, upload_length)
+            raise
+        
+        await self.upload_session_dao.mark_completed(upload_id, image.id)
+        await self._remove_staging_file(staging_path)
+        return image
+    
+    async def abort(self, upload_id: str) -> bool:
+        """Cancel an upload and discard its staged bytes"""
+        session = await self.upload_session_dao.find_by_id(upload_id)
+        if not session:
+            raise NotFoundException("Upload not found")
+        
+        await self._remove_staging_file(self._staging_path(upload_id))
+        return await self.upload_session_dao.delete(upload_id)
+    
+    @staticmethod
+    def sweep_staging_dir() -> int:
+        """Remove staged files of sessions that have expired; returns the number removed"""
+        if not os.path.isdir(UPLOAD_STAGING_DIR):
+            return 0
+        
+        cutoff = time.time() - RESUMABLE_UPLOAD_EXPIRATION
+        removed = 0
+        for entry in os.scandir(UPLOAD_STAGING_DIR):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+                removed += 1
+        return removed
+    
+    async def sweep_orphaned_staging_files(self) -> int:
+        """Remove staged files whose session expired, finished or was deleted; returns the number removed
+        
+        The TTL index deletes expired session documents but cannot touch their files,
+        so this runs periodically as the uploads.sweep_staging job.
+        """
+        def list_staged() -> list:
+            if not os.path.isdir(UPLOAD_STAGING_DIR):
+                return []
+            return [
+                entry.name[:-len(".part")]
+                for entry in os.scandir(UPLOAD_STAGING_DIR)
+                if entry.is_file() and entry.name.endswith(".part")
+            ]
+        
+        upload_ids = await asyncio.to_thread(list_staged)
+        if not upload_ids:
+            return 0
+        
+        active_ids = {
+            str(session['_id'])
+            for session in await self.upload_session_dao.find_by_ids(upload_ids)
+            if session['status'] == "uploading"
+        }
+        orphaned = [upload_id for upload_id in upload_ids if upload_id not in active_ids]
+        for upload_id in orphaned:
+            await self._remove_staging_file(self._staging_path(upload_id))
+        return len(orphaned)
+    
+    def _staging_path(self, upload_id: str) -> str:
+        return os.path.join(UPLOAD_STAGING_DIR, f"{upload_id}.part")
+    
+    async def _remove_staging_file(self, staging_path: str) -> None:
+        try:
+            await asyncio.to_thread(os.unlink, staging_path)
+        except FileNotFoundError:
+            pass
+    
+    def _convert_to_response(self, session: dict) -> dict:
+        """Convert database document to response data"""
+        return {
+            "upload_id": str(session['_id']),
+            "event_id": session['event_id'],
+            "album_id": session.get('album_id'),
+            "filename": session['filename'],
+            "offset": session['offset'],
+            "upload_length": session['upload_length'],
+            "status": session['status'],
+            "expires_at": session['expires_at'].isoformat()
+        }
@@ -0,0 +1,172 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, List, Tuple
+from urllib.parse import parse_qs
+from app.utils.exceptions import TooManyRequestsException, ValidationException
+from app.utils.metrics import LatencyStats
+from app.utils.responses import APIResponse
+
+ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', 32))
+ADMISSION_MAX_PER_EVENT = int(os.getenv('ADMISSION_MAX_PER_EVENT', 8))
+ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', 64))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 5.0))  # seconds
+ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', 2))  # seconds
+
+class AdmissionController:
+    """Caps in-flight uploads per worker and per event behind a short bounded wait queue
+    
+    A request first takes a slot for its event, then a global slot, so one busy
+    event cannot hold every global slot. Requests that find the queue full, or
+    wait longer than the queue timeout, are rejected with 429 and Retry-After.
+    """
+    def __init__(
+        self,
+        max_concurrent: int = ADMISSION_MAX_CONCURRENT,
+        max_per_event: int = ADMISSION_MAX_PER_EVENT,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+        retry_after: int = ADMISSION_RETRY_AFTER
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_event = max_per_event
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.global_slots = asyncio.Semaphore(max_concurrent)
+        # event_id -> [semaphore, number of requests holding or waiting for it]
+        self.event_slots: Dict[str, List] = {}
+        self.waiting = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_time = LatencyStats()
+    
+    @asynccontextmanager
+    async def admit(self, event_id: Optional[str] = None):
+        """Hold an upload slot for the duration of the block"""
+        if self.waiting >= self.max_queue and not self._has_free_slot(event_id):
+            self.rejected += 1
+            raise TooManyRequestsException("Server is busy, please retry shortly", self.retry_after)
+        
+        event_slot = self._checkout_event_slot(event_id)
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._acquire(event_slot), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            self._return_event_slot(event_id)
+            raise TooManyRequestsException("Server is busy, please retry shortly", self.retry_after)
+        except BaseException:
+            self._return_event_slot(event_id)
+            raise
+        finally:
+            self.waiting -= 1
+        
+        self.wait_time.record(time.perf_counter() - start)
+        self.admitted += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.global_slots.release()
+            if event_slot is not None:
+                event_slot.release()
+            self._return_event_slot(event_id)
+    
+    async def _acquire(self, event_slot: Optional[asyncio.Semaphore]):
+        if event_slot is not None:
+            await event_slot.acquire()
+        try:
+            await self.global_slots.acquire()
+        except BaseException:
+            if event_slot is not None:
+                event_slot.release()
+            raise
+    
+    def _has_free_slot(self, event_id: Optional[str]) -> bool:
+        if self.global_slots.locked():
+            return False
+        entry = self.event_slots.get(event_id) if event_id else None
+        return entry is None or not entry[0].locked()
+    
+    def _checkout_event_slot(self, event_id: Optional[str]) -> Optional[asyncio.Semaphore]:
+        if not event_id:
+            return None
+        entry = self.event_slots.setdefault(event_id, [asyncio.Semaphore(self.max_per_event), 0])
+        entry[1] += 1
+        return entry[0]
+    
+    def _return_event_slot(self, event_id: Optional[str]):
+        if not event_id:
+            return
+        entry = self.event_slots.get(event_id)
+        if entry is not None:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.event_slots[event_id]
+    
+    def get_metrics(self) -> dict:
+        """Current load and queue wait times for this worker"""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_per_event": self.max_per_event,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "active_events": len(self.event_slots),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "queue_wait": self.wait_time.summary()
+        }
+
+upload_admission = AdmissionController()
+
+# Upload endpoints whose bodies are only read once the request has a slot
+ADMISSION_PATHS = (
+    "/api/v1/images/upload",
+    "/api/v1/images/upload/batch",
+    "/api/v1/images/upload/finalize",
+)
+
+class AdmissionMiddleware:
+    """ASGI middleware that takes an upload slot before the request body is read
+    
+    Route handlers only run after FastAPI has parsed and spooled the whole body, so
+    gating there cannot bound the bodies being received. The event comes from the
+    event_id query parameter, which is required so no upload escapes its event's
+    limit; uploads without it are rejected with 400 before taking a slot.
+    """
+    def __init__(self, app, controller: AdmissionController = upload_admission, paths: Tuple[str, ...] = ADMISSION_PATHS):
+        self.app = app
+        self.controller = controller
+        self.paths = paths
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] != 'POST' or scope['path'].rstrip('/') not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        event_id = query.get('event_id', [None])[0]
+        if not event_id:
+            error = ValidationException("event_id query parameter is required")
+            response = APIResponse.error(error.message, error.status_code, error.details)
+            await response(scope, receive, send)
+            return
+        
+        admitted = False
+        try:
+            async with self.controller.admit(event_id):
+                admitted = True
+                await self.app(scope, receive, send)
+        except TooManyRequestsException as e:
+            if admitted:
+                raise
+            response = APIResponse.error(e.message, e.status_code, e.details, e.headers)
+            await response(scope, receive, send)
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import time
+from typing import Optional, Dict, Tuple, List
+from app.utils.metrics import LatencyStats
+
+COUNTER_WRITE_BEHIND = os.getenv('COUNTER_WRITE_BEHIND', 'True').lower() == 'true'
+COUNTER_FLUSH_INTERVAL = float(os.getenv('COUNTER_FLUSH_INTERVAL', 0.5))  # seconds
+COUNTER_FLUSH_MAX_OPS = int(os.getenv('COUNTER_FLUSH_MAX_OPS', 500))
+COUNTER_RECONCILE_INTERVAL = int(os.getenv('COUNTER_RECONCILE_INTERVAL', 3600))  # seconds
+# Time between the two drift measurements of a reconciliation, long enough for every worker to flush
+COUNTER_RECONCILE_SETTLE_TIME = max(4 * COUNTER_FLUSH_INTERVAL, 1.0)  # seconds
+
+class CounterAggregator:
+    """Merges counter increments in memory and writes them in batches
+    
+    Increments to the same field of the same document are summed, so a hot event
+    document takes one $inc per flush instead of one per upload. A flush writes one
+    unordered bulk update per collection and field. Flushes run every flush
+    interval, as soon as max_ops increments are pending, and on stop.
+    
+    Counters trail the truth by up to a flush interval, and increments pending in a
+    process that dies are lost; the counters.reconcile job repairs that drift.
+    """
+    def __init__(self, flush_interval: float = COUNTER_FLUSH_INTERVAL, max_ops: int = COUNTER_FLUSH_MAX_OPS):
+        self.flush_interval = flush_interval
+        self.max_ops = max_ops
+        # (collection name, field) -> [DAO used to write, {document id: amount}]
+        self.pending: Dict[Tuple[str, str], List] = {}
+        self.pending_ops = 0
+        self.flusher: Optional[asyncio.Task] = None
+        self.stopping = asyncio.Event()
+        self.flush_requested = asyncio.Event()
+        self.flush_lock = asyncio.Lock()
+        self.flushes = 0
+        self.merged = 0
+        self.written = 0
+        self.failed = 0
+        self.flush_time = LatencyStats()
+    
+    @property
+    def running(self) -> bool:
+        """Whether increments are being buffered"""
+        return self.flusher is not None
+    
+    def add(self, dao, field: str, deltas: Dict[str, int]) -> None:
+        """Buffer per-document amounts for a numeric field, written later with dao.bulk_increment"""
+        key = (dao.collection.name, field)
+        for id, amount in deltas.items():
+            if not amount:
+                continue
+            entry = self.pending.setdefault(key, [dao, {}])
+            entry[1][id] = entry[1].get(id, 0) + amount
+            self.pending_ops += 1
+        
+        if self.pending_ops >= self.max_ops:
+            self.flush_requested.set()
+    
+    def start(self):
+        """Start buffering increments and the periodic flush task"""
+        self.stopping = asyncio.Event()
+        self.flush_requested = asyncio.Event()
+        self.flusher = asyncio.create_task(self._run())
+        print(f"Started counter aggregator flushing every {self.flush_interval}s or {self.max_ops} increments")
+    
+    async def stop(self):
+        """Stop the flush task and write whatever is still pending"""
+        if self.flusher is None:
+            return
+        self.stopping.set()
+        await asyncio.gather(self.flusher, return_exceptions=True)
+        self.flusher = None
+        await self.flush()
+        print("Stopped counter aggregator")
+    
+    async def _run(self):
+        """Flush on the interval, or early once enough increments are pending"""
+        while not self.stopping.is_set():
+            try:
+                await asyncio.wait_for(self.flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_requested.clear()
+            await self.flush()
+    
+    async def flush(self) -> int:
+        """Write pending increments now and return the number of documents modified"""
+        async with self.flush_lock:
+            if not self.pending:
+                return 0
+            pending, self.pending = self.pending, {}
+            self.merged += self.pending_ops - sum(len(deltas) for _, deltas in pending.values())
+            self.pending_ops = 0
+            
+            start = time.perf_counter()
+            results = await asyncio.gather(*(
+                dao.bulk_increment(field, deltas)
+                for (_, field), (dao, deltas) in pending.items()
+            ), return_exceptions=True)
+            self.flush_time.record(time.perf_counter() - start)
+            self.flushes += 1
+            
+            modified = 0
+            for ((collection, field), (dao, deltas)), result in zip(pending.items(), results):
+                if isinstance(result, BaseException):
+                    # Retry with the next flush; reconciliation repairs a partially applied write
+                    self.failed += 1
+                    self.add(dao, field, deltas)
+                    print(f"Failed to flush {collection}.{field} counters: {str(result)}")
+                else:
+                    modified += result
+            self.written += modified
+            return modified
+    
+    def get_metrics(self) -> dict:
+        """Pending increments and flush statistics for this worker"""
+        return {
+            "running": self.running,
+            "pending": self.pending_ops,
+            "flushes": self.flushes,
+            "merged": self.merged,
+            "written": self.written,
+            "failed": self.failed,
+            "flush_time": self.flush_time.summary()
+        }
+
+counter_aggregator = CounterAggregator()
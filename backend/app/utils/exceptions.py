@@ -1,11 +1,18 @@
-from typing import Optional, Any
+from typing import Optional, Any, Dict
 
 class AppException(Exception):
     """Base exception class for application"""
-    def __init__(self, message: str, status_code: int = 500, details: Optional[Any] = None):
+    def __init__(
+        self,
+        message: str,
+        status_code: int = 500,
+        details: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None
+    ):
         self.message = message
         self.status_code = status_code
         self.details = details
+        self.headers = headers
         super().__init__(self.message)
 
 class ValidationException(AppException):
@@ -41,4 +48,9 @@ class InternalServerException(AppException):
 class BadRequestException(AppException):
     """Exception for bad requests"""
     def __init__(self, message: str = "Bad request", details: Optional[Any] = None):
-        super().__init__(message, status_code=400, details=details)
\ No newline at end of file
+        super().__init__(message, status_code=400, details=details)
+
+class TooManyRequestsException(AppException):
+    """Exception for requests rejected to shed load"""
+    def __init__(self, message: str = "Too many requests", retry_after: int = 1, details: Optional[Any] = None):
+        super().__init__(message, status_code=429, details=details, headers={"Retry-After": str(retry_after)})
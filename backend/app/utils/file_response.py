@@ -0,0 +1,116 @@
+import os
+import re
+from email.utils import formatdate
+from typing import Optional, Tuple
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+def parse_range(range_header: Optional[str], file_size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single byte range into an inclusive (start, end), or None to send the whole file
+    
+    Raises ValueError for a range that cannot be satisfied. Multiple ranges are
+    answered with the whole file, which RFC 9110 allows.
+    """
+    if not range_header:
+        return None
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match:
+        return None
+    
+    start, end = match.groups()
+    if start == '' and end == '':
+        return None
+    if start == '':
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(file_size - length, 0), file_size - 1
+    
+    start = int(start)
+    end = min(int(end), file_size - 1) if end else file_size - 1
+    if start >= file_size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+class RangeFileResponse(Response):
+    """File response with HTTP range support that hands the file to the server for zero-copy sending
+    
+    Servers that advertise the http.response.zerocopysend ASGI extension get the
+    file descriptor and transfer it with sendfile. Other servers receive the file
+    in chunks read on a worker thread. uvicorn, which this app runs under, does
+    not advertise the extension, so it always takes the chunked path; put a proxy
+    that serves LOCAL_STORAGE_PATH itself in front for kernel-side sendfile.
+    """
+    def __init__(
+        self,
+        path: str,
+        media_type: str,
+        range_header: Optional[str] = None,
+        method: str = "GET",
+        headers: Optional[dict] = None
+    ):
+        super().__init__(status_code=200, headers=headers, media_type=media_type)
+        self.path = path
+        self.send_body = method != "HEAD"
+        
+        stat = os.stat(path)
+        file_size = stat.st_size
+        self.headers['accept-ranges'] = 'bytes'
+        self.headers['last-modified'] = formatdate(stat.st_mtime, usegmt=True)
+        self.headers['etag'] = f'"{stat.st_mtime_ns:x}-{file_size:x}"'
+        
+        try:
+            byte_range = parse_range(range_header, file_size)
+        except ValueError:
+            self.status_code = 416
+            self.headers['content-range'] = f"bytes */{file_size}"
+            self.headers['content-length'] = '0'
+            self.offset, self.count = 0, 0
+            return
+        
+        if byte_range is None:
+            self.offset, self.count = 0, file_size
+        else:
+            start, end = byte_range
+            self.status_code = 206
+            self.headers['content-range'] = f"bytes {start}-{end}/{file_size}"
+            self.offset, self.count = start, end - start + 1
+        self.headers['content-length'] = str(self.count)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+        if not self.send_body or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, 'rb') as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.fileno(),
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False
+                })
+            return
+        
+        async with await anyio.open_file(self.path, mode='rb') as file:
+            await file.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import BinaryIO, Optional
+from PIL import Image, UnidentifiedImageError
+from app.utils.exceptions import ValidationException
+
+EXIF_ORIENTATION = 0x0112
+EXIF_DATETIME = 0x0132
+EXIF_IFD = 0x8769
+EXIF_DATETIME_ORIGINAL = 0x9003
+
+def sniff_mime_type(header: bytes) -> Optional[str]:
+    """Detect a supported image type from its leading magic bytes"""
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if header.startswith((b'GIF87a', b'GIF89a')):
+        return 'image/gif'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+def _parse_exif_datetime(value) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.strptime(value.strip('\x00 '), '%Y:%m:%d %H:%M:%S')
+    except ValueError:
+        return None
+
+def inspect_image(file_obj: BinaryIO) -> dict:
+    """Validate an image and read its metadata from the header, without decoding pixels
+    
+    Returns the sniffed mime_type, the displayed width and height (swapped for
+    rotated EXIF orientations), the EXIF orientation and the capture time if known.
+    Leaves the file at the start.
+    """
+    file_obj.seek(0)
+    mime_type = sniff_mime_type(file_obj.read(16))
+    file_obj.seek(0)
+    if mime_type is None:
+        raise ValidationException("File is not a supported image")
+    
+    try:
+        # Image.open only parses the header; pixel data is read on load(), which is never called
+        with Image.open(file_obj) as img:
+            width, height = img.size
+            # JPEG and WebP keep EXIF in the header; other formats may need a full read to find it
+            exif = img.getexif() if 'exif' in img.info else Image.Exif()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise ValidationException("File is not a valid image")
+    finally:
+        file_obj.seek(0)
+    
+    orientation = exif.get(EXIF_ORIENTATION, 1)
+    if orientation in (5, 6, 7, 8):
+        width, height = height, width
+    
+    taken_at = _parse_exif_datetime(exif.get_ifd(EXIF_IFD).get(EXIF_DATETIME_ORIGINAL))
+    if taken_at is None:
+        taken_at = _parse_exif_datetime(exif.get(EXIF_DATETIME))
+    
+    return {
+        "mime_type": mime_type,
+        "width": width,
+        "height": height,
+        "orientation": orientation,
+        "taken_at": taken_at
+    }
@@ -0,0 +1,62 @@
+import base64
+from io import BytesIO
+from typing import Dict, Tuple
+from PIL import Image, ImageOps
+
+# Longest edge in pixels for each derivative, largest first so each size is resized from the previous one
+DERIVATIVE_SIZES = {
+    "display": 1600,
+    "medium": 800,
+    "thumb": 320,
+}
+
+DERIVATIVE_CONTENT_TYPES = {
+    "WEBP": "image/webp",
+    "JPEG": "image/jpeg",
+}
+
+# Longest edge of the inline placeholder; the browser scales and blurs it up
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+
+def generate_derivatives(
+    data: bytes,
+    image_format: str = "WEBP",
+    quality: int = 80
+) -> Tuple[Dict[str, bytes], str]:
+    """Generate resized derivatives of an image and a tiny inline placeholder
+    
+    Runs in a worker process, so it takes and returns plain bytes. The placeholder
+    is a data URI of a few hundred bytes, made from the smallest derivative.
+    """
+    img = Image.open(BytesIO(data))
+    
+    # Let the JPEG decoder downscale by a power of two while decoding
+    largest = max(DERIVATIVE_SIZES.values())
+    img.draft('RGB', (largest, largest))
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+    if image_format == "JPEG" and img.mode == 'RGBA':
+        img = img.convert('RGB')
+    
+    derivatives = {}
+    for name, size in DERIVATIVE_SIZES.items():
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        img.save(buffer, format=image_format, quality=quality, optimize=True)
+        derivatives[name] = buffer.getvalue()
+    
+    return derivatives, generate_placeholder(img, image_format)
+
+def generate_placeholder(img: Image.Image, image_format: str = "WEBP") -> str:
+    """Encode a very low resolution copy of an image as a base64 data URI"""
+    placeholder = img.copy()
+    placeholder.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BILINEAR)
+    if image_format == "JPEG" and placeholder.mode == 'RGBA':
+        placeholder = placeholder.convert('RGB')
+    
+    buffer = BytesIO()
+    placeholder.save(buffer, format=image_format, quality=PLACEHOLDER_QUALITY)
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return f"data:{DERIVATIVE_CONTENT_TYPES[image_format]};base64,{encoded}"
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import time
+from typing import Optional, Dict, List, Set
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+from app.utils.metrics import LatencyStats
+
+INSERT_BATCH_ENABLED = os.getenv('INSERT_BATCH_ENABLED', 'False').lower() == 'true'
+INSERT_BATCH_MAX_SIZE = int(os.getenv('INSERT_BATCH_MAX_SIZE', 100))
+INSERT_BATCH_MAX_LATENCY = float(os.getenv('INSERT_BATCH_MAX_LATENCY', 0.005))  # seconds
+
+class InsertBatch:
+    """Documents waiting to be inserted into one collection together"""
+    def __init__(self, dao):
+        self.dao = dao
+        self.documents: List[dict] = []
+        self.futures: List[asyncio.Future] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+class InsertBatcher:
+    """Gathers single-document inserts from concurrent requests into one insert_many
+    
+    The first insert into an empty batch starts a timer; the batch is written when
+    the timer fires after max_latency, or straight away once it holds max_size
+    documents. Each caller waits for its own document's outcome: its ID, or the
+    write error for that document alone, since the insert is unordered.
+    
+    A caller cancelled before its batch is written has its document dropped, so
+    nothing it would have done after the insert is left undone. Once the write
+    has started, the document is inserted regardless; callers that must pair the
+    insert with further writes shield the whole step from cancellation.
+    """
+    def __init__(self, max_size: int = INSERT_BATCH_MAX_SIZE, max_latency: float = INSERT_BATCH_MAX_LATENCY):
+        self.max_size = max_size
+        self.max_latency = max_latency
+        # collection name -> batch being filled
+        self.batches: Dict[str, InsertBatch] = {}
+        self.writes: Set[asyncio.Task] = set()
+        self.running = False
+        self.documents = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.write_time = LatencyStats()
+    
+    def start(self):
+        """Start batching inserts"""
+        self.running = True
+        print(f"Started insert batcher with batches of up to {self.max_size} within {self.max_latency * 1000:.0f}ms")
+    
+    async def stop(self):
+        """Stop batching and write the batches still being filled"""
+        if not self.running:
+            return
+        self.running = False
+        for name in list(self.batches):
+            self._write(name)
+        if self.writes:
+            await asyncio.gather(*self.writes, return_exceptions=True)
+        print("Stopped insert batcher")
+    
+    async def insert(self, dao, document: dict) -> str:
+        """Insert a document with dao.create_many alongside other callers' documents
+        
+        Sets _id, created_at and updated_at on the document and returns its ID.
+        """
+        name = dao.collection.name
+        batch = self.batches.get(name)
+        if batch is None:
+            batch = self.batches[name] = InsertBatch(dao)
+            batch.timer = asyncio.get_running_loop().call_later(self.max_latency, self._write, name)
+        
+        future = asyncio.get_running_loop().create_future()
+        batch.documents.append(document)
+        batch.futures.append(future)
+        if len(batch.documents) >= self.max_size:
+            self._write(name)
+        return await future
+    
+    def _write(self, name: str):
+        """Take the collection's batch out of the pending set and write it in a task"""
+        batch = self.batches.pop(name, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        task = asyncio.create_task(self._insert_batch(batch))
+        self.writes.add(task)
+        task.add_done_callback(self.writes.discard)
+    
+    async def _insert_batch(self, batch: InsertBatch):
+        """Insert a batch unordered and settle each caller's future"""
+        # Drop documents of callers cancelled while the batch was filling
+        live = [position for position, future in enumerate(batch.futures) if not future.done()]
+        self.cancelled += len(batch.futures) - len(live)
+        batch.documents = [batch.documents[position] for position in live]
+        batch.futures = [batch.futures[position] for position in live]
+        if not batch.documents:
+            return
+        
+        outcomes: List = [None] * len(batch.documents)
+        start = time.perf_counter()
+        try:
+            await batch.dao.create_many(batch.documents, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get('writeErrors', []):
+                error_class = DuplicateKeyError if write_error.get('code') == 11000 else WriteError
+                outcomes[write_error['index']] = error_class(
+                    write_error.get('errmsg'), write_error.get('code'), write_error
+                )
+        except Exception as e:
+            outcomes = [e] * len(batch.documents)
+        self.write_time.record(time.perf_counter() - start)
+        
+        for document, future, outcome in zip(batch.documents, batch.futures, outcomes):
+            self.documents += 1
+            if future.done():
+                # The caller was cancelled while waiting
+                continue
+            if outcome is None:
+                future.set_result(str(document['_id']))
+            else:
+                self.failed += 1
+                future.set_exception(outcome)
+    
+    def get_metrics(self) -> dict:
+        """Pending inserts, batch sizes and write times for this worker"""
+        batches = self.write_time.count
+        return {
+            "running": self.running,
+            "pending": sum(len(batch.documents) for batch in self.batches.values()),
+            "documents": self.documents,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "batches": batches,
+            "mean_batch_size": round(self.documents / batches, 1) if batches else None,
+            "write_time": self.write_time.summary()
+        }
+
+insert_batcher = InsertBatcher()
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Optional, Callable, Awaitable, Dict, List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.dao.job_dao import JobDAO
+from app.utils.metrics import LatencyStats
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 1.0))  # seconds
+JOB_VISIBILITY_TIMEOUT = int(os.getenv('JOB_VISIBILITY_TIMEOUT', 300))  # seconds
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 5))
+JOB_RETRY_BASE_DELAY = float(os.getenv('JOB_RETRY_BASE_DELAY', 5.0))  # seconds
+
+JobHandler = Callable[[AsyncIOMotorDatabase, dict], Awaitable[None]]
+
+class JobQueue:
+    """In-process workers for jobs stored in the Mongo jobs collection
+    
+    Jobs are claimed atomically, so several API processes can run workers against
+    the same collection. A worker renews the lease on its job while it runs; a job
+    whose lease expires (for example because its process crashed) is claimed again.
+    """
+    def __init__(self):
+        self.handlers: Dict[str, JobHandler] = {}
+        self.db: Optional[AsyncIOMotorDatabase] = None
+        self.job_dao: Optional[JobDAO] = None
+        self.workers: List[asyncio.Task] = []
+        self.stopping = asyncio.Event()
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        self.queue_latency = LatencyStats()
+        self.run_time = LatencyStats()
+    
+    def handler(self, job_type: str):
+        """Register a coroutine as the handler for a job type"""
+        def decorator(func: JobHandler) -> JobHandler:
+            self.handlers[job_type] = func
+            return func
+        return decorator
+    
+    async def enqueue(self, db: AsyncIOMotorDatabase, job_type: str, payload: dict) -> str:
+        """Add a job to the queue"""
+        return await JobDAO(db).enqueue(job_type, payload, JOB_MAX_ATTEMPTS)
+    
+    async def enqueue_many(self, db: AsyncIOMotorDatabase, job_type: str, payloads: List[dict]) -> List[str]:
+        """Add several jobs of one type with a single insert"""
+        return await JobDAO(db).enqueue_many(job_type, payloads, JOB_MAX_ATTEMPTS)
+    
+    async def schedule(self, db: AsyncIOMotorDatabase, job_type: str, payload: dict, delay: float) -> bool:
+        """Queue a job to run after a delay, once across all processes, for recurring work"""
+        return await JobDAO(db).schedule(job_type, payload, JOB_MAX_ATTEMPTS, delay)
+    
+    async def start(self, db: AsyncIOMotorDatabase, workers: int = JOB_WORKERS):
+        """Start worker tasks"""
+        self.db = db
+        self.job_dao = JobDAO(db)
+        self.stopping = asyncio.Event()
+        self.workers = [
+            asyncio.create_task(self._work(f"{self.worker_prefix}:{uuid.uuid4().hex[:8]}"))
+            for _ in range(workers)
+        ]
+        print(f"Started {workers} job workers")
+    
+    async def stop(self):
+        """Let running jobs finish, then stop the workers"""
+        self.stopping.set()
+        if self.workers:
+            await asyncio.gather(*self.workers, return_exceptions=True)
+            self.workers = []
+            print("Stopped job workers")
+    
+    async def _work(self, worker_id: str):
+        """Claim and run jobs until stopped"""
+        while not self.stopping.is_set():
+            try:
+                job = await self.job_dao.claim(worker_id, JOB_VISIBILITY_TIMEOUT)
+            except Exception as e:
+                print(f"Job worker {worker_id} failed to claim a job: {str(e)}")
+                job = None
+            
+            if job is None:
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), timeout=JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            try:
+                await self._run(job, worker_id)
+            except Exception as e:
+                # The lease expires and the job is retried by whichever worker claims it next
+                print(f"Job worker {worker_id} failed to record job {job['_id']}: {str(e)}")
+    
+    async def _run(self, job: dict, worker_id: str):
+        """Run one claimed job and record its outcome"""
+        self.queue_latency.record((datetime.utcnow() - job['available_at']).total_seconds())
+        
+        handler = self.handlers.get(job['type'])
+        if handler is None:
+            await self.job_dao.fail(job, worker_id, f"No handler for job type {job['type']}", JOB_RETRY_BASE_DELAY)
+            self.failed += 1
+            return
+        
+        # A job reclaimed after a crash may already have used all its attempts
+        if job['attempts'] > job['max_attempts']:
+            job['attempts'] = job['max_attempts']
+            await self.job_dao.fail(job, worker_id, job.get('last_error') or "Visibility timeout exceeded", 0)
+            self.failed += 1
+            return
+        
+        heartbeat = asyncio.create_task(self._heartbeat(job['_id'], worker_id))
+        start = time.perf_counter()
+        try:
+            await handler(self.db, job['payload'])
+        except Exception as e:
+            retry_delay = JOB_RETRY_BASE_DELAY * 2 ** (job['attempts'] - 1)
+            await self.job_dao.fail(job, worker_id, str(e), retry_delay)
+            if job['attempts'] < job['max_attempts']:
+                self.retried += 1
+            else:
+                self.failed += 1
+            print(f"Job {job['_id']} ({job['type']}) failed on attempt {job['attempts']}: {str(e)}")
+        else:
+            await self.job_dao.complete(job['_id'], worker_id)
+            self.processed += 1
+        finally:
+            heartbeat.cancel()
+            self.run_time.record(time.perf_counter() - start)
+    
+    async def _heartbeat(self, job_id, worker_id: str):
+        """Renew the lease on a running job at half the visibility timeout"""
+        while True:
+            await asyncio.sleep(JOB_VISIBILITY_TIMEOUT / 2)
+            await self.job_dao.extend_lease(job_id, worker_id, JOB_VISIBILITY_TIMEOUT)
+    
+    async def get_metrics(self) -> dict:
+        """Queue depth from the database plus this process's job latencies"""
+        depth = await self.job_dao.count_by_status()
+        oldest = await self.job_dao.oldest_queued()
+        return {
+            "queue_depth": depth.get("queued", 0),
+            "running": depth.get("running", 0),
+            "failed_total": depth.get("failed", 0),
+            "oldest_queued_age_seconds": (
+                round((datetime.utcnow() - oldest['available_at']).total_seconds(), 1) if oldest else 0
+            ),
+            "workers": len(self.workers),
+            "processed": self.processed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "queue_latency": self.queue_latency.summary(),
+            "run_time": self.run_time.summary()
+        }
+
+job_queue = JobQueue()
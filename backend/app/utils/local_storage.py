@@ -0,0 +1,105 @@
+import asyncio
+import mimetypes
+import os
+import shutil
+import tempfile
+from typing import Optional, BinaryIO
+from app.utils.exceptions import InternalServerException, NotFoundException
+from app.utils.storage import StorageBackend, LimitedReader
+
+LOCAL_STORAGE_PATH = os.getenv('LOCAL_STORAGE_PATH', './storage')
+LOCAL_STORAGE_BASE_URL = os.getenv('LOCAL_STORAGE_BASE_URL', 'http://localhost:8000/api/v1/files')
+
+class LocalStorage(StorageBackend):
+    """Storage on the local filesystem for single-box deployments
+    
+    Writes go to a temporary file in the target directory and are renamed into
+    place, so readers never see a partially written file. Files are served by
+    the /files route.
+    """
+    def __init__(self, root: str = LOCAL_STORAGE_PATH, base_url: str = LOCAL_STORAGE_BASE_URL):
+        self.root = os.path.realpath(root)
+        self.base_url = base_url.rstrip('/')
+        os.makedirs(self.root, exist_ok=True)
+    
+    def get_path(self, key: str) -> str:
+        """Resolve a key to a path inside the storage root"""
+        path = os.path.realpath(os.path.join(self.root, key))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise NotFoundException("File not found")
+        return path
+    
+    def get_public_url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+    
+    def _write_atomic(self, reader, key: str) -> None:
+        """Copy a reader into a temporary file next to the target, then rename it into place"""
+        path = self.get_path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                shutil.copyfileobj(reader, temp_file)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    
+    async def upload_file(
+        self,
+        file_obj: BinaryIO,
+        key: str,
+        content_type: str = 'application/octet-stream'
+    ) -> str:
+        try:
+            await asyncio.to_thread(self._write_atomic, file_obj, key)
+        except OSError as e:
+            raise InternalServerException(f"Failed to store file: {str(e)}")
+        return self.get_public_url(key)
+    
+    async def upload_stream(
+        self,
+        file_obj: BinaryIO,
+        key: str,
+        content_length: int,
+        content_type: str = 'application/octet-stream',
+        max_size: Optional[int] = None,
+        multipart: Optional[bool] = None
+    ) -> str:
+        reader = LimitedReader(file_obj, max_size if max_size is not None else content_length)
+        return await self.upload_file(reader, key, content_type)
+    
+    async def download_file(self, key: str) -> bytes:
+        def read_file() -> bytes:
+            with open(self.get_path(key), 'rb') as stored_file:
+                return stored_file.read()
+        
+        try:
+            return await asyncio.to_thread(read_file)
+        except FileNotFoundError:
+            raise NotFoundException("File not found")
+        except OSError as e:
+            raise InternalServerException(f"Failed to read file: {str(e)}")
+    
+    async def delete_file(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(os.unlink, self.get_path(key))
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            raise InternalServerException(f"Failed to delete file: {str(e)}")
+    
+    async def head_file(self, key: str) -> Optional[dict]:
+        try:
+            stat = await asyncio.to_thread(os.stat, self.get_path(key))
+        except FileNotFoundError:
+            return None
+        return {
+            "size": stat.st_size,
+            "content_type": mimetypes.guess_type(key)[0] or 'application/octet-stream'
+        }
@@ -0,0 +1,23 @@
+from collections import deque
+
+class LatencyStats:
+    """Rolling window of durations in seconds"""
+    def __init__(self, window: int = 1000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+    
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+    
+    def summary(self) -> dict:
+        """Summarize the window as count and p50/p95/max in milliseconds"""
+        if not self.samples:
+            return {"count": self.count, "p50_ms": None, "p95_ms": None, "max_ms": None}
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+            "max_ms": round(ordered[-1] * 1000, 1)
+        }
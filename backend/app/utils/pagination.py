@@ -0,0 +1,38 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from app.utils.exceptions import ValidationException
+
+def encode_cursor(value: Any, id: ObjectId) -> str:
+    """Encode the sort value and _id of the last document on a page as an opaque token"""
+    if isinstance(value, datetime):
+        value = {"$date": value.isoformat()}
+    payload = json.dumps([value, str(id)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    """Decode a token from encode_cursor back into the sort value and _id"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, id = json.loads(payload)
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["$date"])
+        return value, ObjectId(id)
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError, InvalidId):
+        raise ValidationException("Invalid cursor")
+
+def page_query(filter: dict, sort_field: str, value: Any, last_id: ObjectId) -> dict:
+    """Build the query for the documents after (value, last_id) in descending sort_field, _id order
+    
+    Each branch of the $or carries the filter, so every branch seeks in the
+    (filter, sort_field, _id) index from the cursor instead of scanning past it.
+    """
+    after = [{sort_field: value, "_id": {"$lt": last_id}}]
+    if value is not None:
+        # Documents without the field sort after every value in descending order
+        after += [{sort_field: {"$lt": value}}, {sort_field: None}]
+    return {"$or": [{**filter, **branch} for branch in after]}
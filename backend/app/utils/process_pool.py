@@ -0,0 +1,64 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional, Callable, Any
+from app.utils.exceptions import TooManyRequestsException
+
+PROCESS_POOL_WORKERS = int(os.getenv('PROCESS_POOL_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+PROCESS_POOL_MAX_PENDING = int(os.getenv('PROCESS_POOL_MAX_PENDING', 32))
+PROCESS_POOL_RETRY_AFTER = int(os.getenv('PROCESS_POOL_RETRY_AFTER', 2))  # seconds
+
+class ProcessPool:
+    executor: Optional[ProcessPoolExecutor] = None
+    slots: Optional[asyncio.Semaphore] = None
+    waiting: int = 0
+    rejected: int = 0
+
+pool_instance = ProcessPool()
+
+def init_process_pool():
+    """Start the process pool used for CPU-heavy image work"""
+    if pool_instance.executor is None:
+        # Spawn rather than fork so workers never inherit the event loop or client sockets
+        pool_instance.executor = ProcessPoolExecutor(
+            max_workers=PROCESS_POOL_WORKERS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        # Submit no more work than there are workers; callers wait here, in a bounded queue
+        pool_instance.slots = asyncio.Semaphore(PROCESS_POOL_WORKERS)
+        pool_instance.waiting = 0
+        print(f"Started process pool with {PROCESS_POOL_WORKERS} workers")
+
+def close_process_pool():
+    """Shut down the process pool"""
+    if pool_instance.executor is not None:
+        pool_instance.executor.shutdown(wait=True, cancel_futures=True)
+        pool_instance.executor = None
+        pool_instance.slots = None
+        print("Closed process pool")
+
+async def run_in_process(func: Callable, *args, **kwargs) -> Any:
+    """Run a picklable function in the process pool without blocking the event loop
+    
+    At most PROCESS_POOL_MAX_PENDING calls wait behind the running ones; further
+    callers are rejected with TooManyRequestsException instead of queueing without limit.
+    """
+    if pool_instance.executor is None:
+        init_process_pool()
+    slots = pool_instance.slots
+    if slots.locked() and pool_instance.waiting >= PROCESS_POOL_MAX_PENDING:
+        pool_instance.rejected += 1
+        raise TooManyRequestsException("Image processing is busy, please retry shortly", PROCESS_POOL_RETRY_AFTER)
+    
+    pool_instance.waiting += 1
+    try:
+        await slots.acquire()
+    finally:
+        pool_instance.waiting -= 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool_instance.executor, partial(func, *args, **kwargs))
+    finally:
+        slots.release()
@@ -1,13 +1,36 @@
 import qrcode
+from datetime import datetime
+from functools import lru_cache
 from io import BytesIO
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
 from PIL import Image, ImageDraw, ImageFont
 import os
 
+FONT_DIR = "/usr/share/fonts/truetype/dejavu"
+TEMPLATE_SIZE = (800, 1200)
+QR_SIZE = 300
+PDF_RESOLUTION = 300.0
+
+RENDER_ASSETS = ("qr", "template")
+RENDER_MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+}
+
+# Color schemes based on event type
+COLOR_SCHEMES = {
+    "wedding": {"bg": "#FFF5F5", "primary": "#D4AF37", "secondary": "#8B4513"},
+    "birthday": {"bg": "#FFF9E6", "primary": "#FF6B9D", "secondary": "#C44569"},
+    "engagement": {"bg": "#FFF0F5", "primary": "#FF69B4", "secondary": "#C71585"},
+    "annoprasan": {"bg": "#FFF8DC", "primary": "#FFD700", "secondary": "#FF8C00"},
+}
+
 class QRGenerator:
     @staticmethod
-    def generate_qr_code(data: str, size: int = 300) -> BytesIO:
-        """Generate QR code image"""
+    def make_qr(data: str) -> qrcode.QRCode:
+        """Build the QR code matrix for data"""
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_H,
@@ -16,9 +39,29 @@ class QRGenerator:
         )
         qr.add_data(data)
         qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        img = img.resize((size, size), Image.Resampling.LANCZOS)
+        return qr
+    
+    @staticmethod
+    def make_qr_image(data: str, size: int = 300) -> Image.Image:
+        """Build the QR code matrix for data and rasterize it at size"""
+        img = QRGenerator.make_qr(data).make_image(fill_color="black", back_color="white")
+        return img.resize((size, size), Image.Resampling.LANCZOS)
+    
+    @staticmethod
+    def generate_qr_svg(data: str, size: int = 300) -> str:
+        """Generate QR code as a standalone SVG document"""
+        matrix = QRGenerator.make_qr(data).get_matrix()
+        modules = len(matrix)
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+            f'viewBox="0 0 {modules} {modules}" shape-rendering="crispEdges">'
+            f'{_svg_qr_body(matrix)}</svg>'
+        )
+    
+    @staticmethod
+    def generate_qr_code(data: str, size: int = 300) -> BytesIO:
+        """Generate QR code image"""
+        img = QRGenerator.make_qr_image(data, size)
         
         buffer = BytesIO()
         img.save(buffer, format='PNG')
@@ -31,52 +74,29 @@ class QRGenerator:
         event_date: str,
         event_code: str,
         qr_data: str,
-        template_type: str = "wedding"
+        template_type: str = "wedding",
+        qr_img: Optional[Image.Image] = None
     ) -> BytesIO:
-        """Generate event template with QR code"""
-        # Create a beautiful template image
-        width, height = 800, 1200
+        """Generate event template with QR code, reusing qr_img when it is already rendered
         
-        # Color schemes based on event type
-        color_schemes = {
-            "wedding": {"bg": "#FFF5F5", "primary": "#D4AF37", "secondary": "#8B4513"},
-            "birthday": {"bg": "#FFF9E6", "primary": "#FF6B9D", "secondary": "#C44569"},
-            "engagement": {"bg": "#FFF0F5", "primary": "#FF69B4", "secondary": "#C71585"},
-            "annoprasan": {"bg": "#FFF8DC", "primary": "#FFD700", "secondary": "#FF8C00"},
-        }
+        Starts from the cached base canvas for the event type, so only the
+        per-event name, date, code and QR code are drawn.
+        """
+        width, height = TEMPLATE_SIZE
+        colors = get_color_scheme(template_type)
+        title_font, subtitle_font, code_font = get_template_fonts()
         
-        colors = color_schemes.get(template_type, color_schemes["wedding"])
-        
-        # Create image with gradient background
-        img = Image.new('RGB', (width, height), colors["bg"])
+        img = get_base_canvas(template_type).copy()
         draw = ImageDraw.Draw(img)
         
-        # Add decorative border
-        border_width = 20
-        draw.rectangle(
-            [border_width, border_width, width - border_width, height - border_width],
-            outline=colors["primary"],
-            width=5
-        )
-        
         # Generate QR code
-        qr_buffer = QRGenerator.generate_qr_code(qr_data, size=300)
-        qr_img = Image.open(qr_buffer)
+        if qr_img is None:
+            qr_img = QRGenerator.make_qr_image(qr_data, size=QR_SIZE)
         
         # Paste QR code in center
-        qr_position = ((width - 300) // 2, height // 2 - 50)
+        qr_position = ((width - QR_SIZE) // 2, height // 2 - 50)
         img.paste(qr_img, qr_position)
         
-        # Add text (simplified - in production use proper fonts)
-        try:
-            title_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 48)
-            subtitle_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 32)
-            code_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf", 36)
-        except:
-            title_font = ImageFont.load_default()
-            subtitle_font = ImageFont.load_default()
-            code_font = ImageFont.load_default()
-        
         # Draw event name
         event_name_bbox = draw.textbbox((0, 0), event_name, font=title_font)
         event_name_width = event_name_bbox[2] - event_name_bbox[0]
@@ -97,17 +117,6 @@ class QRGenerator:
             font=subtitle_font
         )
         
-        # Draw "Scan to Upload Photos" text
-        scan_text = "Scan QR Code to Upload Photos"
-        scan_bbox = draw.textbbox((0, 0), scan_text, font=subtitle_font)
-        scan_width = scan_bbox[2] - scan_bbox[0]
-        draw.text(
-            ((width - scan_width) // 2, height // 2 - 450),
-            scan_text,
-            fill=colors["secondary"],
-            font=subtitle_font
-        )
-        
         # Draw event code
         code_text = f"Event Code: {event_code}"
         code_bbox = draw.textbbox((0, 0), code_text, font=code_font)
@@ -119,19 +128,217 @@ class QRGenerator:
             font=code_font
         )
         
-        # Add footer text
-        footer_text = "BestMoments.com - Capture & Share Your Special Moments"
-        footer_bbox = draw.textbbox((0, 0), footer_text, font=subtitle_font)
-        footer_width = footer_bbox[2] - footer_bbox[0]
-        draw.text(
-            ((width - footer_width) // 2, height - 100),
-            footer_text,
-            fill=colors["secondary"],
-            font=subtitle_font
-        )
-        
         # Save to buffer
         buffer = BytesIO()
         img.save(buffer, format='PNG', quality=95)
         buffer.seek(0)
-        return buffer
\ No newline at end of file
+        return buffer
+
+    @staticmethod
+    def generate_event_template_svg(
+        event_name: str,
+        event_date: str,
+        event_code: str,
+        qr_data: str,
+        template_type: str = "wedding"
+    ) -> str:
+        """Generate event template as SVG, with the same layout as the PNG template"""
+        width, height = TEMPLATE_SIZE
+        colors = get_color_scheme(template_type)
+        matrix = QRGenerator.make_qr(qr_data).get_matrix()
+        scale = QR_SIZE / len(matrix)
+        border_width = 20
+        
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}">',
+            f'<rect width="{width}" height="{height}" fill="{colors["bg"]}"/>',
+            f'<rect x="{border_width}" y="{border_width}" width="{width - 2 * border_width}" '
+            f'height="{height - 2 * border_width}" fill="none" stroke="{colors["primary"]}" stroke-width="5"/>',
+            _svg_text(event_name, 100, 48, colors["primary"], "DejaVu Sans, sans-serif", bold=True),
+            _svg_text(event_date, 180, 32, colors["secondary"], "DejaVu Sans, sans-serif"),
+            _svg_text("Scan QR Code to Upload Photos", height // 2 - 450, 32, colors["secondary"], "DejaVu Sans, sans-serif"),
+            f'<g transform="translate({(width - QR_SIZE) // 2} {height // 2 - 50}) scale({scale:.6f})" '
+            f'shape-rendering="crispEdges">{_svg_qr_body(matrix)}</g>',
+            _svg_text(f"Event Code: {event_code}", height // 2 + 280, 36, colors["primary"], "DejaVu Sans Mono, monospace"),
+            _svg_text(
+                "BestMoments.com - Capture & Share Your Special Moments",
+                height - 100, 32, colors["secondary"], "DejaVu Sans, sans-serif"
+            ),
+            '</svg>',
+        ]
+        return ''.join(parts)
+
+def _svg_qr_body(matrix: List[List[bool]]) -> str:
+    """Draw a QR matrix in module units as a white square and one path of dark runs"""
+    modules = len(matrix)
+    path = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < modules:
+            if row[x]:
+                run = 1
+                while x + run < modules and row[x + run]:
+                    run += 1
+                path.append(f"M{x} {y}h{run}v1h-{run}z")
+                x += run
+            else:
+                x += 1
+    return f'<rect width="{modules}" height="{modules}" fill="#FFFFFF"/><path d="{"".join(path)}" fill="#000000"/>'
+
+def _svg_text(text: str, top: int, size: int, fill: str, family: str, bold: bool = False) -> str:
+    """Centered SVG text whose top sits at top, matching Pillow's default text anchor"""
+    weight = ' font-weight="bold"' if bold else ''
+    # Pillow places the ascender at top; DejaVu's ascender is about 0.93 of the font size
+    baseline = top + round(size * 0.93)
+    return (
+        f'<text x="{TEMPLATE_SIZE[0] // 2}" y="{baseline}" text-anchor="middle" font-family="{family}" '
+        f'font-size="{size}"{weight} fill="{fill}">{escape(text)}</text>'
+    )
+
+@lru_cache(maxsize=None)
+def load_font(filename: str, size: int) -> ImageFont.ImageFont:
+    """Load a TrueType font once per process, falling back to Pillow's default font"""
+    try:
+        return ImageFont.truetype(os.path.join(FONT_DIR, filename), size)
+    except OSError:
+        return ImageFont.load_default()
+
+def get_template_fonts() -> Tuple[ImageFont.ImageFont, ImageFont.ImageFont, ImageFont.ImageFont]:
+    """Return the title, subtitle and code fonts used on event templates"""
+    return (
+        load_font("DejaVuSans-Bold.ttf", 48),
+        load_font("DejaVuSans.ttf", 32),
+        load_font("DejaVuSansMono.ttf", 36)
+    )
+
+def get_color_scheme(template_type: str) -> Dict[str, str]:
+    """Return the colors for an event type, defaulting to the wedding scheme"""
+    return COLOR_SCHEMES.get(template_type, COLOR_SCHEMES["wedding"])
+
+def get_base_canvas(template_type: str) -> Image.Image:
+    """Return the cached template background for an event type; callers must copy it before drawing"""
+    return _render_base_canvas(template_type if template_type in COLOR_SCHEMES else "wedding")
+
+@lru_cache(maxsize=None)
+def _render_base_canvas(template_type: str) -> Image.Image:
+    """Draw the parts of a template that are the same for every event of a type"""
+    width, height = TEMPLATE_SIZE
+    colors = get_color_scheme(template_type)
+    _, subtitle_font, _ = get_template_fonts()
+    
+    img = Image.new('RGB', (width, height), colors["bg"])
+    draw = ImageDraw.Draw(img)
+    
+    # Add decorative border
+    border_width = 20
+    draw.rectangle(
+        [border_width, border_width, width - border_width, height - border_width],
+        outline=colors["primary"],
+        width=5
+    )
+    
+    # Draw "Scan to Upload Photos" text
+    scan_text = "Scan QR Code to Upload Photos"
+    scan_bbox = draw.textbbox((0, 0), scan_text, font=subtitle_font)
+    scan_width = scan_bbox[2] - scan_bbox[0]
+    draw.text(
+        ((width - scan_width) // 2, height // 2 - 450),
+        scan_text,
+        fill=colors["secondary"],
+        font=subtitle_font
+    )
+    
+    # Add footer text
+    footer_text = "BestMoments.com - Capture & Share Your Special Moments"
+    footer_bbox = draw.textbbox((0, 0), footer_text, font=subtitle_font)
+    footer_width = footer_bbox[2] - footer_bbox[0]
+    draw.text(
+        ((width - footer_width) // 2, height - 100),
+        footer_text,
+        fill=colors["secondary"],
+        font=subtitle_font
+    )
+    return img
+
+def render_event_assets(
+    event_name: str,
+    event_date: str,
+    event_code: str,
+    event_url: str,
+    template_type: str = "wedding"
+) -> Tuple[bytes, bytes]:
+    """Render the QR code and event template PNGs from a single QR matrix
+    
+    Runs in a worker process, so it takes and returns plain values.
+    """
+    qr_img = QRGenerator.make_qr_image(event_url, size=QR_SIZE)
+    
+    qr_buffer = BytesIO()
+    qr_img.save(qr_buffer, format='PNG')
+    
+    template_buffer = QRGenerator.generate_event_template(
+        event_name=event_name,
+        event_date=event_date,
+        event_code=event_code,
+        qr_data=event_url,
+        template_type=template_type,
+        qr_img=qr_img
+    )
+    return qr_buffer.getvalue(), template_buffer.getvalue()
+
+def render_event_asset(
+    asset: str,
+    image_format: str,
+    size: Optional[int],
+    event_name: str,
+    event_date: str,
+    event_code: str,
+    event_url: str,
+    template_type: str = "wedding",
+    rendered_at: Optional[datetime] = None
+) -> bytes:
+    """Render an event's QR code or template as PNG, SVG or PDF
+    
+    Size is the QR code edge or the template width in pixels, at most the width
+    of TEMPLATE_SIZE; it is ignored for the SVG template. rendered_at is written
+    as the PDF dates so the same inputs always give the same bytes. Runs in a
+    worker process, so it takes and returns plain values.
+    """
+    if image_format == "svg":
+        if asset == "qr":
+            svg = QRGenerator.generate_qr_svg(event_url, size)
+        else:
+            svg = QRGenerator.generate_event_template_svg(event_name, event_date, event_code, event_url, template_type)
+        return svg.encode('utf-8')
+    
+    if asset == "qr":
+        img = QRGenerator.make_qr_image(event_url, size=size)
+    else:
+        template_buffer = QRGenerator.generate_event_template(
+            event_name=event_name,
+            event_date=event_date,
+            event_code=event_code,
+            qr_data=event_url,
+            template_type=template_type
+        )
+        img = Image.open(template_buffer)
+        width, height = TEMPLATE_SIZE
+        size = min(size or width, width)
+        if size != width:
+            img = img.resize((size, round(height * size / width)), Image.Resampling.LANCZOS)
+    
+    buffer = BytesIO()
+    if image_format == "pdf":
+        timestamp = (rendered_at or datetime.utcnow()).timetuple()
+        img.convert('RGB').save(
+            buffer,
+            format='PDF',
+            resolution=PDF_RESOLUTION,
+            title=f"Event {event_code}",
+            creationDate=timestamp,
+            modDate=timestamp
+        )
+    else:
+        img.save(buffer, format='PNG')
+    return buffer.getvalue()
@@ -0,0 +1,32 @@
+import os
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+RENDER_CACHE_MAX_BYTES = int(os.getenv('RENDER_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+class LRUCache:
+    """Least recently used cache of bytes values, bounded by their total size"""
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+    
+    def get(self, key: Hashable) -> Optional[bytes]:
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+    
+    def put(self, key: Hashable, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        self.entries[key] = value
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+# Rendered QR codes and templates, keyed by event code, updated_at and render options
+render_cache = LRUCache(RENDER_CACHE_MAX_BYTES)
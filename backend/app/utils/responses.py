@@ -31,7 +31,8 @@ class APIResponse:
     def error(
         message: str = "Error occurred",
         status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR,
-        errors: Optional[Any] = None
+        errors: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None
     ) -> JSONResponse:
         """Return error response"""
         response = {
@@ -44,7 +45,8 @@ class APIResponse:
         
         return JSONResponse(
             content=response,
-            status_code=status_code
+            status_code=status_code,
+            headers=headers
         )
     
     @staticmethod
@@ -70,21 +72,31 @@ class APIResponse:
     @staticmethod
     def paginated(
         data: Any,
-        page: int,
+        page: Optional[int],
         limit: int,
-        total: int,
-        message: str = "Success"
+        total: Optional[int],
+        message: str = "Success",
+        next_cursor: Optional[str] = None
     ) -> JSONResponse:
-        """Return paginated response"""
-        total_pages = (total + limit - 1) // limit if limit > 0 else 0
+        """Return paginated response
+        
+        page is None when the page was fetched with a cursor, and total is None when
+        it was not requested; next_cursor, when given, continues the listing after
+        this page.
+        """
+        if total is None:
+            total_pages = None
+        else:
+            total_pages = (total + limit - 1) // limit if limit > 0 else 0
         
         meta = {
             "page": page,
             "limit": limit,
             "total": total,
             "total_pages": total_pages,
-            "has_next": page < total_pages,
-            "has_prev": page > 1
+            "has_next": next_cursor is not None if page is None or total is None else page < total_pages,
+            "has_prev": page is None or page > 1,
+            "next_cursor": next_cursor
         }
         
         return APIResponse.success(
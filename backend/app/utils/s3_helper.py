@@ -1,28 +1,56 @@
+import asyncio
 import boto3
-from botocore.exceptions import ClientError
-from typing import Optional, BinaryIO
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, BinaryIO, Callable, Any, List
 import os
-from datetime import datetime
-import uuid
 from app.utils.exceptions import InternalServerException
+from app.utils.storage import StorageBackend, LimitedReader
 
-class S3Helper:
-    def __init__(self):
+S3_MAX_POOL_CONNECTIONS = int(os.getenv('S3_MAX_POOL_CONNECTIONS', 50))
+S3_MAX_WORKERS = int(os.getenv('S3_MAX_WORKERS', 32))
+S3_MULTIPART_ENABLED = os.getenv('S3_MULTIPART_ENABLED', 'True').lower() == 'true'
+S3_MULTIPART_THRESHOLD = int(os.getenv('S3_MULTIPART_THRESHOLD', 16 * 1024 * 1024))  # 16MB
+S3_MULTIPART_PART_SIZE = max(int(os.getenv('S3_MULTIPART_PART_SIZE', 8 * 1024 * 1024)), 5 * 1024 * 1024)  # S3 minimum is 5MB
+S3_MULTIPART_CONCURRENCY = int(os.getenv('S3_MULTIPART_CONCURRENCY', 4))
+S3_MULTIPART_PART_RETRIES = int(os.getenv('S3_MULTIPART_PART_RETRIES', 3))
+S3_DELETE_BATCH_SIZE = 1000  # DeleteObjects accepts at most 1000 keys
+
+class S3Helper(StorageBackend):
+    """S3 access through one pooled client; blocking boto3 calls run on a bounded thread pool"""
+    supports_direct_upload = True
+    
+    def __init__(self, max_pool_connections: int = S3_MAX_POOL_CONNECTIONS, max_workers: int = S3_MAX_WORKERS):
+        self.endpoint_url = os.getenv('S3_ENDPOINT_URL') or None
         self.s3_client = boto3.client(
             's3',
             aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
             aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=os.getenv('AWS_REGION', 'us-east-1')
+            region_name=os.getenv('AWS_REGION', 'us-east-1'),
+            endpoint_url=self.endpoint_url,
+            config=Config(
+                max_pool_connections=max_pool_connections,
+                retries={'max_attempts': 3, 'mode': 'standard'}
+            )
         )
         self.bucket_name = os.getenv('S3_BUCKET_NAME')
         self.cloudfront_domain = os.getenv('CLOUDFRONT_DOMAIN', '')
+        # Never run more blocking calls than the client has connections for
+        self.executor = ThreadPoolExecutor(
+            max_workers=min(max_workers, max_pool_connections),
+            thread_name_prefix="s3"
+        )
     
-    def generate_s3_key(self, event_id: str, filename: str, folder: str = "images") -> str:
-        """Generate unique S3 key for file"""
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        unique_id = str(uuid.uuid4())[:8]
-        ext = os.path.splitext(filename)[1]
-        return f"{folder}/{event_id}/{timestamp}_{unique_id}{ext}"
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking boto3 call on the S3 thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+    
+    def close(self):
+        """Wait for in-flight calls and release the thread pool"""
+        self.executor.shutdown(wait=True)
     
     async def upload_file(
         self,
@@ -32,7 +60,8 @@ class S3Helper:
     ) -> str:
         """Upload file to S3 and return URL"""
         try:
-            self.s3_client.upload_fileobj(
+            await self._run(
+                self.s3_client.upload_fileobj,
                 file_obj,
                 self.bucket_name,
                 s3_key,
@@ -42,19 +71,168 @@ class S3Helper:
                 }
             )
             
-            # Return CloudFront URL if available, otherwise S3 URL
-            if self.cloudfront_domain:
-                return f"https://{self.cloudfront_domain}/{s3_key}"
-            else:
-                return f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
+            return self.get_public_url(s3_key)
         
         except ClientError as e:
             raise InternalServerException(f"Failed to upload file to S3: {str(e)}")
     
+    async def upload_stream(
+        self,
+        file_obj: BinaryIO,
+        s3_key: str,
+        content_length: int,
+        content_type: str = 'application/octet-stream',
+        max_size: Optional[int] = None,
+        multipart: Optional[bool] = None
+    ) -> str:
+        """Stream a seekable file object to S3 chunk by chunk and return URL
+        
+        Files at or above S3_MULTIPART_THRESHOLD go through a parallel multipart
+        upload unless multipart is set explicitly.
+        """
+        reader = LimitedReader(file_obj, max_size if max_size is not None else content_length)
+        if multipart is None:
+            multipart = S3_MULTIPART_ENABLED and content_length >= S3_MULTIPART_THRESHOLD
+        if multipart:
+            await self._multipart_upload(reader, s3_key, content_length, content_type)
+            return self.get_public_url(s3_key)
+        
+        try:
+            await self._run(
+                self.s3_client.put_object,
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Body=reader,
+                ContentLength=content_length,
+                ContentType=content_type,
+                ACL='public-read'
+            )
+            return self.get_public_url(s3_key)
+        
+        except ClientError as e:
+            raise InternalServerException(f"Failed to upload file to S3: {str(e)}")
+    
+    async def _multipart_upload(
+        self,
+        reader: LimitedReader,
+        s3_key: str,
+        content_length: int,
+        content_type: str,
+        part_size: int = S3_MULTIPART_PART_SIZE,
+        concurrency: int = S3_MULTIPART_CONCURRENCY
+    ) -> None:
+        """Upload parts concurrently, retrying each part on its own and aborting on failure"""
+        try:
+            created = await self._run(
+                self.s3_client.create_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                ContentType=content_type,
+                ACL='public-read'
+            )
+        except ClientError as e:
+            raise InternalServerException(f"Failed to upload file to S3: {str(e)}")
+        
+        upload_id = created['UploadId']
+        part_count = max(1, (content_length + part_size - 1) // part_size)
+        semaphore = asyncio.Semaphore(concurrency)
+        read_lock = asyncio.Lock()
+        
+        async def upload_part(part_number: int) -> dict:
+            # Holding the semaphore while reading caps memory at concurrency * part_size
+            async with semaphore:
+                async with read_lock:
+                    body = await self._run(self._read_part, reader, (part_number - 1) * part_size, part_size)
+                etag = await self._upload_part_with_retry(s3_key, upload_id, part_number, body)
+                return {'PartNumber': part_number, 'ETag': etag}
+        
+        tasks = [asyncio.ensure_future(upload_part(number)) for number in range(1, part_count + 1)]
+        try:
+            parts = await asyncio.gather(*tasks)
+            await self._run(
+                self.s3_client.complete_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except BaseException as e:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._abort_multipart_upload(s3_key, upload_id)
+            if isinstance(e, (ClientError, BotoCoreError)):
+                raise InternalServerException(f"Failed to upload file to S3: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _read_part(reader: LimitedReader, offset: int, part_size: int) -> bytes:
+        """Read one part from the reader, chunk by chunk"""
+        reader.seek(offset)
+        chunks = []
+        remaining = part_size
+        while remaining > 0:
+            chunk = reader.read(remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b''.join(chunks)
+    
+    async def _upload_part_with_retry(self, s3_key: str, upload_id: str, part_number: int, body: bytes) -> str:
+        """Upload a single part, retrying it with backoff"""
+        for attempt in range(S3_MULTIPART_PART_RETRIES + 1):
+            try:
+                response = await self._run(
+                    self.s3_client.upload_part,
+                    Bucket=self.bucket_name,
+                    Key=s3_key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body
+                )
+                return response['ETag']
+            except (ClientError, BotoCoreError):
+                if attempt == S3_MULTIPART_PART_RETRIES:
+                    raise
+                await asyncio.sleep(0.2 * 2 ** attempt)
+    
+    async def _abort_multipart_upload(self, s3_key: str, upload_id: str) -> None:
+        """Abort an incomplete multipart upload so its parts are not billed"""
+        try:
+            await self._run(
+                self.s3_client.abort_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id
+            )
+        except (ClientError, BotoCoreError) as e:
+            print(f"Failed to abort multipart upload {upload_id} for {s3_key}: {str(e)}")
+    
+    def get_public_url(self, s3_key: str) -> str:
+        """Return CloudFront URL if available, otherwise S3 URL"""
+        if self.cloudfront_domain:
+            return f"https://{self.cloudfront_domain}/{s3_key}"
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket_name}/{s3_key}"
+        return f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
+    
+    async def download_file(self, s3_key: str) -> bytes:
+        """Download a file from S3"""
+        def read_object() -> bytes:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+            return response['Body'].read()
+        
+        try:
+            return await self._run(read_object)
+        except ClientError as e:
+            raise InternalServerException(f"Failed to download file from S3: {str(e)}")
+    
     async def delete_file(self, s3_key: str) -> bool:
         """Delete file from S3"""
         try:
-            self.s3_client.delete_object(
+            await self._run(
+                self.s3_client.delete_object,
                 Bucket=self.bucket_name,
                 Key=s3_key
             )
@@ -62,10 +240,82 @@ class S3Helper:
         except ClientError as e:
             raise InternalServerException(f"Failed to delete file from S3: {str(e)}")
     
+    async def delete_files(self, s3_keys: List[str]) -> List[str]:
+        """Delete files from S3 with one DeleteObjects request per 1000 keys
+        
+        Returns the keys that could not be deleted: the per-key errors S3 reports,
+        and every key of a request that failed as a whole.
+        """
+        async def delete_batch(batch: List[str]) -> List[str]:
+            try:
+                response = await self._run(
+                    self.s3_client.delete_objects,
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": [{"Key": s3_key} for s3_key in batch], "Quiet": True}
+                )
+            except (BotoCoreError, ClientError) as e:
+                print(f"Failed to delete {len(batch)} files from S3: {str(e)}")
+                return batch
+            errors = response.get('Errors', [])
+            if errors:
+                print(f"Failed to delete {len(errors)} files from S3: {errors[0].get('Message')}")
+            return [error['Key'] for error in errors]
+        
+        failed = await asyncio.gather(*(
+            delete_batch(s3_keys[start:start + S3_DELETE_BATCH_SIZE])
+            for start in range(0, len(s3_keys), S3_DELETE_BATCH_SIZE)
+        ))
+        return [s3_key for batch in failed for s3_key in batch]
+    
+    async def generate_presigned_post(
+        self,
+        s3_key: str,
+        content_type: str,
+        max_size: int,
+        expiration: int = 900
+    ) -> dict:
+        """Generate a presigned POST that only accepts the given content type and size range"""
+        try:
+            return await self._run(
+                self.s3_client.generate_presigned_post,
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Fields={
+                    'Content-Type': content_type,
+                    'acl': 'public-read'
+                },
+                Conditions=[
+                    {'Content-Type': content_type},
+                    {'acl': 'public-read'},
+                    ['content-length-range', 1, max_size]
+                ],
+                ExpiresIn=expiration
+            )
+        except ClientError as e:
+            raise InternalServerException(f"Failed to generate presigned upload: {str(e)}")
+    
+    async def head_file(self, s3_key: str) -> Optional[dict]:
+        """Get object size and content type, or None if the object does not exist"""
+        try:
+            metadata = await self._run(
+                self.s3_client.head_object,
+                Bucket=self.bucket_name,
+                Key=s3_key
+            )
+            return {
+                "size": metadata['ContentLength'],
+                "content_type": metadata.get('ContentType', 'application/octet-stream')
+            }
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise InternalServerException(f"Failed to read file metadata from S3: {str(e)}")
+    
     async def get_presigned_url(self, s3_key: str, expiration: int = 3600) -> str:
         """Generate presigned URL for private file access"""
         try:
-            url = self.s3_client.generate_presigned_url(
+            url = await self._run(
+                self.s3_client.generate_presigned_url,
                 'get_object',
                 Params={
                     'Bucket': self.bucket_name,
@@ -75,4 +325,4 @@ class S3Helper:
             )
             return url
         except ClientError as e:
-            raise InternalServerException(f"Failed to generate presigned URL: {str(e)}")
\ No newline at end of file
+            raise InternalServerException(f"Failed to generate presigned URL: {str(e)}")
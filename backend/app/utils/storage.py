@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import partial
+from typing import Optional, BinaryIO, List
+from app.utils.exceptions import BadRequestException, ValidationException
+
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 's3').lower()
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 1024 * 1024))  # 1MB
+
+class LimitedReader:
+    """File-like wrapper that streams a source in bounded chunks and enforces a size limit"""
+    def __init__(self, file_obj: BinaryIO, max_size: int, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.file_obj = file_obj
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+    
+    def read(self, size: int = -1) -> bytes:
+        """Read at most one chunk, so callers never pull the whole file into memory"""
+        if size is None or size < 0 or size > self.chunk_size:
+            size = self.chunk_size
+        
+        data = self.file_obj.read(size)
+        self.bytes_read += len(data)
+        if self.bytes_read > self.max_size:
+            raise ValidationException(f"File size exceeds {self.max_size // (1024 * 1024)}MB limit")
+        return data
+    
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        position = self.file_obj.seek(offset, whence)
+        self.bytes_read = self.file_obj.tell()
+        return position
+    
+    def tell(self) -> int:
+        return self.file_obj.tell()
+    
+    def seekable(self) -> bool:
+        return True
+
+def hash_stream(file_obj: BinaryIO, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """Compute the SHA-256 of a seekable file chunk by chunk, leaving it at the start"""
+    digest = hashlib.sha256()
+    file_obj.seek(0)
+    for chunk in iter(partial(file_obj.read, chunk_size), b''):
+        digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+class StorageBackend(ABC):
+    """Interface for the object storage that holds images, QR codes and templates"""
+    supports_direct_upload = False
+    
+    def generate_key(
+        self,
+        event_id: str,
+        filename: str,
+        folder: str = "images",
+        content_hash: Optional[str] = None
+    ) -> str:
+        """Generate storage key for file, content-addressed when a content hash is given"""
+        if content_hash:
+            ext = os.path.splitext(filename)[1].lower()
+            return f"{folder}/{event_id}/{content_hash}{ext}"
+        
+        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        unique_id = str(uuid.uuid4())[:8]
+        ext = os.path.splitext(filename)[1]
+        return f"{folder}/{event_id}/{timestamp}_{unique_id}{ext}"
+    
+    @abstractmethod
+    def get_public_url(self, key: str) -> str:
+        """Return the URL clients use to fetch a stored file"""
+    
+    @abstractmethod
+    async def upload_file(
+        self,
+        file_obj: BinaryIO,
+        key: str,
+        content_type: str = 'application/octet-stream'
+    ) -> str:
+        """Store a small in-memory file and return URL"""
+    
+    @abstractmethod
+    async def upload_stream(
+        self,
+        file_obj: BinaryIO,
+        key: str,
+        content_length: int,
+        content_type: str = 'application/octet-stream',
+        max_size: Optional[int] = None,
+        multipart: Optional[bool] = None
+    ) -> str:
+        """Stream a seekable file object to storage in bounded chunks and return URL"""
+    
+    @abstractmethod
+    async def download_file(self, key: str) -> bytes:
+        """Read a stored file"""
+    
+    @abstractmethod
+    async def delete_file(self, key: str) -> bool:
+        """Delete a stored file"""
+    
+    async def delete_files(self, keys: List[str]) -> List[str]:
+        """Delete several stored files and return the keys that could not be deleted"""
+        results = await asyncio.gather(*(self.delete_file(key) for key in keys), return_exceptions=True)
+        return [key for key, result in zip(keys, results) if isinstance(result, Exception)]
+    
+    @abstractmethod
+    async def head_file(self, key: str) -> Optional[dict]:
+        """Get size and content_type of a stored file, or None if it does not exist"""
+    
+    async def generate_presigned_post(
+        self,
+        key: str,
+        content_type: str,
+        max_size: int,
+        expiration: int = 900
+    ) -> dict:
+        """Generate a presigned upload clients can send bytes to directly"""
+        raise BadRequestException("Direct uploads are not supported by the configured storage backend")
+    
+    def close(self):
+        """Release resources held by the backend"""
+        pass
+
+class Storage:
+    backend: Optional[StorageBackend] = None
+
+storage_instance = Storage()
+
+def init_storage():
+    """Create the application-scoped storage backend"""
+    if storage_instance.backend is not None:
+        return
+    
+    if STORAGE_BACKEND == 'local':
+        from app.utils.local_storage import LocalStorage
+        storage_instance.backend = LocalStorage()
+    else:
+        from app.utils.s3_helper import S3Helper
+        storage_instance.backend = S3Helper()
+    print(f"Using {STORAGE_BACKEND} storage backend")
+
+def close_storage():
+    """Shut down the application-scoped storage backend"""
+    if storage_instance.backend is not None:
+        storage_instance.backend.close()
+        storage_instance.backend = None
+        print("Closed storage backend")
+
+def get_storage() -> StorageBackend:
+    """Get the shared storage backend, creating it on first use"""
+    if storage_instance.backend is None:
+        init_storage()
+    return storage_instance.backend
@@ -0,0 +1,59 @@
+"""Benchmark header-only image inspection against a full decode
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_image_inspect --megapixels 12 --runs 20
+"""
+import argparse
+import os
+import time
+from io import BytesIO
+from PIL import Image
+
+from app.utils.image_inspector import inspect_image
+
+def make_jpeg(megapixels: float) -> bytes:
+    """Build a noisy JPEG with an EXIF block, like a camera upload"""
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+    noise = Image.frombytes('L', (width // 8, height // 8), os.urandom((width // 8) * (height // 8)))
+    img = Image.merge('RGB', (noise, noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT), noise.transpose(Image.Transpose.FLIP_TOP_BOTTOM)))
+    img = img.resize((width, height))
+    
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif.get_ifd(0x8769)[0x9003] = "2024:06:01 18:30:00"
+    buffer = BytesIO()
+    img.save(buffer, format='JPEG', quality=90, exif=exif)
+    return buffer.getvalue()
+
+def full_decode(file_obj) -> None:
+    with Image.open(file_obj) as img:
+        img.load()
+
+def time_per_mb(func, data: bytes, runs: int) -> float:
+    """Return the best time in milliseconds per MB of input"""
+    best = float('inf')
+    for _ in range(runs):
+        file_obj = BytesIO(data)
+        start = time.perf_counter()
+        func(file_obj)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000 / (len(data) / (1024 * 1024))
+
+def run_benchmark(megapixels: float, runs: int):
+    data = make_jpeg(megapixels)
+    inspect_cost = time_per_mb(inspect_image, data, runs)
+    decode_cost = time_per_mb(full_decode, data, runs)
+    
+    print(f"Image:              {megapixels}MP JPEG, {len(data) / (1024 * 1024):.1f}MB (best of {runs})")
+    print(f"Header inspection:  {inspect_cost:.3f} ms/MB")
+    print(f"Full decode:        {decode_cost:.3f} ms/MB ({decode_cost / inspect_cost:.0f}x)")
+    print(f"Metadata:           {inspect_image(BytesIO(data))}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=12)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    run_benchmark(args.megapixels, args.runs)
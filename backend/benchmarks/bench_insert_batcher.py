@@ -0,0 +1,87 @@
+"""Benchmark per-request image inserts vs the micro-batching insert batcher
+
+Run from the backend directory against a MongoDB server (MONGODB_URL); the
+benchmark writes to a scratch database that is dropped afterwards:
+
+    python -m benchmarks.bench_insert_batcher --concurrency 500 --runs 3
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.dao.image_dao import ImageDAO
+from app.utils.insert_batcher import InsertBatcher, INSERT_BATCH_MAX_SIZE, INSERT_BATCH_MAX_LATENCY
+
+def image_document(run: int, upload: int) -> dict:
+    return {
+        "event_id": "bench-event",
+        "album_id": None,
+        "filename": f"photo_{run}_{upload}.jpg",
+        "original_filename": f"photo_{run}_{upload}.jpg",
+        "file_size": 2 * 1024 * 1024,
+        "mime_type": "image/jpeg",
+        "s3_key": f"images/bench-event/photo_{run}_{upload}.jpg",
+        "s3_url": f"http://localhost:8000/api/v1/files/images/bench-event/photo_{run}_{upload}.jpg",
+        "uploaded_at": datetime.utcnow()
+    }
+
+async def time_inserts(image_dao: ImageDAO, concurrency: int, runs: int, batcher: InsertBatcher = None) -> tuple:
+    """Insert concurrency documents at once per run and return the best inserts/s and its p95 ms"""
+    best, best_p95 = 0.0, 0.0
+    for run in range(runs):
+        latencies = []
+        
+        async def upload(number: int):
+            document = image_document(run, number)
+            start = time.perf_counter()
+            if batcher is None:
+                await image_dao.create(document)
+            else:
+                await batcher.insert(image_dao, document)
+            latencies.append(time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(upload(number) for number in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        await image_dao.collection.delete_many({})
+        
+        if concurrency / elapsed > best:
+            latencies.sort()
+            best = concurrency / elapsed
+            best_p95 = latencies[int(len(latencies) * 0.95)] * 1000
+    return best, best_p95
+
+async def run_benchmark(concurrency: int, runs: int, max_size: int, max_latency: float):
+    client = AsyncIOMotorClient(os.getenv('MONGODB_URL', 'mongodb://localhost:27017'))
+    db = client["best_moments_bench"]
+    image_dao = ImageDAO(db)
+    await image_dao.ensure_indexes()
+    
+    batcher = InsertBatcher(max_size=max_size, max_latency=max_latency)
+    batcher.start()
+    single, single_p95 = await time_inserts(image_dao, concurrency, runs)
+    batched, batched_p95 = await time_inserts(image_dao, concurrency, runs, batcher)
+    metrics = batcher.get_metrics()
+    await batcher.stop()
+    
+    await client.drop_database("best_moments_bench")
+    client.close()
+    print(f"Concurrent uploads:  {concurrency} (best of {runs})")
+    print(f"insert_one:          {single:.0f} inserts/s, p95 {single_p95:.1f} ms")
+    print(f"Batched:             {batched:.0f} inserts/s, p95 {batched_p95:.1f} ms ({batched / single:.2f}x)")
+    print(f"Batch size:          {metrics['mean_batch_size']} mean, up to {max_size} within {max_latency * 1000:.0f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-size", type=int, default=INSERT_BATCH_MAX_SIZE)
+    parser.add_argument("--max-latency", type=float, default=INSERT_BATCH_MAX_LATENCY)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.concurrency, args.runs, args.max_size, args.max_latency))
@@ -0,0 +1,57 @@
+"""Benchmark single-call vs parallel multipart uploads to S3
+
+Run from the backend directory against a real bucket or an S3-compatible
+server (set S3_ENDPOINT_URL for MinIO):
+
+    python -m benchmarks.bench_s3_upload --size-mb 40 --runs 3
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.utils.s3_helper import S3Helper
+
+async def time_upload(s3_helper: S3Helper, file_obj, size: int, multipart: bool, runs: int) -> float:
+    """Upload the same file several times and return the best throughput in MB/s"""
+    best = 0.0
+    for run in range(runs):
+        file_obj.seek(0)
+        s3_key = f"benchmarks/{'multipart' if multipart else 'single'}_{run}.bin"
+        start = time.perf_counter()
+        await s3_helper.upload_stream(file_obj, s3_key, size, multipart=multipart)
+        elapsed = time.perf_counter() - start
+        best = max(best, size / (1024 * 1024) / elapsed)
+        await s3_helper.delete_file(s3_key)
+    return best
+
+async def run_benchmark(size_mb: int, runs: int):
+    size = size_mb * 1024 * 1024
+    s3_helper = S3Helper()
+    
+    with tempfile.TemporaryFile() as file_obj:
+        # Write random data in chunks so the benchmark itself stays small in memory
+        remaining = size
+        while remaining > 0:
+            chunk = os.urandom(min(remaining, 1024 * 1024))
+            file_obj.write(chunk)
+            remaining -= len(chunk)
+        
+        single = await time_upload(s3_helper, file_obj, size, multipart=False, runs=runs)
+        multipart = await time_upload(s3_helper, file_obj, size, multipart=True, runs=runs)
+    
+    s3_helper.close()
+    print(f"File size:           {size_mb}MB (best of {runs})")
+    print(f"Single PUT:          {single:.1f} MB/s")
+    print(f"Parallel multipart:  {multipart:.1f} MB/s ({multipart / single:.2f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=40)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.size_mb, args.runs))
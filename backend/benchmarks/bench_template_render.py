@@ -0,0 +1,49 @@
+"""Benchmark event template rendering with cold and warm font and canvas caches
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_template_render --runs 50
+"""
+import argparse
+import time
+
+from app.utils.qr_generator import render_event_assets, load_font, _render_base_canvas
+
+EVENT_TYPES = ["wedding", "birthday", "engagement", "annoprasan"]
+
+def render(run: int) -> None:
+    render_event_assets(
+        event_name=f"Benchmark Event {run}",
+        event_date="June 01, 2024",
+        event_code=f"BENCH{run:03d}",
+        event_url=f"http://localhost:3000/event/BENCH{run:03d}",
+        template_type=EVENT_TYPES[run % len(EVENT_TYPES)]
+    )
+
+def time_renders(runs: int, cold: bool) -> float:
+    """Return the mean milliseconds per render"""
+    total = 0.0
+    for run in range(runs):
+        if cold:
+            # Reproduce the old behaviour of reloading fonts and redrawing the background every call
+            load_font.cache_clear()
+            _render_base_canvas.cache_clear()
+        start = time.perf_counter()
+        render(run)
+        total += time.perf_counter() - start
+    return total * 1000 / runs
+
+def run_benchmark(runs: int):
+    cold = time_renders(runs, cold=True)
+    render(0)
+    warm = time_renders(runs, cold=False)
+    
+    print(f"Renders:         {runs} (QR code + template)")
+    print(f"Cold caches:     {cold:.1f} ms/render")
+    print(f"Warm caches:     {warm:.1f} ms/render ({cold / warm:.2f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    run_benchmark(args.runs)
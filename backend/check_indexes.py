@@ -0,0 +1,168 @@
+"""Script to check that every DAO query is served by an index
+
+Ensures the declared indexes, then runs explain on each query the DAOs issue and
+exits with status 1 if any winning plan contains a COLLSCAN. Cursor pages are also
+run against a seeded scratch database, which is dropped afterwards, and fail when
+they examine more index keys than a page needs.
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.dao.indexes import ensure_indexes
+from app.utils.pagination import page_query
+
+SAMPLE_ID = "000000000000000000000000"
+NOW = datetime.utcnow()
+
+# (collection, query name, command) mirroring the filters and sorts in app/dao.
+# Lookups by _id and the job status aggregation (a deliberate full scan for metrics) are left out.
+QUERIES = [
+    ("events", "EventDAO.find_by_event_code",
+     {"find": "events", "filter": {"event_code": "ABCD1234"}, "limit": 1}),
+    ("events", "EventDAO.find_by_host_phone",
+     {"find": "events", "filter": {"host_phone": "9999999999"}, "sort": {"created_at": -1, "_id": -1}, "limit": 20}),
+    ("events", "EventDAO.find_active_events",
+     {"find": "events", "filter": {"is_active": True}, "sort": {"event_date": -1, "_id": -1}, "limit": 20}),
+    ("events", "EventService.list_events total",
+     {"count": "events", "query": {"is_active": True}}),
+    ("events", "EventService.list_events_by_host total",
+     {"count": "events", "query": {"host_phone": "9999999999"}}),
+    ("albums", "AlbumDAO.find_by_event_id",
+     {"find": "albums", "filter": {"event_id": SAMPLE_ID}, "sort": {"created_at": -1, "_id": -1}, "limit": 20}),
+    ("albums", "AlbumService.list_albums_by_event total",
+     {"count": "albums", "query": {"event_id": SAMPLE_ID}}),
+    ("images", "ImageDAO.find_by_event_and_hash",
+     {"find": "images", "filter": {"event_id": SAMPLE_ID, "content_hash": "0" * 64}, "limit": 1}),
+    ("images", "ImageDAO.find_by_event_and_hashes",
+     {"find": "images", "filter": {"event_id": SAMPLE_ID, "content_hash": {"$in": ["0" * 64, "1" * 64]}}}),
+    ("images", "ImageDAO.find_by_event_id",
+     {"find": "images", "filter": {"event_id": SAMPLE_ID}, "sort": {"uploaded_at": -1, "_id": -1}, "limit": 20}),
+    ("images", "ImageDAO.find_by_album_id",
+     {"find": "images", "filter": {"album_id": SAMPLE_ID}, "sort": {"uploaded_at": -1, "_id": -1}, "limit": 20}),
+    ("images", "ImageDAO.find_by_event_without_album",
+     {"find": "images", "filter": {"event_id": SAMPLE_ID, "album_id": None}, "sort": {"uploaded_at": -1}, "limit": 20}),
+    ("images", "ImageDAO.find_by_s3_keys",
+     {"find": "images", "filter": {"s3_key": {"$in": [f"images/{SAMPLE_ID}/a.jpg"]}}}),
+    ("images", "ImageDAO.count_by_event",
+     {"count": "images", "query": {"event_id": SAMPLE_ID}}),
+    ("images", "ImageDAO.count_by_album",
+     {"count": "images", "query": {"album_id": SAMPLE_ID}}),
+    ("templates", "TemplateDAO.find_by_event_type",
+     {"find": "templates", "filter": {"event_type": "wedding", "is_active": True}, "sort": {"usage_count": -1}, "limit": 20}),
+    ("templates", "TemplateDAO.find_active_templates",
+     {"find": "templates", "filter": {"is_active": True}, "sort": {"event_type": 1, "usage_count": -1}, "limit": 20}),
+    ("templates", "TemplateService.list_templates total",
+     {"count": "templates", "query": {"event_type": "wedding", "is_active": True}}),
+    ("jobs", "JobDAO.claim",
+     {"find": "jobs", "filter": {"$or": [
+         {"status": "queued", "available_at": {"$lte": NOW}},
+         {"status": "running", "locked_until": {"$lt": NOW}}
+     ]}, "sort": {"available_at": 1}, "limit": 1}),
+    ("jobs", "JobDAO.oldest_queued",
+     {"find": "jobs", "filter": {"status": "queued", "available_at": {"$lte": NOW}}, "sort": {"available_at": 1}, "limit": 1}),
+]
+
+# (collection, query name, filter, sort field) of the listings paged with BaseDAO.find_page
+CURSOR_QUERIES = [
+    ("events", "EventDAO.find_by_host_phone cursor", {"host_phone": "9999999999"}, "created_at"),
+    ("events", "EventDAO.find_active_events cursor", {"is_active": True}, "event_date"),
+    ("albums", "AlbumDAO.find_by_event_id cursor", {"event_id": SAMPLE_ID}, "created_at"),
+    ("images", "ImageDAO.find_by_event_id cursor", {"event_id": SAMPLE_ID}, "uploaded_at"),
+    ("images", "ImageDAO.find_by_album_id cursor", {"album_id": SAMPLE_ID}, "uploaded_at"),
+]
+PAGE_LIMIT = 20
+# Documents matching each filter, and as many again that do not, in the scratch database
+SEED_DOCUMENTS = 1000
+# Keys a cursor page may examine beyond its limit + 1 documents: each $or branch
+# reads one key past the end of its bounds, and the missing-field branch has two
+KEY_SLACK = 4
+
+def find_stages(plan, stage: str) -> bool:
+    """Check whether a stage appears anywhere in an explain plan"""
+    if isinstance(plan, dict):
+        if plan.get("stage") == stage:
+            return True
+        return any(find_stages(value, stage) for value in plan.values())
+    if isinstance(plan, list):
+        return any(find_stages(value, stage) for value in plan)
+    return False
+
+async def check_indexes() -> int:
+    # Connect to MongoDB
+    mongodb_url = os.getenv('MONGODB_URL', 'mongodb://localhost:27017')
+    db_name = os.getenv('MONGODB_DB_NAME', 'best_moments')
+    
+    client = AsyncIOMotorClient(mongodb_url)
+    db = client[db_name]
+    
+    # Creating the indexes also creates missing collections, which would otherwise explain as EOF
+    await ensure_indexes(db)
+    
+    failures = 0
+    for collection, name, command in QUERIES:
+        explain = await db.command({"explain": command, "verbosity": "queryPlanner"})
+        winning_plan = explain["queryPlanner"]["winningPlan"]
+        if find_stages(winning_plan, "COLLSCAN"):
+            failures += 1
+            print(f"COLLSCAN  {collection:<16} {name}")
+        else:
+            print(f"ok        {collection:<16} {name}")
+    
+    failures += await check_cursor_pages(client, f"{db_name}_index_check")
+    client.close()
+    
+    total = len(QUERIES) + len(CURSOR_QUERIES)
+    if failures:
+        print(f"{failures} of {total} queries use a collection scan or examine too many keys")
+    else:
+        print(f"All {total} queries use an index")
+    return 1 if failures else 0
+
+async def check_cursor_pages(client: AsyncIOMotorClient, scratch_name: str) -> int:
+    """Explain a cursor page from the middle of each seeded listing and count the failures"""
+    db = client[scratch_name]
+    await client.drop_database(scratch_name)
+    await ensure_indexes(db)
+    
+    failures = 0
+    try:
+        for collection, name, filter, sort_field in CURSOR_QUERIES:
+            # Pairs of documents share a sort value so the cursor also has to break ties on _id
+            documents = [
+                {**(filter if number < SEED_DOCUMENTS else {}), sort_field: NOW - timedelta(seconds=number // 2),
+                 # Distinct values for the unique indexes on events and images
+                 "event_code": f"SEED{number:05d}", "s3_key": f"seed/{number}"}
+                for number in range(2 * SEED_DOCUMENTS)
+            ]
+            await db[collection].insert_many(documents)
+            middle = documents[SEED_DOCUMENTS // 2]
+            
+            command = {
+                "find": collection,
+                "filter": page_query(filter, sort_field, middle[sort_field], middle["_id"]),
+                "sort": {sort_field: -1, "_id": -1},
+                "limit": PAGE_LIMIT + 1
+            }
+            explain = await db.command({"explain": command, "verbosity": "executionStats"})
+            keys = explain["executionStats"]["totalKeysExamined"]
+            await db[collection].delete_many({})
+            if find_stages(explain["queryPlanner"]["winningPlan"], "COLLSCAN"):
+                failures += 1
+                print(f"COLLSCAN  {collection:<16} {name}")
+            elif keys > PAGE_LIMIT + 1 + KEY_SLACK:
+                failures += 1
+                print(f"{keys} keys  {collection:<16} {name} (page of {PAGE_LIMIT})")
+            else:
+                print(f"ok        {collection:<16} {name} ({keys} keys)")
+    finally:
+        await client.drop_database(scratch_name)
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(check_indexes()))
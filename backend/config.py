@@ -19,12 +19,25 @@ class Settings(BaseSettings):
     MONGODB_URL: str = os.getenv('MONGODB_URL', 'mongodb://localhost:27017')
     MONGODB_DB_NAME: str = os.getenv('MONGODB_DB_NAME', 'best_moments')
     
+    # Storage Settings ("s3" or "local")
+    STORAGE_BACKEND: str = os.getenv('STORAGE_BACKEND', 's3')
+    LOCAL_STORAGE_PATH: str = os.getenv('LOCAL_STORAGE_PATH', './storage')
+    LOCAL_STORAGE_BASE_URL: str = os.getenv('LOCAL_STORAGE_BASE_URL', 'http://localhost:8000/api/v1/files')
+    
     # AWS S3 Settings
     AWS_ACCESS_KEY_ID: str = os.getenv('AWS_ACCESS_KEY_ID', '')
     AWS_SECRET_ACCESS_KEY: str = os.getenv('AWS_SECRET_ACCESS_KEY', '')
     AWS_REGION: str = os.getenv('AWS_REGION', 'us-east-1')
     S3_BUCKET_NAME: str = os.getenv('S3_BUCKET_NAME', '')
     CLOUDFRONT_DOMAIN: str = os.getenv('CLOUDFRONT_DOMAIN', '')
+    S3_ENDPOINT_URL: str = os.getenv('S3_ENDPOINT_URL', '')
+    S3_MAX_POOL_CONNECTIONS: int = int(os.getenv('S3_MAX_POOL_CONNECTIONS', 50))
+    S3_MAX_WORKERS: int = int(os.getenv('S3_MAX_WORKERS', 32))
+    S3_MULTIPART_ENABLED: bool = os.getenv('S3_MULTIPART_ENABLED', 'True').lower() == 'true'
+    S3_MULTIPART_THRESHOLD: int = int(os.getenv('S3_MULTIPART_THRESHOLD', 16 * 1024 * 1024))  # 16MB
+    S3_MULTIPART_PART_SIZE: int = max(int(os.getenv('S3_MULTIPART_PART_SIZE', 8 * 1024 * 1024)), 5 * 1024 * 1024)  # 8MB, S3 minimum is 5MB
+    S3_MULTIPART_CONCURRENCY: int = int(os.getenv('S3_MULTIPART_CONCURRENCY', 4))
+    S3_MULTIPART_PART_RETRIES: int = int(os.getenv('S3_MULTIPART_PART_RETRIES', 3))
     
     # CORS Settings
     CORS_ORIGINS: List[str] = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
@@ -33,7 +46,52 @@ class Settings(BaseSettings):
     FRONTEND_URL: str = os.getenv('FRONTEND_URL', 'http://localhost:3000')
     
     # File Upload Settings
-    MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    MAX_FILE_SIZE: int = int(os.getenv('MAX_FILE_SIZE', 50 * 1024 * 1024))  # 50MB
+    MAX_BATCH_FILES: int = int(os.getenv('MAX_BATCH_FILES', 50))
+    MAX_BULK_IMAGES: int = int(os.getenv('MAX_BULK_IMAGES', 2000))
+    BATCH_UPLOAD_CONCURRENCY: int = int(os.getenv('BATCH_UPLOAD_CONCURRENCY', 4))
+    PRESIGNED_UPLOAD_EXPIRATION: int = int(os.getenv('PRESIGNED_UPLOAD_EXPIRATION', 900))  # 15 minutes
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv('UPLOAD_CHUNK_SIZE', 1024 * 1024))  # 1MB
+    
+    # Upload Admission Settings (per worker)
+    ADMISSION_MAX_CONCURRENT: int = int(os.getenv('ADMISSION_MAX_CONCURRENT', 32))
+    ADMISSION_MAX_PER_EVENT: int = int(os.getenv('ADMISSION_MAX_PER_EVENT', 8))
+    ADMISSION_MAX_QUEUE: int = int(os.getenv('ADMISSION_MAX_QUEUE', 64))
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 5.0))  # seconds
+    ADMISSION_RETRY_AFTER: int = int(os.getenv('ADMISSION_RETRY_AFTER', 2))  # seconds
+    
+    # Resumable Upload Settings
+    UPLOAD_STAGING_DIR: str = os.getenv('UPLOAD_STAGING_DIR', '/tmp/best_moments_uploads')
+    RESUMABLE_UPLOAD_EXPIRATION: int = int(os.getenv('RESUMABLE_UPLOAD_EXPIRATION', 24 * 3600))  # 24 hours
+    RESUMABLE_UPLOAD_LOCK_SECONDS: int = int(os.getenv('RESUMABLE_UPLOAD_LOCK_SECONDS', 300))
+    UPLOAD_STAGING_SWEEP_INTERVAL: int = int(os.getenv('UPLOAD_STAGING_SWEEP_INTERVAL', 3600))  # seconds
+    
+    # Image Processing Settings
+    PROCESS_POOL_WORKERS: int = int(os.getenv('PROCESS_POOL_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+    PROCESS_POOL_MAX_PENDING: int = int(os.getenv('PROCESS_POOL_MAX_PENDING', 32))
+    PROCESS_POOL_RETRY_AFTER: int = int(os.getenv('PROCESS_POOL_RETRY_AFTER', 2))
+    DERIVATIVE_FORMAT: str = os.getenv('DERIVATIVE_FORMAT', 'WEBP').upper()
+    DERIVATIVE_QUALITY: int = int(os.getenv('DERIVATIVE_QUALITY', 80))
+    RENDER_CACHE_MAX_BYTES: int = int(os.getenv('RENDER_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    
+    # Background Job Settings
+    JOB_WORKERS: int = int(os.getenv('JOB_WORKERS', 2))
+    JOB_POLL_INTERVAL: float = float(os.getenv('JOB_POLL_INTERVAL', 1.0))  # seconds
+    JOB_VISIBILITY_TIMEOUT: int = int(os.getenv('JOB_VISIBILITY_TIMEOUT', 300))  # seconds
+    JOB_MAX_ATTEMPTS: int = int(os.getenv('JOB_MAX_ATTEMPTS', 5))
+    JOB_RETRY_BASE_DELAY: float = float(os.getenv('JOB_RETRY_BASE_DELAY', 5.0))  # seconds
+    JOB_RETENTION_SECONDS: int = int(os.getenv('JOB_RETENTION_SECONDS', 7 * 24 * 3600))  # 7 days
+    
+    # Image Counter Settings (write-behind buffering per worker)
+    COUNTER_WRITE_BEHIND: bool = os.getenv('COUNTER_WRITE_BEHIND', 'True').lower() == 'true'
+    COUNTER_FLUSH_INTERVAL: float = float(os.getenv('COUNTER_FLUSH_INTERVAL', 0.5))  # seconds
+    COUNTER_FLUSH_MAX_OPS: int = int(os.getenv('COUNTER_FLUSH_MAX_OPS', 500))
+    COUNTER_RECONCILE_INTERVAL: int = int(os.getenv('COUNTER_RECONCILE_INTERVAL', 3600))  # seconds
+    
+    # Image Insert Batching Settings (opt-in, per worker)
+    INSERT_BATCH_ENABLED: bool = os.getenv('INSERT_BATCH_ENABLED', 'False').lower() == 'true'
+    INSERT_BATCH_MAX_SIZE: int = int(os.getenv('INSERT_BATCH_MAX_SIZE', 100))
+    INSERT_BATCH_MAX_LATENCY: float = float(os.getenv('INSERT_BATCH_MAX_LATENCY', 0.005))  # seconds
     ALLOWED_IMAGE_TYPES: List[str] = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp']
     
     class Config:
@@ -1,14 +1,24 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-from app.database import connect_to_mongo, close_mongo_connection
-from app.routes import event_routes, album_routes, image_routes, template_routes
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.dao.indexes import ensure_indexes
+from app.services.upload_session_service import UploadSessionService, UPLOAD_STAGING_SWEEP_INTERVAL
+from app.utils.storage import init_storage, close_storage
+from app.utils.process_pool import init_process_pool, close_process_pool
+from app.utils.job_queue import job_queue
+from app.utils.counter_aggregator import counter_aggregator, COUNTER_WRITE_BEHIND, COUNTER_RECONCILE_INTERVAL
+from app.utils.insert_batcher import insert_batcher, INSERT_BATCH_ENABLED
+from app.utils.admission import AdmissionMiddleware
+from app.routes import event_routes, album_routes, image_routes, template_routes, metrics_routes, file_routes
+from app.services import job_handlers  # registers job handlers
 from app.utils.exceptions import AppException
 from app.utils.responses import APIResponse
 
@@ -17,8 +27,24 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     await connect_to_mongo()
+    await ensure_indexes(get_database())
+    await asyncio.to_thread(UploadSessionService.sweep_staging_dir)
+    init_storage()
+    init_process_pool()
+    if COUNTER_WRITE_BEHIND:
+        counter_aggregator.start()
+    if INSERT_BATCH_ENABLED:
+        insert_batcher.start()
+    await job_queue.start(get_database())
+    await job_queue.schedule(get_database(), "counters.reconcile", {}, COUNTER_RECONCILE_INTERVAL)
+    await job_queue.schedule(get_database(), "uploads.sweep_staging", {}, UPLOAD_STAGING_SWEEP_INTERVAL)
     yield
     # Shutdown
+    await job_queue.stop()
+    await insert_batcher.stop()
+    await counter_aggregator.stop()
+    close_process_pool()
+    close_storage()
     await close_mongo_connection()
 
 app = FastAPI(
@@ -28,6 +54,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Upload admission runs inside CORS so rejections still carry CORS headers
+app.add_middleware(AdmissionMiddleware)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -35,6 +64,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Location", "Upload-Offset", "Upload-Length", "Retry-After", "ETag"],
 )
 
 # Include routers
@@ -42,11 +72,13 @@ app.include_router(event_routes.router, prefix="/api/v1")
 app.include_router(album_routes.router, prefix="/api/v1")
 app.include_router(image_routes.router, prefix="/api/v1")
 app.include_router(template_routes.router, prefix="/api/v1")
+app.include_router(metrics_routes.router, prefix="/api/v1")
+app.include_router(file_routes.router, prefix="/api/v1")
 
 # Global exception handler
 @app.exception_handler(AppException)
 async def app_exception_handler(request, exc: AppException):
-    return APIResponse.error(exc.message, exc.status_code, exc.details)
+    return APIResponse.error(exc.message, exc.status_code, exc.details, exc.headers)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,52 @@
+"""AdmissionMiddleware gates upload requests before the app reads their bodies"""
+import asyncio
+
+from app.utils.admission import AdmissionController, AdmissionMiddleware
+
+async def call(middleware, path, query=b""):
+    sent = []
+    
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    async def send(message):
+        sent.append(message)
+    
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": query, "headers": []}
+    await middleware(scope, receive, send)
+    return sent[0]["status"]
+
+def make_middleware():
+    calls = []
+    
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    
+    controller = AdmissionController(max_concurrent=2, max_per_event=1, max_queue=0)
+    return AdmissionMiddleware(app, controller), calls
+
+def test_upload_without_event_id_is_rejected_before_admission():
+    middleware, calls = make_middleware()
+    
+    status = asyncio.run(call(middleware, "/api/v1/images/upload"))
+    
+    assert status == 400
+    assert calls == []
+    assert middleware.controller.admitted == 0
+
+def test_upload_with_event_id_is_admitted():
+    middleware, calls = make_middleware()
+    
+    status = asyncio.run(call(middleware, "/api/v1/images/upload", b"event_id=event-1"))
+    
+    assert status == 201
+    assert calls == ["/api/v1/images/upload"]
+
+def test_other_paths_pass_through():
+    middleware, calls = make_middleware()
+    
+    status = asyncio.run(call(middleware, "/api/v1/albums/"))
+    
+    assert status == 201
@@ -0,0 +1,153 @@
+"""ImageService bulk move and delete against in-memory stand-ins for Mongo and storage"""
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from app.services.image_service import ImageService
+from app.utils.job_queue import job_queue
+
+EVENT_ID = "event-1"
+
+def matches(document, filter):
+    for field, condition in filter.items():
+        if isinstance(condition, dict) and "$in" in condition:
+            if document.get(field) not in condition["$in"]:
+                return False
+        elif document.get(field) != condition:
+            return False
+    return True
+
+class FakeImageDAO:
+    def __init__(self, images):
+        self.images = {image['_id']: image for image in images}
+    
+    async def find_by_ids(self, ids):
+        return [self.images[ObjectId(id)] for id in ids if ObjectId.is_valid(id) and ObjectId(id) in self.images]
+    
+    async def find_by_s3_keys(self, s3_keys):
+        return [image for image in self.images.values() if image['s3_key'] in s3_keys]
+    
+    async def update_many(self, filter, data):
+        matched = [image for image in self.images.values() if matches(image, filter)]
+        for image in matched:
+            image.update(data)
+        return len(matched)
+    
+    async def delete_many(self, filter):
+        matched = [image_id for image_id, image in self.images.items() if matches(image, filter)]
+        for image_id in matched:
+            del self.images[image_id]
+        return len(matched)
+
+class FakeCounterDAO:
+    def __init__(self, documents):
+        self.documents = documents
+        self.counts = {}
+    
+    async def find_by_id(self, document_id):
+        return self.documents.get(document_id)
+    
+    async def apply_image_count_deltas(self, deltas):
+        for document_id, amount in deltas.items():
+            self.counts[document_id] = self.counts.get(document_id, 0) + amount
+        return len(deltas)
+
+class FakeStorage:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.deleted = []
+    
+    async def delete_files(self, keys):
+        self.deleted.extend(key for key in keys if key not in self.failing)
+        return [key for key in keys if key in self.failing]
+    
+    def get_public_url(self, key):
+        return f"http://storage.local/{key}"
+
+@pytest.fixture
+def jobs(monkeypatch):
+    queued = []
+    
+    async def enqueue(db, job_type, payload):
+        queued.append((job_type, payload))
+        return str(ObjectId())
+    
+    monkeypatch.setattr(job_queue, "enqueue", enqueue)
+    return queued
+
+def image(name: str, album_id=None, s3_key=None) -> dict:
+    return {
+        "_id": ObjectId(),
+        "event_id": EVENT_ID,
+        "album_id": album_id,
+        "s3_key": s3_key or f"images/{EVENT_ID}/{name}",
+        "derivative_keys": [f"derivatives/{EVENT_ID}/{name}"]
+    }
+
+def make_service(images, failing=()) -> ImageService:
+    service = ImageService.__new__(ImageService)
+    service.db = None
+    service.image_dao = FakeImageDAO(images)
+    service.event_dao = FakeCounterDAO({EVENT_ID: {"_id": EVENT_ID}})
+    service.album_dao = FakeCounterDAO({
+        album_id: {"_id": album_id, "event_id": EVENT_ID} for album_id in ("album-1", "album-2")
+    })
+    service.storage = FakeStorage(failing)
+    return service
+
+def test_bulk_move_updates_both_album_counters():
+    images = [image("a.jpg"), image("b.jpg", "album-1"), image("c.jpg", "album-2")]
+    service = make_service(images)
+    missing = str(ObjectId())
+    
+    result = asyncio.run(service.move_images_to_album([str(entry['_id']) for entry in images] + [missing], "album-2"))
+    
+    assert result == {"moved": 2, "not_found": [missing]}
+    assert all(entry['album_id'] == "album-2" for entry in service.image_dao.images.values())
+    assert service.album_dao.counts == {"album-1": -1, "album-2": 2}
+
+def test_bulk_move_out_of_albums():
+    images = [image("a.jpg", "album-1"), image("b.jpg", "album-1")]
+    service = make_service(images)
+    
+    result = asyncio.run(service.move_images_to_album([str(entry['_id']) for entry in images], None))
+    
+    assert result["moved"] == 2
+    assert service.album_dao.counts == {"album-1": -2}
+
+def test_bulk_delete_removes_documents_files_and_counts(jobs):
+    images = [image("a.jpg"), image("b.jpg", "album-1")]
+    service = make_service(images)
+    
+    result = asyncio.run(service.delete_images([str(entry['_id']) for entry in images]))
+    
+    assert result == {"deleted": 2, "not_found": [], "files_pending_cleanup": 0}
+    assert service.image_dao.images == {}
+    assert len(service.storage.deleted) == 4
+    assert service.event_dao.counts == {EVENT_ID: -2}
+    assert service.album_dao.counts == {"album-1": -1}
+    assert jobs == []
+
+def test_bulk_delete_queues_cleanup_for_files_that_fail(jobs):
+    images = [image("a.jpg"), image("b.jpg")]
+    service = make_service(images, failing=[images[1]['s3_key']])
+    
+    result = asyncio.run(service.delete_images([str(entry['_id']) for entry in images]))
+    
+    assert result["deleted"] == 2
+    assert result["files_pending_cleanup"] == 1
+    assert jobs == [("storage.cleanup", {"files": [{"s3_key": images[1]['s3_key'], "keys": [images[1]['s3_key']]}]})]
+
+def test_bulk_delete_keeps_files_a_live_image_still_uses(jobs):
+    # The same bytes uploaded again after the delete reuse its content-addressed key
+    deleted, reuploaded = image("a.jpg"), image("a.jpg")
+    service = make_service([deleted, reuploaded])
+    
+    result = asyncio.run(service.delete_images([str(deleted['_id'])]))
+    
+    assert result["deleted"] == 1
+    assert service.storage.deleted == []
+    
+    asyncio.run(service.cleanup_stored_files([{"s3_key": deleted['s3_key'], "keys": [deleted['s3_key']]}]))
+    assert service.storage.deleted == []
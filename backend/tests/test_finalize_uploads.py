@@ -0,0 +1,187 @@
+"""ImageService.finalize_uploads against in-memory stand-ins for Mongo and storage
+
+The image DAO stand-in enforces the unique s3_key index the way Mongo does, so
+duplicate finalizes exercise the same DuplicateKeyError path as production.
+"""
+import asyncio
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.models.image import FinalizeUploadFile
+from app.services.image_service import ImageService
+from app.utils.job_queue import job_queue
+
+EVENT_ID = "event-1"
+
+class FakeImageDAO:
+    def __init__(self):
+        self.images = {}
+    
+    async def find_by_s3_keys(self, s3_keys):
+        # Yield like a database round trip so concurrent requests interleave
+        await asyncio.sleep(0)
+        return [self.images[s3_key] for s3_key in s3_keys if s3_key in self.images]
+    
+    async def find_by_s3_key(self, s3_key):
+        return self.images.get(s3_key)
+    
+    async def find_by_id(self, image_id):
+        return next((image for image in self.images.values() if str(image['_id']) == image_id), None)
+    
+    async def update_returning(self, image_id, data, filter=None):
+        image = await self.find_by_id(image_id)
+        if image is None or any(image.get(field) != value for field, value in (filter or {}).items()):
+            return None
+        image.update(data)
+        return image
+    
+    async def create_many(self, documents, ordered=True):
+        await asyncio.sleep(0)
+        write_errors = []
+        for index, document in enumerate(documents):
+            document['_id'] = ObjectId()
+            if document['s3_key'] in self.images:
+                write_errors.append({"index": index, "code": 11000, "errmsg": "E11000 duplicate key error"})
+            else:
+                self.images[document['s3_key']] = document
+        if write_errors:
+            raise BulkWriteError({"writeErrors": write_errors})
+        return [str(document['_id']) for document in documents]
+
+class FakeCounterDAO:
+    def __init__(self, documents):
+        self.documents = documents
+        self.counts = {}
+    
+    async def find_by_id(self, document_id):
+        return self.documents.get(document_id)
+    
+    async def apply_image_count_deltas(self, deltas):
+        for document_id, amount in deltas.items():
+            self.counts[document_id] = self.counts.get(document_id, 0) + amount
+        return len(deltas)
+
+class FakeStorage:
+    def __init__(self, keys):
+        self.keys = set(keys)
+    
+    async def head_file(self, key):
+        if key not in self.keys:
+            return None
+        return {"size": 1024, "content_type": "image/jpeg"}
+    
+    def get_public_url(self, key):
+        return f"http://storage.local/{key}"
+
+@pytest.fixture
+def jobs(monkeypatch):
+    queued = []
+    
+    async def enqueue_many(db, job_type, payloads):
+        queued.extend(payloads)
+        return [str(ObjectId()) for _ in payloads]
+    
+    monkeypatch.setattr(job_queue, "enqueue_many", enqueue_many)
+    return queued
+
+def make_service(stored_keys) -> ImageService:
+    service = ImageService.__new__(ImageService)
+    service.db = None
+    service.image_dao = FakeImageDAO()
+    service.event_dao = FakeCounterDAO({EVENT_ID: {"_id": EVENT_ID}})
+    service.album_dao = FakeCounterDAO({
+        album_id: {"_id": album_id, "event_id": EVENT_ID} for album_id in ("album-1", "album-2")
+    })
+    service.storage = FakeStorage(stored_keys)
+    return service
+
+def key(name: str) -> str:
+    return f"images/{EVENT_ID}/{name}"
+
+def files(*names):
+    return [FinalizeUploadFile(s3_key=key(name), filename=name) for name in names]
+
+def test_records_uploaded_objects(jobs):
+    service = make_service([key("a.jpg"), key("b.jpg")])
+    
+    results = asyncio.run(service.finalize_uploads(EVENT_ID, files("a.jpg", "b.jpg")))
+    
+    assert [result['success'] for result in results] == [True, True]
+    assert set(service.image_dao.images) == {key("a.jpg"), key("b.jpg")}
+    assert service.event_dao.counts == {EVENT_ID: 2}
+    assert len(jobs) == 2
+
+def test_reports_missing_and_foreign_objects(jobs):
+    service = make_service([key("a.jpg")])
+    other_event_file = FinalizeUploadFile(s3_key="images/event-2/c.jpg", filename="c.jpg")
+    
+    results = asyncio.run(service.finalize_uploads(EVENT_ID, files("a.jpg", "b.jpg") + [other_event_file]))
+    
+    assert results[0]['success']
+    assert results[1] == {"filename": "b.jpg", "success": False, "error": "Uploaded file not found"}
+    assert results[2] == {"filename": "c.jpg", "success": False, "error": "File does not belong to this event"}
+    assert service.event_dao.counts == {EVENT_ID: 1}
+
+def test_key_repeated_in_one_request_is_recorded_once(jobs):
+    service = make_service([key("a.jpg")])
+    
+    results = asyncio.run(service.finalize_uploads(EVENT_ID, files("a.jpg", "a.jpg")))
+    
+    assert [result['success'] for result in results] == [True, True]
+    assert results[0]['data']['duplicate'] is False
+    assert results[1]['data']['duplicate'] is True
+    assert results[0]['data']['id'] == results[1]['data']['id']
+    assert len(service.image_dao.images) == 1
+    assert service.event_dao.counts == {EVENT_ID: 1}
+    assert len(jobs) == 1
+
+def test_concurrent_finalizes_of_one_key_are_recorded_once(jobs):
+    service = make_service([key("a.jpg")])
+    
+    async def finalize_twice():
+        return await asyncio.gather(
+            service.finalize_uploads(EVENT_ID, files("a.jpg")),
+            service.finalize_uploads(EVENT_ID, files("a.jpg"))
+        )
+    
+    first, second = asyncio.run(finalize_twice())
+    
+    assert first[0]['success'] and second[0]['success']
+    assert sorted([first[0]['data']['duplicate'], second[0]['data']['duplicate']]) == [False, True]
+    assert first[0]['data']['id'] == second[0]['data']['id']
+    assert len(service.image_dao.images) == 1
+    assert service.event_dao.counts == {EVENT_ID: 1}
+    assert len(jobs) == 1
+
+def test_retry_after_finalize_returns_recorded_image(jobs):
+    service = make_service([key("a.jpg")])
+    
+    first = asyncio.run(service.finalize_uploads(EVENT_ID, files("a.jpg")))
+    retry = asyncio.run(service.finalize_uploads(EVENT_ID, files("a.jpg")))
+    
+    assert retry[0]['data']['duplicate'] is True
+    assert retry[0]['data']['id'] == first[0]['data']['id']
+    assert service.event_dao.counts == {EVENT_ID: 1}
+
+def test_duplicate_outside_an_album_is_moved_into_the_requested_one(jobs):
+    service = make_service([key("a.jpg")])
+    
+    asyncio.run(service.finalize_uploads(EVENT_ID, files("a.jpg")))
+    retry = asyncio.run(service.finalize_uploads(EVENT_ID, files("a.jpg"), album_id="album-1"))
+    
+    assert retry[0]['data']['duplicate'] is True
+    assert retry[0]['data']['album_id'] == "album-1"
+    assert service.album_dao.counts == {"album-1": 1}
+    assert service.event_dao.counts == {EVENT_ID: 1}
+
+def test_duplicate_in_another_album_is_a_conflict(jobs):
+    service = make_service([key("a.jpg")])
+    
+    asyncio.run(service.finalize_uploads(EVENT_ID, files("a.jpg"), album_id="album-1"))
+    retry = asyncio.run(service.finalize_uploads(EVENT_ID, files("a.jpg"), album_id="album-2"))
+    
+    assert retry[0] == {"filename": "a.jpg", "success": False, "error": "Image already exists in another album"}
+    assert service.image_dao.images[key("a.jpg")]['album_id'] == "album-1"
+    assert service.album_dao.counts == {"album-1": 1}
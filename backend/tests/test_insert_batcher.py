@@ -0,0 +1,55 @@
+"""InsertBatcher against an in-memory stand-in for a DAO"""
+import asyncio
+
+from bson import ObjectId
+
+from app.utils.insert_batcher import InsertBatcher
+
+class FakeCollection:
+    name = "images"
+
+class FakeDAO:
+    collection = FakeCollection()
+    
+    def __init__(self):
+        self.batches = []
+    
+    async def create_many(self, documents, ordered=True):
+        for document in documents:
+            document['_id'] = ObjectId()
+        self.batches.append(list(documents))
+        return [str(document['_id']) for document in documents]
+
+def test_concurrent_inserts_share_one_write():
+    dao = FakeDAO()
+    
+    async def insert_all():
+        batcher = InsertBatcher(max_size=10, max_latency=0.01)
+        batcher.start()
+        ids = await asyncio.gather(*(batcher.insert(dao, {"number": number}) for number in range(3)))
+        await batcher.stop()
+        return ids
+    
+    ids = asyncio.run(insert_all())
+    
+    assert len(dao.batches) == 1
+    assert ids == [str(document['_id']) for document in dao.batches[0]]
+
+def test_cancelled_caller_document_is_not_written():
+    dao = FakeDAO()
+    
+    async def insert_and_cancel():
+        batcher = InsertBatcher(max_size=10, max_latency=0.05)
+        batcher.start()
+        kept = asyncio.create_task(batcher.insert(dao, {"number": 1}))
+        cancelled = asyncio.create_task(batcher.insert(dao, {"number": 2}))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await kept
+        await batcher.stop()
+        return batcher.get_metrics()
+    
+    metrics = asyncio.run(insert_and_cancel())
+    
+    assert [[document['number'] for document in batch] for batch in dao.batches] == [[1]]
+    assert metrics['cancelled'] == 1
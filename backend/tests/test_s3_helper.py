@@ -0,0 +1,107 @@
+"""S3Helper runs boto3 calls on its own thread pool, so concurrent requests overlap
+
+The boto3 client is replaced by a stand-in whose calls block like a slow S3 round trip.
+"""
+import asyncio
+import io
+import threading
+import time
+
+from app.utils.s3_helper import S3Helper
+
+CALL_SECONDS = 0.2
+
+class SlowS3Client:
+    """Stand-in for a boto3 S3 client that records how many calls run at once"""
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+    
+    def _call(self):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(CALL_SECONDS)
+        with self.lock:
+            self.active -= 1
+    
+    def upload_fileobj(self, file_obj, bucket, key, ExtraArgs=None):
+        self._call()
+    
+    def delete_object(self, Bucket, Key):
+        self._call()
+
+def make_helper(connections: int) -> S3Helper:
+    helper = S3Helper(max_pool_connections=connections, max_workers=connections)
+    helper.s3_client = SlowS3Client()
+    return helper
+
+def test_concurrent_uploads_overlap():
+    helper = make_helper(8)
+    
+    async def upload_all() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            helper.upload_file(io.BytesIO(b"data"), f"images/event/{number}.jpg", "image/jpeg")
+            for number in range(8)
+        ))
+        return time.perf_counter() - start
+    
+    elapsed = asyncio.run(upload_all())
+    helper.close()
+    
+    assert helper.s3_client.max_active == 8
+    assert elapsed < CALL_SECONDS * 3
+
+def test_calls_do_not_block_the_event_loop():
+    helper = make_helper(4)
+    
+    async def delete_while_ticking() -> int:
+        ticks = 0
+        
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        ticker = asyncio.create_task(tick())
+        await helper.delete_file("images/event/1.jpg")
+        ticker.cancel()
+        return ticks
+    
+    ticks = asyncio.run(delete_while_ticking())
+    helper.close()
+    
+    assert ticks >= 5
+
+def test_concurrent_calls_are_bounded_by_the_pool():
+    helper = make_helper(2)
+    
+    async def delete_all():
+        await asyncio.gather(*(helper.delete_file(f"images/event/{number}.jpg") for number in range(6)))
+    
+    asyncio.run(delete_all())
+    helper.close()
+    
+    assert helper.s3_client.max_active == 2
+
+class PartialDeleteClient:
+    """Stand-in for a boto3 S3 client whose DeleteObjects fails for some keys"""
+    def __init__(self, failing):
+        self.failing = set(failing)
+    
+    def delete_objects(self, Bucket, Delete):
+        keys = [entry["Key"] for entry in Delete["Objects"]]
+        return {"Errors": [{"Key": key, "Code": "InternalError", "Message": "We encountered an internal error"}
+                           for key in keys if key in self.failing]}
+
+def test_delete_files_returns_the_keys_that_failed():
+    helper = S3Helper(max_pool_connections=2, max_workers=2)
+    helper.s3_client = PartialDeleteClient(["images/event/2.jpg"])
+    
+    failed = asyncio.run(helper.delete_files([f"images/event/{number}.jpg" for number in range(4)]))
+    helper.close()
+    
+    assert failed == ["images/event/2.jpg"]
@@ -9,6 +9,7 @@ export const uploadImage = async (eventId, file, albumId = null, onProgress) =>
   }
 
   return apiClient.post('/images/upload', formData, {
+    params: { event_id: eventId },
     headers: {
       'Content-Type': 'multipart/form-data',
     },
@@ -23,6 +24,52 @@ export const uploadImage = async (eventId, file, albumId = null, onProgress) =>
   })
 }
 
+export const uploadImagesBatch = async (eventId, files, albumId = null, onProgress) => {
+  const formData = new FormData()
+  files.forEach((file) => formData.append('files', file))
+  formData.append('event_id', eventId)
+  if (albumId) {
+    formData.append('album_id', albumId)
+  }
+
+  return apiClient.post('/images/upload/batch', formData, {
+    params: { event_id: eventId },
+    headers: {
+      'Content-Type': 'multipart/form-data',
+    },
+    onUploadProgress: (progressEvent) => {
+      if (onProgress) {
+        const percentCompleted = Math.round(
+          (progressEvent.loaded * 100) / progressEvent.total
+        )
+        onProgress(percentCompleted)
+      }
+    },
+  })
+}
+
+export const presignUploads = (eventId, files, albumId = null) => {
+  return apiClient.post('/images/upload/presign', {
+    event_id: eventId,
+    album_id: albumId,
+    files: files.map((file) => ({
+      filename: file.name,
+      content_type: file.type,
+      file_size: file.size,
+    })),
+  })
+}
+
+export const finalizeUploads = (eventId, uploads, albumId = null) => {
+  return apiClient.post('/images/upload/finalize', {
+    event_id: eventId,
+    album_id: albumId,
+    files: uploads.map(({ s3_key, filename }) => ({ s3_key, filename })),
+  }, {
+    params: { event_id: eventId },
+  })
+}
+
 export const getImageById = (imageId) => {
   return apiClient.get(`/images/${imageId}`)
 }
@@ -41,6 +88,9 @@ export const listImagesByAlbum = (albumId, params = {}) => {
 
 export const imageApi = {
   uploadImage,
+  uploadImagesBatch,
+  presignUploads,
+  finalizeUploads,
   getImageById,
   deleteImage,
   listImagesByEvent,
@@ -14,6 +14,8 @@ import {
 } from 'lucide-react'
 import { imageApi, albumApi } from '../api'
 
+const UPLOAD_BATCH_SIZE = 10
+
 const UploadImages = () => {
   const { eventCode } = useParams()
   const [files, setFiles] = useState([])
@@ -40,7 +42,7 @@ const UploadImages = () => {
     accept: {
       'image/*': ['.jpeg', '.jpg', '.png', '.gif', '.webp'],
     },
-    maxSize: 10485760, // 10MB
+    maxSize: 52428800, // 50MB
   })
 
   const removeFile = (id) => {
@@ -76,38 +78,51 @@ const UploadImages = () => {
     }
 
     setUploading(true)
-    const uploadPromises = files
-      .filter((f) => f.status === 'pending')
-      .map(async (fileObj) => {
-        try {
-          await imageApi.uploadImage(
-            eventId,
-            fileObj.file,
-            selectedAlbum,
-            (progress) => {
-              setUploadProgress((prev) => ({
-                ...prev,
-                [fileObj.id]: progress,
-              }))
-            }
-          )
+    const pending = files.filter((f) => f.status === 'pending')
+    const batches = []
+    for (let i = 0; i < pending.length; i += UPLOAD_BATCH_SIZE) {
+      batches.push(pending.slice(i, i + UPLOAD_BATCH_SIZE))
+    }
 
-          setFiles((prev) =>
-            prev.map((f) =>
-              f.id === fileObj.id ? { ...f, status: 'success' } : f
-            )
-          )
-        } catch (error) {
-          setFiles((prev) =>
-            prev.map((f) =>
-              f.id === fileObj.id ? { ...f, status: 'error' } : f
-            )
-          )
-          toast.error(`Failed to upload ${fileObj.file.name}`)
-        }
-      })
+    const setStatus = (id, status) => {
+      setFiles((prev) =>
+        prev.map((f) => (f.id === id ? { ...f, status } : f))
+      )
+    }
+
+    for (const batch of batches) {
+      try {
+        const response = await imageApi.uploadImagesBatch(
+          eventId,
+          batch.map((fileObj) => fileObj.file),
+          selectedAlbum,
+          (progress) => {
+            setUploadProgress((prev) => {
+              const next = { ...prev }
+              batch.forEach((fileObj) => {
+                next[fileObj.id] = progress
+              })
+              return next
+            })
+          }
+        )
+
+        // Results come back in the same order as the files were sent
+        const results = response.data.data || []
+        batch.forEach((fileObj, index) => {
+          if (results[index]?.success) {
+            setStatus(fileObj.id, 'success')
+          } else {
+            setStatus(fileObj.id, 'error')
+            toast.error(`Failed to upload ${fileObj.file.name}`)
+          }
+        })
+      } catch (error) {
+        batch.forEach((fileObj) => setStatus(fileObj.id, 'error'))
+        toast.error(`Failed to upload ${batch.length} photo(s)`)
+      }
+    }
 
-    await Promise.all(uploadPromises)
     setUploading(false)
     toast.success('All photos uploaded! 🎉')
   }
@@ -229,7 +244,7 @@ const UploadImages = () => {
                 {isDragActive ? 'Drop your photos here' : 'Drag & drop photos here'}
               </p>
               <p className="text-gray-600">or click to select files</p>
-              <p className="text-sm text-gray-500 mt-2">Max 10MB per file</p>
+              <p className="text-sm text-gray-500 mt-2">Max 50MB per file</p>
             </div>
           </motion.div>
         </div>
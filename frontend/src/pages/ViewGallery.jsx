@@ -24,8 +24,8 @@ const ViewGallery = () => {
   const [loading, setLoading] = useState(true)
   const [selectedAlbum, setSelectedAlbum] = useState(null)
   const [selectedImage, setSelectedImage] = useState(null)
-  const [page, setPage] = useState(1)
-  const [hasMore, setHasMore] = useState(true)
+  const [cursor, setCursor] = useState(null)
+  const [nextCursor, setNextCursor] = useState(null)
 
   useEffect(() => {
     fetchEvent()
@@ -34,7 +34,7 @@ const ViewGallery = () => {
 
   useEffect(() => {
     fetchImages()
-  }, [selectedAlbum, page])
+  }, [selectedAlbum, cursor])
 
   const fetchEvent = async () => {
     try {
@@ -59,16 +59,18 @@ const ViewGallery = () => {
     try {
       if (!event?.id) return
       
+      // Continue from the last page's cursor so deep pages cost the same as the first
+      const params = { limit: 30, include_total: false, ...(cursor && { cursor }) }
       let response
       if (selectedAlbum) {
-        response = await imageApi.listImagesByAlbum(selectedAlbum, { page, limit: 30 })
+        response = await imageApi.listImagesByAlbum(selectedAlbum, params)
       } else {
-        response = await imageApi.listImagesByEvent(event.id, { page, limit: 30 })
+        response = await imageApi.listImagesByEvent(event.id, params)
       }
       
       const newImages = response.data || []
-      setImages((prev) => (page === 1 ? newImages : [...prev, ...newImages]))
-      setHasMore(newImages.length === 30)
+      setImages((prev) => (cursor ? [...prev, ...newImages] : newImages))
+      setNextCursor(response.meta?.next_cursor || null)
     } catch (error) {
       console.error('Error fetching images:', error)
     } finally {
@@ -143,7 +145,7 @@ const ViewGallery = () => {
           <button
             onClick={() => {
               setSelectedAlbum(null)
-              setPage(1)
+              setCursor(null)
             }}
             className={`px-4 py-2 rounded-xl font-semibold transition-all ${
               selectedAlbum === null
@@ -159,7 +161,7 @@ const ViewGallery = () => {
               key={album.id}
               onClick={() => {
                 setSelectedAlbum(album.id)
-                setPage(1)
+                setCursor(null)
               }}
               className={`px-4 py-2 rounded-xl font-semibold transition-all ${
                 selectedAlbum === album.id
@@ -196,12 +198,15 @@ const ViewGallery = () => {
                 animate={{ opacity: 1, scale: 1 }}
                 transition={{ delay: index * 0.05 }}
                 whileHover={{ scale: 1.05 }}
-                className="group relative aspect-square rounded-xl overflow-hidden cursor-pointer shadow-lg"
+                className="group relative aspect-square rounded-xl overflow-hidden cursor-pointer shadow-lg bg-cover bg-center"
+                style={image.placeholder ? { backgroundImage: `url(${image.placeholder})` } : undefined}
                 onClick={() => setSelectedImage(image)}
               >
                 <img
-                  src={image.s3_url}
+                  src={image.derivatives?.medium || image.thumbnail_url || image.s3_url}
                   alt={image.original_filename}
+                  width={image.width}
+                  height={image.height}
                   className="w-full h-full object-cover"
                   loading="lazy"
                 />
@@ -211,10 +216,10 @@ const ViewGallery = () => {
           </div>
 
           {/* Load More */}
-          {hasMore && (
+          {nextCursor && (
             <div className="text-center mt-8">
               <button
-                onClick={() => setPage((p) => p + 1)}
+                onClick={() => setCursor(nextCursor)}
                 className="btn-secondary"
               >
                 Load More
@@ -249,8 +254,10 @@ const ViewGallery = () => {
               onClick={(e) => e.stopPropagation()}
             >
               <img
-                src={selectedImage.s3_url}
+                src={selectedImage.derivatives?.display || selectedImage.s3_url}
                 alt={selectedImage.original_filename}
+                width={selectedImage.width}
+                height={selectedImage.height}
                 className="w-full h-auto max-h-[80vh] object-contain rounded-xl"
               />
               <div className="flex gap-4 mt-6 justify-center">